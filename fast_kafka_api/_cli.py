@@ -1,19 +1,32 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/004_CLI.ipynb.
 
 # %% auto 0
-__all__ = ['ImportFromStringError', 'run', 'generate_docs']
+__all__ = ['ImportFromStringError', 'run', 'generate_docs', 'benchmark']
 
 # %% ../nbs/004_CLI.ipynb 1
 import importlib
+import json
+import logging
+import multiprocessing
+import signal
+import socket
 import sys
+import threading
+import time
 from asyncio import run as aiorun
+from multiprocessing.process import BaseProcess
 from pathlib import Path
 from typing import *
 
 from fastapi import FastAPI
 import typer
+import uvicorn
 
 from .application import FastKafkaAPI
+from fast_kafka_api._components.event_loop import (
+    get_event_loop_policy,
+    install_event_loop,
+)
 
 # %% ../nbs/004_CLI.ipynb 6
 class ImportFromStringError(Exception):
@@ -64,16 +77,230 @@ def _import_from_string(import_str: str) -> Any:
 
     return instance
 
-# %% ../nbs/004_CLI.ipynb 9
+# %% ../nbs/004_CLI.ipynb 8
+def _get_topics_without_group_id(application: FastKafkaAPI) -> List[str]:
+    """Returns consumed topics whose consumers are not a part of a consumer group
+
+    Workers consuming such topics would each receive all their messages, instead of a share of their partitions.
+    """
+    default_group_id = application._kafka_config.get("group_id")
+    return [
+        topic
+        for topic, (_, override_config) in application._consumers_store.items()
+        if override_config.get("group_id", default_group_id) is None
+    ]
+
+
+def _run_worker(
+    import_str: str, *, loop: str, sockets: List[socket.socket], **kwargs: Any
+) -> None:
+    """Runs the REST API and Kafka consumers and producers of the application in the current process using uvicorn
+
+    Params:
+        import_str: input in the form of 'path:app', where **app** is an object of type **FastKafkaAPI**
+        loop: event loop implementation, one of "auto", "asyncio" or "uvloop", see `install_event_loop` for details
+        sockets: sockets bound by the parent process and shared by all workers
+        **kwargs: keyword arguments passed to `uvicorn.Config`
+    """
+    install_event_loop(loop)
+    application = _import_from_string(import_str)
+    # the specification and the documentation are generated once by the parent process
+    application._generate_spec_on_startup = False
+    # uvicorn uses the event loop installed above
+    config = uvicorn.Config(application._fast_api_app, loop="none", **kwargs)
+
+    uvicorn.Server(config).run(sockets=sockets)
+
+
+def _supervise(
+    start_worker: Callable[[], BaseProcess],
+    *,
+    num_workers: int,
+    shutdown_event: threading.Event,
+    graceful_timeout: float,
+    check_interval: float = 0.5,
+    restart_backoff: float = 1.0,
+    max_restart_backoff: float = 30.0,
+    max_restarts: int = 5,
+    restart_window: float = 60.0,
+) -> List[Optional[int]]:
+    """Starts worker processes, restarts the ones which exit and stops all of them once **shutdown_event** is set
+
+    A worker which exits is restarted after **restart_backoff** seconds, doubled for each consecutive restart
+    of the same worker up to **max_restart_backoff** seconds. The delay is reset once a worker runs for
+    **restart_window** seconds. If workers exit more than **max_restarts** times within **restart_window**
+    seconds, e.g. because they fail on startup, all of them are stopped and `RuntimeError` is raised.
+
+    Workers are stopped with SIGTERM, which lets them drain their consumers and flush their producers,
+    and killed if they do not exit within **graceful_timeout** seconds.
+
+    Params:
+        start_worker: function starting a worker process
+        num_workers: number of worker processes
+        shutdown_event: event set when the workers should be stopped
+        graceful_timeout: maximum time in seconds for workers to exit after being stopped
+        check_interval: time in seconds between checks whether workers are alive
+        restart_backoff: time in seconds before the first restart of a worker
+        max_restart_backoff: maximum time in seconds before restarting a worker
+        max_restarts: maximum number of restarts of all workers within **restart_window** seconds
+        restart_window: time window in seconds restarts are counted in
+
+    Returns:
+        exit codes of the workers
+
+    Raises:
+        RuntimeError: if workers exited too often
+    """
+    workers = [start_worker() for _ in range(num_workers)]
+    started_at = [time.monotonic()] * num_workers
+    consecutive_restarts = [0] * num_workers
+    # workers waiting to be restarted and times they are restarted at
+    pending: Dict[int, float] = {}
+    restart_times: List[float] = []
+    failure: Optional[str] = None
+    while failure is None and not shutdown_event.wait(check_interval):
+        now = time.monotonic()
+        for i, worker in enumerate(workers):
+            if i in pending:
+                if now >= pending[i]:
+                    del pending[i]
+                    workers[i] = start_worker()
+                    started_at[i] = time.monotonic()
+                continue
+            if worker.is_alive():
+                continue
+            restart_times = [t for t in restart_times if now - t < restart_window]
+            if len(restart_times) >= max_restarts:
+                failure = f"Workers exited more than {max_restarts} times within {restart_window} seconds, the last one with code {worker.exitcode}"
+                break
+            if now - started_at[i] >= restart_window:
+                consecutive_restarts[i] = 0
+            delay = min(
+                restart_backoff * 2 ** consecutive_restarts[i], max_restart_backoff
+            )
+            consecutive_restarts[i] += 1
+            restart_times.append(now)
+            pending[i] = now + delay
+            typer.secho(
+                f"Worker with pid {worker.pid} exited with code {worker.exitcode}, restarting it in {delay} seconds",
+                err=True,
+                fg=typer.colors.YELLOW,
+            )
+
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()
+    deadline = time.monotonic() + graceful_timeout
+    for worker in workers:
+        worker.join(max(deadline - time.monotonic(), 0))
+        if worker.is_alive():
+            typer.secho(
+                f"Worker with pid {worker.pid} did not exit in {graceful_timeout} seconds, killing it",
+                err=True,
+                fg=typer.colors.RED,
+            )
+            worker.kill()
+            worker.join()
+    if failure is not None:
+        raise RuntimeError(failure)
+    return [worker.exitcode for worker in workers]
+
+
+def _generate_docs_in_background(application: FastKafkaAPI) -> threading.Thread:
+    """Generates the AsyncAPI documentation of the application in a thread, failures are reported without stopping workers"""
+
+    def _generate_docs() -> None:
+        try:
+            application.generate_async_spec()
+        except Exception as e:
+            typer.secho(
+                f"Generation of the AsyncAPI documentation failed: {e}",
+                err=True,
+                fg=typer.colors.YELLOW,
+            )
+
+    thread = threading.Thread(target=_generate_docs)
+    thread.start()
+    return thread
+
+# %% ../nbs/004_CLI.ipynb 12
 _app = typer.Typer(help="")
 
 
 @_app.command(
     help="Runs Fast Kafka API application using uvicorn",
 )
-def run(root_path: str = typer.Option(".", help="")) -> None:
+def run(
+    root_path: str = typer.Option(".", help=""),
+    app: str = typer.Argument(
+        ...,
+        help="input in the form of 'path:app', where **path** is the path to a python file and **app** is an object of type **FastKafkaAPI**.",
+    ),
+    host: str = typer.Option("127.0.0.1", help="host the REST API is served on"),
+    port: int = typer.Option(8000, help="port the REST API is served on"),
+    workers: int = typer.Option(
+        1,
+        help="number of worker processes, consumers in the same consumer group share partitions among workers",
+    ),
+    loop: Optional[str] = typer.Option(
+        None,
+        help="event loop used by workers, one of 'auto', 'asyncio' or 'uvloop', 'auto' uses uvloop if it is installed. If not set, **event_loop** of the app is used.",
+    ),
+    graceful_timeout: float = typer.Option(
+        30.0,
+        help="maximum time in seconds for workers to drain consumers and flush producers on shutdown before they are killed",
+    ),
+) -> None:
     try:
-        raise NotImplementedError()
+        if workers < 1:
+            raise ValueError(f"workers must be a positive integer, got {workers}")
+        application = _import_from_string(app)
+        event_loop = loop if loop is not None else application._event_loop
+        get_event_loop_policy(event_loop)
+        topics = _get_topics_without_group_id(application)
+        if workers > 1 and topics:
+            typer.secho(
+                f"Consumers of topics {topics} have no group_id, each worker will consume all of their messages",
+                err=True,
+                fg=typer.colors.YELLOW,
+            )
+
+        # the specification and the documentation are generated once here instead of by every worker
+        application.generate_async_spec(generate_docs=False)
+        docs_thread = (
+            _generate_docs_in_background(application)
+            if application._generate_docs_on_startup
+            else None
+        )
+
+        # workers accept connections on the same socket
+        sock = uvicorn.Config(app, host=host, port=port).bind_socket()
+        ctx = multiprocessing.get_context("spawn")
+
+        def start_worker() -> BaseProcess:
+            worker = ctx.Process(
+                target=_run_worker,
+                args=(app,),
+                kwargs=dict(loop=event_loop, sockets=[sock]),
+            )
+            worker.start()
+            return worker
+
+        shutdown_event = threading.Event()
+        for sig in [signal.SIGINT, signal.SIGTERM]:
+            signal.signal(sig, lambda *_: shutdown_event.set())
+        try:
+            _supervise(
+                start_worker,
+                num_workers=workers,
+                shutdown_event=shutdown_event,
+                graceful_timeout=graceful_timeout,
+            )
+        finally:
+            sock.close()
+            if docs_thread is not None:
+                application._docs_stop_event.set()
+                docs_thread.join()
     except Exception as e:
         typer.secho(f"Unexpected internal error: {e}", err=True, fg=typer.colors.RED)
         raise typer.Exit(1)
@@ -98,3 +325,63 @@ def generate_docs(
 
         typer.secho(f"Unexpected internal error: {e}", err=True, fg=typer.colors.RED)
         raise typer.Exit(1)
+
+
+@_app.command(
+    help="Runs benchmarks of consuming and producing messages and outputs their results as JSON",
+)
+def benchmark(
+    benchmarks: Optional[List[str]] = typer.Option(
+        None,
+        "--benchmark",
+        help="benchmark to run, can be passed multiple times, if not set all benchmarks are run",
+    ),
+    models: Optional[List[str]] = typer.Option(
+        None,
+        "--model",
+        help="message model, can be passed multiple times, if not set all models are used",
+    ),
+    payload_sizes: List[int] = typer.Option(
+        [100, 1_000, 10_000],
+        "--payload-size",
+        help="size of messages in bytes, can be passed multiple times",
+    ),
+    num_msgs: int = typer.Option(
+        10_000, help="number of messages sent or consumed by each benchmark"
+    ),
+    bootstrap_servers: Optional[str] = typer.Option(
+        None,
+        help="Kafka brokers to run benchmarks against, if not set an in-memory broker is used",
+    ),
+    loop: str = typer.Option(
+        "auto",
+        help="event loop used by benchmarks, one of 'auto', 'asyncio' or 'uvloop', 'auto' uses uvloop if it is installed",
+    ),
+    output: Optional[Path] = typer.Option(
+        None, help="file to write the results to, if not set they are printed"
+    ),
+) -> None:
+    try:
+        # benchmarks use testing utilities, which are not loaded by other commands
+        from fast_kafka_api._components.benchmark import run_benchmarks
+
+        if output is None:
+            # logs are printed as well, they would be mixed with the results
+            logging.getLogger("fast_kafka_api").setLevel(logging.WARNING)
+        install_event_loop(loop)
+        results = aiorun(
+            run_benchmarks(
+                benchmarks=benchmarks or None,
+                models=models or None,
+                payload_sizes=payload_sizes,
+                num_msgs=num_msgs,
+                bootstrap_servers=bootstrap_servers,
+            )
+        )
+        if output is None:
+            typer.echo(json.dumps(results, indent=2))
+        else:
+            output.write_text(json.dumps(results, indent=2))
+    except Exception as e:
+        typer.secho(f"Unexpected internal error: {e}", err=True, fg=typer.colors.RED)
+        raise typer.Exit(1)
@@ -1,44 +1,276 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/001_ConsumerLoop.ipynb.
 
 # %% auto 0
-__all__ = ['logger', 'process_msgs', 'process_message_callback', 'sanitize_kafka_config', 'aiokafka_consumer_loop']
+__all__ = ['logger', 'PreparedCallback', 'process_msgs', 'process_msgs_in_executor', 'process_message_callback',
+           'sanitize_kafka_config', 'aiokafka_consumer_loop']
 
 # %% ../../nbs/001_ConsumerLoop.ipynb 1
 import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
+import os
+import time
 from asyncio import iscoroutinefunction  # do not use the version from inspect
 from datetime import datetime, timedelta
+from inspect import signature
 from os import environ
 from typing import *
 
 import anyio
+from anyio.abc import TaskStatus
 from anyio.streams.memory import MemoryObjectReceiveStream
 import asyncer
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener
 from aiokafka.structs import ConsumerRecord, TopicPartition
 from pydantic import BaseModel, Field, HttpUrl, NonNegativeInt
 
+from .events import EventMetadata
 from .logger import get_logger
+from .metrics import ConsumerMetrics, LabelValues
+from fast_kafka_api._components.retries import (
+    OnFailure,
+    RetryPolicy,
+    call_with_retries,
+    call_with_retries_sync,
+)
+from .serialization import Deserializer, get_deserializer
+from fast_kafka_api._components.tracing import (
+    Tracer,
+    get_record_attributes,
+    record_stages,
+)
 
 # %% ../../nbs/001_ConsumerLoop.ipynb 6
 logger = get_logger(__name__)
 
 # %% ../../nbs/001_ConsumerLoop.ipynb 10
+def _accepts_meta(callback: Callable[..., Any]) -> bool:
+    """Returns True if the callback has a parameter named **meta** for receiving `EventMetadata`"""
+    try:
+        return "meta" in signature(callback).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _safe_on_failure(
+    on_failure_f: OnFailure,
+    records: List[ConsumerRecord],
+    e: BaseException,
+    *,
+    retriable: bool,
+) -> None:
+    try:
+        on_failure_f(records, e, retriable)
+    except Exception as on_failure_e:
+        logger.warning(
+            f"process_msgs(): exception caught {on_failure_e.__repr__()} while calling '{on_failure_f}'"
+        )
+
+
+def _deserialize_records(
+    deserialize: Deserializer,
+    records: List[ConsumerRecord],
+    *,
+    on_failure_f: Optional[OnFailure],
+) -> Tuple[List[Any], List[int]]:
+    """Deserializes values of records, returns decoded messages and indices of records they were decoded from
+
+    If deserialization of all the records at once fails and **on_failure_f** is set, records are deserialized
+    one by one and the ones which cannot be deserialized are passed to **on_failure_f**.
+    """
+    try:
+        return deserialize([record.value for record in records]), list(
+            range(len(records))
+        )
+    except Exception as e:
+        if on_failure_f is None:
+            raise e
+
+    decoded_msgs: List[Any] = []
+    decoded_ixs: List[int] = []
+    for i, record in enumerate(records):
+        try:
+            decoded_msgs.extend(deserialize([record.value]))
+            decoded_ixs.append(i)
+        except Exception as e:
+            logger.warning(
+                f"process_msgs(): exception caught {e.__repr__()} while deserializing message from topic='{record.topic}', partition='{record.partition}' and offset='{record.offset}'"
+            )
+            _safe_on_failure(on_failure_f, [record], e, retriable=False)
+    return decoded_msgs, decoded_ixs
+
+
+PreparedCallback = Callable[[Tuple[Any, Any, List[ConsumerRecord]]], Awaitable[None]]
+"""Coroutine function called by workers with a decoded message, its metadata and the records it was decoded from"""
+
+
+def _call_sync(callback: Callable[..., None], msg: Any, meta: Any) -> None:
+    if meta is None:
+        callback(msg)
+    else:
+        callback(msg, meta=meta)
+
+
+def _prepare_callback(
+    callback: Callable[..., Union[None, Awaitable[None]]],
+    *,
+    executor: Optional[concurrent.futures.Executor] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    on_failure_f: Optional[OnFailure] = None,
+    delay_ms: Optional[int] = None,
+    metrics: Optional[ConsumerMetrics] = None,
+    topic: str = "",
+    tracer: Optional[Tracer] = None,
+) -> PreparedCallback:
+    """Wraps the callback into a coroutine function once, instead of wrapping it for every message
+
+    Params:
+        callback: a coroutine or a regular function called with a decoded message and, if it has
+            a parameter named **meta**, with its `EventMetadata`
+        executor: executor regular functions are called in, if None the default executor of the event loop is used
+        retry_policy: policy for retrying the callback in-process, if None the callback is not retried
+        on_failure_f: function called with records for which the callback failed even after retries
+        delay_ms: if set, the callback is called only after this many milliseconds passed since the timestamp of the records
+        metrics: metrics updated with the latency of the callback and the number of failed messages
+        topic: topic the callback consumes, used as the label of **metrics**
+        tracer: tracer recording the time the records waited for a worker and running the callback in a span,
+            which is passed to the thread as well for regular functions
+
+    Returns:
+        A coroutine function called with tuples of a decoded message, its metadata (None if the callback
+        does not accept it) and the records it was decoded from. If **tracer** is set, it accepts the time
+        the item was dispatched to workers as the keyword argument **dispatched_ns**.
+    """
+    if iscoroutinefunction(callback):
+
+        async def call(item: Tuple[Any, Any, List[ConsumerRecord]]) -> None:
+            msg, meta, _ = item
+            if meta is None:
+                await callback(msg)  # type: ignore
+            else:
+                await callback(msg, meta=meta)  # type: ignore
+
+    elif tracer is None:
+
+        async def call(item: Tuple[Any, Any, List[ConsumerRecord]]) -> None:
+            msg, meta, _ = item
+            await asyncio.get_running_loop().run_in_executor(
+                executor, _call_sync, callback, msg, meta
+            )
+
+    else:
+
+        async def call(item: Tuple[Any, Any, List[ConsumerRecord]]) -> None:
+            msg, meta, _ = item
+            # messages produced by the callback carry the context of the current span
+            await asyncio.get_running_loop().run_in_executor(
+                executor,
+                contextvars.copy_context().run,
+                _call_sync,
+                callback,
+                msg,
+                meta,
+            )
+
+    # children of metrics are looked up once per callback
+    callback_seconds = (
+        metrics.callback_seconds.labels(topic) if metrics is not None else None
+    )
+    failed = metrics.failed.labels(topic) if metrics is not None else None
+
+    async def prepared_callback(item: Tuple[Any, Any, List[ConsumerRecord]]) -> None:
+        msg, _, records = item
+        if delay_ms is not None:
+            due_ms = records[-1].timestamp + delay_ms
+            await asyncio.sleep(max(due_ms - time.time() * 1000, 0) / 1000)
+        start = time.perf_counter()
+        try:
+            await call_with_retries(call, item, retry_policy=retry_policy)
+        except Exception as e:
+            logger.warning(
+                f"process_msgs(): exception caugth {e.__repr__()} while awaiting '{callback}({msg})'"
+            )
+            if failed is not None:
+                failed.inc(len(records))
+            if on_failure_f is not None:
+                _safe_on_failure(on_failure_f, records, e, retriable=True)
+        if callback_seconds is not None:
+            callback_seconds.observe(time.perf_counter() - start)
+
+    if tracer is None:
+        return prepared_callback
+
+    async def traced_callback(
+        item: Tuple[Any, Any, List[ConsumerRecord]],
+        *,
+        dispatched_ns: Optional[int] = None,
+    ) -> None:
+        _, _, records = item
+        if dispatched_ns is not None:
+            record_stages(
+                tracer,
+                "queue",
+                records,
+                start_ns=dispatched_ns,
+                end_ns=time.time_ns(),
+            )
+        # a batch continues the trace of its first record
+        with tracer.start_span(
+            "handle",
+            kind="consumer",
+            attributes=get_record_attributes(records[0]),
+            headers=records[0].headers,
+        ):
+            await prepared_callback(item)
+
+    return traced_callback
+
+
 async def process_msgs(  # type: ignore
     *,
     msgs: Dict[TopicPartition, List[ConsumerRecord]],
     callbacks: Dict[str, Callable[[BaseModel], Union[None, Awaitable[None]]]],
-    msg_types: Dict[str, Type[BaseModel]],
+    msg_types: Dict[str, Type[Any]],
     process_f: Callable[
         [Tuple[Callable[[BaseModel], Awaitable[None]], BaseModel]], Awaitable[None]
     ],
+    max_batch_size: Optional[int] = None,
+    deserializers: Optional[Dict[str, Deserializer]] = None,
+    filter_f: Optional[Callable[[EventMetadata], bool]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    on_failure_f: Optional[OnFailure] = None,
+    delay_ms: Optional[int] = None,
+    prepared_callbacks: Optional[Dict[str, PreparedCallback]] = None,
+    metrics: Optional[ConsumerMetrics] = None,
+    tracer: Optional[Tracer] = None,
 ) -> None:
     """For each messages **msg** in **msgs**, calls process_f with callbacks[topic] and **msgs**.
 
+    If the message type of a topic is `List[T]`, messages from each topic partition are decoded as **T** and
+    passed to the callback in batches instead. If the callback has a parameter named **meta**, `EventMetadata`
+    of the message (or a list of them for batches) is passed to it as well.
+
     Params:
         msgs: a dictionary mapping topic partition to a list of messages, returned by `AIOKafkaConsumer.getmany`.
         callbacks: a dictionary mapping topics into a callback functions.
         msg_types: a dictionary mapping topics into a message type of a message.
         process_f: a stream processing function registrated by `anyio.create_memory_object_stream`
+        max_batch_size: maximum number of messages in a batch, if None all messages from a topic partition are passed in a single batch
+        deserializers: a dictionary mapping topics into functions deserializing raw message values, if None messages are deserialized using pydantic's `parse_raw`
+        filter_f: function called with `EventMetadata` of each message before it is deserialized, messages for which
+            it returns False are skipped. If None, all messages are processed.
+        retry_policy: policy for retrying callbacks in-process, if None callbacks are not retried
+        on_failure_f: function called with records for which the callback failed even after retries, the exception
+            and True, or with records which could not be deserialized, the exception and False. If None, such records are
+            only logged and, if deserialization of a batch fails, the whole batch is dropped.
+        delay_ms: if set, each message is passed to the callback only after this many milliseconds passed since its timestamp
+        prepared_callbacks: a dictionary mapping topics into callbacks wrapped by `_prepare_callback`, which are used instead
+            of wrapping **callbacks** on every call. **retry_policy** and **delay_ms** are ignored for such topics.
+        metrics: metrics updated with the time spent decoding messages and the number of messages which could not be decoded
+        tracer: tracer recording decoding of messages and the time they wait for workers, callbacks in **prepared_callbacks**
+            must be prepared with the same tracer
 
     Todo:
         remove it :)
@@ -46,39 +278,250 @@ async def process_msgs(  # type: ignore
     for topic_partition, topic_msgs in msgs.items():
         topic = topic_partition.topic
         msg_type = msg_types[topic]
+        is_batch = get_origin(msg_type) is list
+        if is_batch:
+            msg_type = get_args(msg_type)[0]
         try:
-            decoded_msgs = [
-                msg_type.parse_raw(msg.value.decode("utf-8")) for msg in topic_msgs
-            ]
-            for msg in decoded_msgs:
-                callback_raw = callbacks[topic]
-                if not iscoroutinefunction(callback_raw):
-                    c: Callable[[BaseModel], None] = callback_raw  # type: ignore
-                    callback: Callable[[BaseModel], Awaitable[None]] = asyncer.asyncify(
-                        c
-                    )
-                else:
-                    callback = callback_raw
-
-                async def safe_callback(
-                    msg: BaseModel,
-                    callback: Callable[[BaseModel], Awaitable[None]] = callback,
-                ) -> None:
-                    try:
-                        #                         logger.debug(f"process_msgs(): awaiting '{callback}({msg})'")
-                        await callback(msg)
-                    except Exception as e:
-                        logger.warning(
-                            f"process_msgs(): exception caugth {e.__repr__()} while awaiting '{callback}({msg})'"
-                        )
+            pass_meta = _accepts_meta(callbacks[topic])
+            callback = (
+                prepared_callbacks[topic]
+                if prepared_callbacks is not None and topic in prepared_callbacks
+                else _prepare_callback(
+                    callbacks[topic],
+                    retry_policy=retry_policy,
+                    on_failure_f=on_failure_f,
+                    delay_ms=delay_ms,
+                    metrics=metrics,
+                    topic=topic,
+                    tracer=tracer,
+                )
+            )
+            metas: List[EventMetadata] = (
+                [EventMetadata.from_record(msg) for msg in topic_msgs]
+                if pass_meta or filter_f is not None
+                else []
+            )
+            if filter_f is not None:
+                is_kept = [filter_f(meta) for meta in metas]
+                topic_msgs = [msg for msg, keep in zip(topic_msgs, is_kept) if keep]
+                metas = [meta for meta, keep in zip(metas, is_kept) if keep]
+                if not topic_msgs:
+                    continue
 
-                await process_f((safe_callback, msg))
+            deserialize = (
+                deserializers[topic]
+                if deserializers is not None
+                else get_deserializer("json", msg_type)
+            )
+            start = time.perf_counter()
+            start_ns = time.time_ns() if tracer is not None else 0
+            decoded_msgs, decoded_ixs = _deserialize_records(
+                deserialize, topic_msgs, on_failure_f=on_failure_f
+            )
+            if tracer is not None:
+                record_stages(
+                    tracer,
+                    "decode",
+                    topic_msgs,
+                    start_ns=start_ns,
+                    end_ns=time.time_ns(),
+                )
+            if metrics is not None:
+                metrics.decode_seconds.labels(topic).observe(
+                    time.perf_counter() - start
+                )
+                if len(decoded_ixs) < len(topic_msgs):
+                    metrics.failed.labels(topic).inc(len(topic_msgs) - len(decoded_ixs))
+            if len(decoded_ixs) < len(topic_msgs):
+                topic_msgs = [topic_msgs[i] for i in decoded_ixs]
+                metas = [metas[i] for i in decoded_ixs] if metas else metas
+            if is_batch:
+                batch_size = (
+                    max_batch_size if max_batch_size else max(len(decoded_msgs), 1)
+                )
+                items: List[Any] = [
+                    decoded_msgs[i : i + batch_size]
+                    for i in range(0, len(decoded_msgs), batch_size)
+                ]
+                meta_items: List[Any] = [
+                    metas[i : i + batch_size] for i in range(0, len(metas), batch_size)
+                ]
+                record_items = [
+                    topic_msgs[i : i + batch_size]
+                    for i in range(0, len(topic_msgs), batch_size)
+                ]
+            else:
+                items = decoded_msgs
+                meta_items = metas
+                record_items = [[record] for record in topic_msgs]
+            for i, msg in enumerate(items):
+                await process_f(
+                    (
+                        callback
+                        if tracer is None
+                        else functools.partial(callback, dispatched_ns=time.time_ns()),
+                        (msg, meta_items[i] if pass_meta else None, record_items[i]),
+                    )
+                )
         except Exception as e:
             logger.warning(
                 f"process_msgs(): Unexpected exception '{e.__repr__()}' caught and ignored for topic='{topic_partition.topic}', partition='{topic_partition.partition}' and messages: {topic_msgs}"
             )
 
-# %% ../../nbs/001_ConsumerLoop.ipynb 17
+# %% ../../nbs/001_ConsumerLoop.ipynb 22
+@functools.lru_cache(maxsize=None)
+def _get_worker_deserializer(
+    deserializer: Union[str, Callable[[bytes], Any]], msg_type: Type[Any]
+) -> Deserializer:
+    """Returns a deserializer, created once per worker process"""
+    return get_deserializer(deserializer, msg_type)
+
+
+def _process_in_worker(
+    callback: Callable[..., None],
+    values: List[bytes],
+    metas: Optional[List[EventMetadata]],
+    *,
+    deserializer: Union[str, Callable[[bytes], Any]],
+    msg_type: Type[Any],
+    max_batch_size: Optional[int],
+    retry_policy: Optional[RetryPolicy],
+) -> List[Tuple[List[int], str, bool]]:
+    """Deserializes raw message values and calls the callback with them, runs in a worker process
+
+    Returns:
+        failures as tuples of indices of failed values, the representation of the exception and
+        a flag telling if the messages should be retried
+    """
+    is_batch = get_origin(msg_type) is list
+    deserialize = _get_worker_deserializer(
+        deserializer, get_args(msg_type)[0] if is_batch else msg_type
+    )
+    failures: List[Tuple[List[int], str, bool]] = []
+    try:
+        decoded_msgs = deserialize(values)
+        decoded_ixs = list(range(len(values)))
+    except Exception:
+        decoded_msgs, decoded_ixs = [], []
+        for i, value in enumerate(values):
+            try:
+                decoded_msgs.extend(deserialize([value]))
+                decoded_ixs.append(i)
+            except Exception as e:
+                failures.append(([i], e.__repr__(), False))
+
+    if is_batch:
+        batch_size = max_batch_size if max_batch_size else max(len(decoded_msgs), 1)
+        chunks = [
+            (decoded_msgs[i : i + batch_size], decoded_ixs[i : i + batch_size])
+            for i in range(0, len(decoded_msgs), batch_size)
+        ]
+    else:
+        chunks = [(msg, [i]) for msg, i in zip(decoded_msgs, decoded_ixs)]
+
+    for msg, ixs in chunks:
+        f = callback
+        if metas is not None:
+            f = functools.partial(
+                callback, meta=[metas[i] for i in ixs] if is_batch else metas[ixs[0]]
+            )
+        try:
+            call_with_retries_sync(f, msg, retry_policy=retry_policy)
+        except Exception as e:
+            failures.append((ixs, e.__repr__(), True))
+    return failures
+
+
+async def process_msgs_in_executor(  # type: ignore
+    *,
+    msgs: Dict[TopicPartition, List[ConsumerRecord]],
+    callbacks: Dict[str, Callable[..., None]],
+    msg_types: Dict[str, Type[Any]],
+    process_f: Callable[
+        [Tuple[Callable[[Any], Awaitable[None]], Any]], Awaitable[None]
+    ],
+    executor: concurrent.futures.Executor,
+    deserializer: Union[str, Callable[[bytes], Any]] = "json",
+    max_batch_size: Optional[int] = None,
+    filter_f: Optional[Callable[[EventMetadata], bool]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    on_failure_f: Optional[OnFailure] = None,
+    delay_ms: Optional[int] = None,
+) -> None:
+    """For each topic partition in **msgs**, calls process_f with a function running its callback in the executor
+
+    Raw message values of a topic partition are sent to the executor together, where they are deserialized and
+    passed to the callback, so both deserialization and the callback run outside of the event loop.
+    Callbacks must be regular functions which can be pickled, e.g. defined at the module level.
+
+    Params:
+        msgs: a dictionary mapping topic partition to a list of messages, returned by `AIOKafkaConsumer.getmany`.
+        callbacks: a dictionary mapping topics into a callback functions.
+        msg_types: a dictionary mapping topics into a message type of a message.
+        process_f: a stream processing function registrated by `anyio.create_memory_object_stream`
+        executor: executor running deserialization and callbacks, e.g. `concurrent.futures.ProcessPoolExecutor`
+        deserializer: deserializer used for all topics, see `get_deserializer` for details
+        max_batch_size: maximum number of messages in a batch, if None all messages from a topic partition are passed in a single batch
+        filter_f: function called with `EventMetadata` of each message before it is sent to the executor,
+            messages for which it returns False are skipped
+        retry_policy: policy for retrying callbacks in the executor, if None callbacks are not retried
+        on_failure_f: function called with records which failed, see `process_msgs` for details
+        delay_ms: if set, messages are sent to the executor only after this many milliseconds passed since their timestamps
+    """
+    for topic_partition, topic_msgs in msgs.items():
+        topic = topic_partition.topic
+        callback = callbacks[topic]
+        pass_meta = _accepts_meta(callback)
+        metas = (
+            [EventMetadata.from_record(msg) for msg in topic_msgs]
+            if pass_meta or filter_f is not None
+            else []
+        )
+        if filter_f is not None:
+            is_kept = [filter_f(meta) for meta in metas]
+            topic_msgs = [msg for msg, keep in zip(topic_msgs, is_kept) if keep]
+            metas = [meta for meta, keep in zip(metas, is_kept) if keep]
+            if not topic_msgs:
+                continue
+
+        work = functools.partial(
+            _process_in_worker,
+            callback,
+            [msg.value for msg in topic_msgs],
+            metas if pass_meta else None,
+            deserializer=deserializer,
+            msg_type=msg_types[topic],
+            max_batch_size=max_batch_size,
+            retry_policy=retry_policy,
+        )
+
+        async def run_in_executor(
+            records: List[ConsumerRecord], work: Callable[[], Any] = work
+        ) -> None:
+            if delay_ms is not None:
+                due_ms = records[-1].timestamp + delay_ms
+                await asyncio.sleep(max(due_ms - time.time() * 1000, 0) / 1000)
+            try:
+                failures = await asyncio.get_running_loop().run_in_executor(
+                    executor, work
+                )
+            except Exception as e:
+                failures = [(list(range(len(records))), e.__repr__(), True)]
+            for ixs, e_repr, retriable in failures:
+                logger.warning(
+                    f"process_msgs_in_executor(): exception caught {e_repr} while processing messages from topic='{records[0].topic}' and partition='{records[0].partition}'"
+                )
+                if on_failure_f is not None:
+                    _safe_on_failure(
+                        on_failure_f,
+                        [records[i] for i in ixs],
+                        RuntimeError(e_repr),
+                        retriable=retriable,
+                    )
+
+        await process_f((run_in_executor, topic_msgs))
+
+# %% ../../nbs/001_ConsumerLoop.ipynb 24
 async def process_message_callback(
     receive_stream: MemoryObjectReceiveStream[Any],
 ) -> None:
@@ -87,45 +530,547 @@ async def process_message_callback(
             await callback(msg)
 
 
+def _get_worker_index(
+    topic_partition: TopicPartition,
+    *,
+    assignments: Dict[TopicPartition, int],
+    concurrency: int,
+) -> int:
+    """Assigns topic partitions to workers in round-robin fashion.
+
+    Once assigned, a topic partition is always processed by the same worker, which preserves the ordering of messages within it.
+    """
+    if topic_partition not in assignments:
+        assignments[topic_partition] = len(assignments) % concurrency
+    return assignments[topic_partition]
+
+
+async def _getmany(  # type: ignore
+    consumer: AIOKafkaConsumer,
+    *,
+    timeout_ms: int,
+    max_batch_size: Optional[int] = None,
+    max_batch_wait_ms: Optional[int] = None,
+) -> Dict[TopicPartition, List[ConsumerRecord]]:
+    """Polls messages from the consumer
+
+    If **max_batch_wait_ms** is set, polling is repeated until **max_batch_size** messages are received
+    or **max_batch_wait_ms** milliseconds pass, whichever comes first. If polling is cancelled after some
+    messages were received, they are returned instead of being lost, because their positions already advanced.
+    """
+    msgs = await consumer.getmany(timeout_ms=timeout_ms)
+    if max_batch_wait_ms is None:
+        return msgs  # type: ignore
+
+    deadline = time.monotonic() + max_batch_wait_ms / 1000
+    while max_batch_size is None or sum(map(len, msgs.values())) < max_batch_size:
+        remaining_ms = int((deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            break
+        try:
+            more_msgs = await consumer.getmany(timeout_ms=min(timeout_ms, remaining_ms))
+        except anyio.get_cancelled_exc_class():
+            if not msgs:
+                raise
+            # the cancellation is delivered again by the next unshielded await of the caller
+            break
+        for topic_partition, topic_msgs in more_msgs.items():
+            msgs[topic_partition] = msgs.get(topic_partition, []) + topic_msgs
+
+    return msgs  # type: ignore
+
+
+class _OffsetWatermarks:
+    """Tracks offsets of messages whose callbacks completed and commits them in a single call
+
+    Only offsets of partitions assigned to the consumer are committed, offsets of revoked partitions are dropped.
+    """
+
+    def __init__(self) -> None:
+        self.completed: Dict[TopicPartition, int] = {}
+        self.committed: Dict[TopicPartition, int] = {}
+        self.num_uncommitted = 0
+        self.last_commit_time = time.monotonic()
+
+    async def mark_completed(
+        self, topic_partition: TopicPartition, offset_and_count: Tuple[int, int]
+    ) -> None:
+        """Called by a worker after callbacks for messages up to the offset completed"""
+        offset, count = offset_and_count
+        self.completed[topic_partition] = offset
+        self.num_uncommitted += count
+
+    def should_commit(
+        self, *, commit_every: Optional[int], commit_interval_ms: Optional[int]
+    ) -> bool:
+        if commit_every is not None and self.num_uncommitted >= commit_every:
+            return True
+        if commit_interval_ms is None:
+            return commit_every is None
+        return (time.monotonic() - self.last_commit_time) * 1000 >= commit_interval_ms
+
+    def revoke(self, topic_partitions: Iterable[TopicPartition]) -> None:
+        """Drops offsets of partitions which are no longer assigned to the consumer"""
+        for topic_partition in topic_partitions:
+            self.completed.pop(topic_partition, None)
+            self.committed.pop(topic_partition, None)
+
+    async def commit(
+        self,
+        consumer: AIOKafkaConsumer,
+        topic_partitions: Optional[Iterable[TopicPartition]] = None,
+    ) -> None:
+        """Commits offsets completed since the last commit for **topic_partitions**, or for all partitions if None"""
+        # markers of messages polled before a rebalance can complete after their partitions were revoked
+        assignment = set(consumer.assignment())
+        self.revoke(set(self.completed) - assignment)
+        offsets = {
+            tp: offset
+            for tp, offset in self.completed.items()
+            if self.committed.get(tp) != offset
+            and (topic_partitions is None or tp in topic_partitions)
+        }
+        if topic_partitions is None:
+            self.num_uncommitted = 0
+            self.last_commit_time = time.monotonic()
+        if not offsets:
+            return
+        try:
+            await consumer.commit(offsets)
+            self.committed.update(offsets)
+        except Exception as e:
+            logger.warning(
+                f"_OffsetWatermarks.commit(): exception caught {e.__repr__()} while committing offsets {offsets}"
+            )
+
+
+class _CommitOnRevoke(ConsumerRebalanceListener):
+    """Commits completed offsets of partitions before they are revoked from the consumer and drops them afterwards
+
+    Messages of revoked partitions still being processed are delivered again to their new consumer.
+    """
+
+    def __init__(
+        self, consumer: AIOKafkaConsumer, watermarks: _OffsetWatermarks
+    ) -> None:
+        self.consumer = consumer
+        self.watermarks = watermarks
+
+    async def on_partitions_revoked(self, revoked: Set[TopicPartition]) -> None:
+        await self.watermarks.commit(self.consumer, revoked)
+        self.watermarks.revoke(revoked)
+
+    async def on_partitions_assigned(self, assigned: Set[TopicPartition]) -> None:
+        pass
+
+
+def _get_record_size(record: ConsumerRecord) -> int:
+    return (len(record.key) if record.key is not None else 0) + (
+        len(record.value) if record.value is not None else 0
+    )
+
+
+class _BufferedBytes:
+    """Tracks payload bytes of polled messages not processed yet and pauses fetching when there are too many of them"""
+
+    def __init__(
+        self,
+        consumer: AIOKafkaConsumer,
+        *,
+        max_buffered_bytes: int,
+        resume_buffered_bytes: int,
+    ) -> None:
+        self.consumer = consumer
+        self.max_buffered_bytes = max_buffered_bytes
+        self.resume_buffered_bytes = resume_buffered_bytes
+        self.buffered_bytes = 0
+        self.paused: Set[TopicPartition] = set()
+
+    def add(self, num_bytes: int) -> None:
+        """Called by the loop for polled messages before they are dispatched"""
+        self.buffered_bytes += num_bytes
+        if self.buffered_bytes >= self.max_buffered_bytes:
+            # partitions assigned while paused are paused as well
+            topic_partitions = set(self.consumer.assignment()) - self.paused
+            if topic_partitions:
+                logger.info(
+                    f"_BufferedBytes.add(): {self.buffered_bytes} bytes buffered, pausing {topic_partitions}"
+                )
+                self.consumer.pause(*topic_partitions)
+                self.paused |= topic_partitions
+
+    async def release(self, num_bytes: int) -> None:
+        """Called by a worker after dispatched messages were processed"""
+        self.buffered_bytes -= num_bytes
+        if self.paused and self.buffered_bytes <= self.resume_buffered_bytes:
+            # partitions could have been revoked while paused
+            topic_partitions = self.paused & set(self.consumer.assignment())
+            logger.info(
+                f"_BufferedBytes.release(): {self.buffered_bytes} bytes buffered, resuming {topic_partitions}"
+            )
+            self.consumer.resume(*topic_partitions)
+            self.paused = set()
+
+
+def _get_lag(  # type: ignore
+    consumer: AIOKafkaConsumer, *, positions: Dict[TopicPartition, int]
+) -> Dict[LabelValues, float]:
+    """Returns the lag of partitions from which messages were polled, partitions with unknown high watermarks are skipped"""
+    lag: Dict[LabelValues, float] = {}
+    for topic_partition, position in list(positions.items()):
+        highwater = consumer.highwater(topic_partition)
+        if highwater is not None:
+            lag[(topic_partition.topic, str(topic_partition.partition))] = max(
+                highwater - position, 0
+            )
+    return lag
+
+
+async def _cancel_on_event(
+    event: anyio.Event,
+    scope: anyio.CancelScope,
+    *,
+    task_status: TaskStatus = anyio.TASK_STATUS_IGNORED,
+) -> None:
+    """Cancels the scope when the event is set, the scope of waiting for the event is passed to `task_status.started`"""
+    with anyio.CancelScope() as waiting_scope:
+        task_status.started(waiting_scope)
+        await event.wait()
+        scope.cancel()
+
+
 async def _aiokafka_consumer_loop(  # type: ignore
     consumer: AIOKafkaConsumer,
     *,
     callbacks: Dict[str, Callable[[BaseModel], Union[None, Awaitable[None]]]],
     timeout_ms: int = 100,
     max_buffer_size: int = 10_000,
-    msg_types: Dict[str, Type[BaseModel]],
-    is_shutting_down_f: Callable[[], bool],
+    concurrency: int = 1,
+    ordering: str = "partition",
+    max_batch_size: Optional[int] = None,
+    max_batch_wait_ms: Optional[int] = None,
+    msg_types: Dict[str, Type[Any]],
+    deserializers: Optional[Dict[str, Deserializer]] = None,
+    filter_f: Optional[Callable[[EventMetadata], bool]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    on_failure_f: Optional[OnFailure] = None,
+    delay_ms: Optional[int] = None,
+    executor: str = "thread",
+    workers: Optional[int] = None,
+    deserializer: Union[str, Callable[[bytes], Any]] = "json",
+    commit: str = "auto",
+    commit_every: Optional[int] = None,
+    commit_interval_ms: Optional[int] = 1_000,
+    max_buffered_bytes: Optional[int] = None,
+    resume_buffered_bytes: Optional[int] = None,
+    drain_timeout_ms: Optional[int] = None,
+    shutdown_event: Optional[anyio.Event] = None,
+    is_shutting_down_f: Optional[Callable[[], bool]] = None,
+    metrics: Optional[ConsumerMetrics] = None,
+    tracer: Optional[Tracer] = None,
+    watermarks: Optional[_OffsetWatermarks] = None,
 ) -> None:
-    """Write docs
+    """Polls messages from the consumer and dispatches them to callbacks using a pool of **concurrency** workers
 
-    Todo: add batch size if needed
+    Params:
+        consumer: a started and subscribed AIOKafkaConsumer
+        callbacks: a dictionary mapping topics into a callback functions
+        timeout_ms: timeout in milliseconds passed to `AIOKafkaConsumer.getmany`
+        max_buffer_size: maximum number of messages buffered for each worker
+        concurrency: number of workers awaiting callbacks concurrently
+        ordering: if "partition", messages from the same topic partition are always processed by
+            the same worker in the order they were received. If "none", messages are processed by the first
+            available worker and no ordering is guaranteed.
+        max_batch_size: maximum number of messages passed to callbacks consuming batches of messages
+        max_batch_wait_ms: maximum time in milliseconds to wait for **max_batch_size** messages to be polled
+        msg_types: a dictionary mapping topics into a message type of a message
+        deserializers: a dictionary mapping topics into functions deserializing raw message values
+        filter_f: function called with `EventMetadata` of each message before it is deserialized,
+            messages for which it returns False are skipped
+        retry_policy: policy for retrying callbacks in-process, if None callbacks are not retried
+        on_failure_f: function called with records which failed, see `process_msgs` for details
+        delay_ms: if set, messages are passed to callbacks only after this many milliseconds passed since their timestamps
+        executor: where regular functions passed as callbacks are called
+            "thread": in a dedicated pool of **workers** threads, coroutines are awaited in the event loop
+            "process": raw messages are deserialized and passed to callbacks in a pool of **workers** processes,
+                see `process_msgs_in_executor` for details
+        workers: number of threads or processes in the pool used by **executor**. If set, **concurrency** is increased
+            to **workers** to keep all of them busy. If None, the default size of `concurrent.futures.ThreadPoolExecutor`
+            is used for threads and the number of CPUs for processes.
+        deserializer: deserializer used by worker processes if **executor** is "process", see `get_deserializer` for details
+        commit: offset commit strategy, the consumer must be created with auto commit disabled unless it is "auto"
+            "auto": offsets are committed periodically by the consumer itself, regardless of the callbacks
+            "at_most_once": offsets of polled messages are committed before they are passed to callbacks,
+                messages are skipped if the commit fails because they can be delivered again
+            "at_least_once": offsets are committed after callbacks for all previous messages in the
+                partition completed, which requires ordering "partition" if **concurrency** is larger than 1
+        commit_every: if **commit** is "at_least_once", offsets are committed after callbacks for this many messages completed
+        commit_interval_ms: if **commit** is "at_least_once", offsets are committed at least every this many milliseconds.
+            If both **commit_every** and **commit_interval_ms** are None, offsets are committed after every poll.
+        max_buffered_bytes: if set, fetching from all assigned partitions is paused when payloads (keys and values) of
+            polled messages not yet processed take at least this many bytes. This bounds memory used by large messages,
+            while **max_buffer_size** only bounds their number.
+        resume_buffered_bytes: fetching is resumed when payloads of polled messages not yet processed take at most
+            this many bytes, if None half of **max_buffered_bytes** is used
+        drain_timeout_ms: maximum time in milliseconds to wait for callbacks of messages polled before the loop
+            stopped, callbacks still running after it are cancelled. The final commit of offsets is given the same
+            amount of time. If None, the loop waits for all of them.
+        shutdown_event: event stopping the loop when set, a pending poll is interrupted right away so
+            a long **timeout_ms** does not delay the shutdown
+        is_shutting_down_f: function returning **True** when the loop should stop, checked after each poll
+        metrics: metrics updated with the number of consumed messages, decode and callback times, the number of items
+            waiting in memory streams and the lag of assigned partitions
+        tracer: tracer recording polling, decoding, waiting for workers and handling of each message, see `Tracer`.
+            If **executor** is "process", only polling is recorded.
+        watermarks: offsets tracked if **commit** is "at_least_once", passed by the caller to share them with
+            the rebalance listener of the consumer, see `_CommitOnRevoke`. If None, they are created by the loop.
     """
-    send_stream, receive_stream = anyio.create_memory_object_stream(
-        max_buffer_size=max_buffer_size
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be a positive integer, got {concurrency}")
+    if ordering not in ["partition", "none"]:
+        raise ValueError(
+            f"ordering must be one of ['partition', 'none'], but it is '{ordering}'."
+        )
+    if commit not in ["auto", "at_most_once", "at_least_once"]:
+        raise ValueError(
+            f"commit must be one of ['auto', 'at_most_once', 'at_least_once'], but it is '{commit}'."
+        )
+    if executor not in ["thread", "process"]:
+        raise ValueError(
+            f"executor must be one of ['thread', 'process'], but it is '{executor}'."
+        )
+    if executor == "process":
+        coroutines = [t for t, f in callbacks.items() if iscoroutinefunction(f)]
+        if coroutines:
+            raise ValueError(
+                f"executor 'process' requires regular functions as callbacks, but callbacks for topics {coroutines} are coroutines."
+            )
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers is not None:
+        concurrency = max(concurrency, workers)
+    if max_buffered_bytes is not None:
+        if resume_buffered_bytes is None:
+            resume_buffered_bytes = max_buffered_bytes // 2
+        if not 0 <= resume_buffered_bytes < max_buffered_bytes:
+            raise ValueError(
+                f"resume_buffered_bytes must be non-negative and smaller than max_buffered_bytes, but it is '{resume_buffered_bytes}'."
+            )
+    if commit == "at_least_once" and ordering == "none" and concurrency > 1:
+        raise ValueError(
+            "commit 'at_least_once' requires ordering 'partition' if concurrency is larger than 1."
+        )
+
+    num_streams = concurrency if ordering == "partition" else 1
+    streams = [
+        anyio.create_memory_object_stream(max_buffer_size=max_buffer_size)
+        for _ in range(num_streams)
+    ]
+    send_streams = [send_stream for send_stream, _ in streams]
+    assignments: Dict[TopicPartition, int] = {}
+    watermarks = watermarks if watermarks is not None else _OffsetWatermarks()
+    buffered_bytes = (
+        _BufferedBytes(
+            consumer,
+            max_buffered_bytes=max_buffered_bytes,
+            resume_buffered_bytes=resume_buffered_bytes,  # type: ignore
+        )
+        if max_buffered_bytes is not None
+        else None
     )
-    async with anyio.create_task_group() as tg:
-        tg.start_soon(process_message_callback, receive_stream)
-        async with send_stream:
-            while not is_shutting_down_f():
-                msgs = await consumer.getmany(timeout_ms=timeout_ms)
-                try:
-                    await process_msgs(
-                        msgs=msgs,
-                        callbacks=callbacks,
-                        msg_types=msg_types,
-                        process_f=send_stream.send,
+    # offsets of the next messages to be polled, used for computing the lag
+    positions: Dict[TopicPartition, int] = {}  # type: ignore
+
+    with contextlib.ExitStack() as executor_stack:
+        if metrics is not None:
+            # gauges are read only when metrics are rendered
+            metrics_key = object()
+            metrics.queue_depth.set_function(
+                metrics_key,
+                lambda: {
+                    (",".join(sorted(callbacks.keys())),): sum(
+                        s.statistics().current_buffer_used for s in send_streams
                     )
-                except Exception as e:
-                    logger.warning(
-                        f"_aiokafka_consumer_loop(): Unexpected exception '{e}' caught and ignored for messages: {msgs}"
+                },
+            )
+            metrics.lag.set_function(
+                metrics_key, lambda: _get_lag(consumer, positions=positions)
+            )
+            executor_stack.callback(metrics.queue_depth.remove_function, metrics_key)
+            executor_stack.callback(metrics.lag.remove_function, metrics_key)
+
+        dispatch_f: Callable[..., Awaitable[None]]
+        if executor == "process":
+            pool = executor_stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+            )
+            dispatch_f = functools.partial(
+                process_msgs_in_executor, executor=pool, deserializer=deserializer
+            )
+        else:
+            thread_pool = (
+                executor_stack.enter_context(
+                    concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+                )
+                if not all(iscoroutinefunction(f) for f in callbacks.values())
+                else None
+            )
+            # callbacks are wrapped once here instead of for every message
+            prepared_callbacks = {
+                topic: _prepare_callback(
+                    callback,
+                    executor=thread_pool,
+                    retry_policy=retry_policy,
+                    on_failure_f=on_failure_f,
+                    delay_ms=delay_ms,
+                    metrics=metrics,
+                    topic=topic,
+                    tracer=tracer,
+                )
+                for topic, callback in callbacks.items()
+            }
+            dispatch_f = functools.partial(
+                process_msgs,
+                deserializers=deserializers,
+                prepared_callbacks=prepared_callbacks,
+                metrics=metrics,
+                tracer=tracer,
+            )
+
+        async with anyio.create_task_group() as tg:
+            for _, receive_stream in streams:
+                for _ in range(concurrency // num_streams):
+                    tg.start_soon(process_message_callback, receive_stream.clone())
+                await receive_stream.aclose()
+            async with contextlib.AsyncExitStack() as stack:
+                for send_stream in send_streams:
+                    await stack.enter_async_context(send_stream)
+                with anyio.CancelScope() as poll_scope:
+                    waiting_scope = (
+                        await tg.start(_cancel_on_event, shutdown_event, poll_scope)
+                        if shutdown_event is not None
+                        else None
                     )
+                    while is_shutting_down_f is None or not is_shutting_down_f():
+                        poll_start_ns = time.time_ns() if tracer is not None else 0
+                        msgs = await _getmany(
+                            consumer,
+                            timeout_ms=timeout_ms,
+                            max_batch_size=max_batch_size,
+                            max_batch_wait_ms=max_batch_wait_ms,
+                        )
+                        if tracer is not None and msgs:
+                            poll_end_ns = time.time_ns()
+                            for topic_msgs in msgs.values():
+                                record_stages(
+                                    tracer,
+                                    "poll",
+                                    topic_msgs,
+                                    start_ns=poll_start_ns,
+                                    end_ns=poll_end_ns,
+                                )
+                        # the shutdown interrupts polling only, polled messages are always dispatched
+                        with anyio.CancelScope(shield=True):
+                            if commit == "at_most_once" and msgs:
+                                try:
+                                    await consumer.commit(
+                                        {
+                                            tp: tp_msgs[-1].offset + 1
+                                            for tp, tp_msgs in msgs.items()
+                                        }
+                                    )
+                                except Exception as e:
+                                    logger.warning(
+                                        f"_aiokafka_consumer_loop(): exception caught {e.__repr__()} while committing offsets, skipping messages: {msgs}"
+                                    )
+                                    msgs = {}
+                            for topic_partition, topic_msgs in msgs.items():
+                                i = _get_worker_index(
+                                    topic_partition,
+                                    assignments=assignments,
+                                    concurrency=num_streams,
+                                )
+                                if metrics is not None:
+                                    metrics.consumed.labels(topic_partition.topic).inc(
+                                        len(topic_msgs)
+                                    )
+                                    positions[topic_partition] = (
+                                        topic_msgs[-1].offset + 1
+                                    )
+                                if buffered_bytes is not None:
+                                    num_bytes = sum(map(_get_record_size, topic_msgs))
+                                    buffered_bytes.add(num_bytes)
+                                try:
+                                    await dispatch_f(
+                                        msgs={topic_partition: topic_msgs},
+                                        callbacks=callbacks,
+                                        msg_types=msg_types,
+                                        process_f=send_streams[i].send,
+                                        max_batch_size=max_batch_size,
+                                        filter_f=filter_f,
+                                        retry_policy=retry_policy,
+                                        on_failure_f=on_failure_f,
+                                        delay_ms=delay_ms,
+                                    )
+                                except Exception as e:
+                                    logger.warning(
+                                        f"_aiokafka_consumer_loop(): Unexpected exception '{e}' caught and ignored for messages: {topic_msgs}"
+                                    )
+                                # the marker and the release are queued even if dispatching failed, otherwise
+                                # the watermark of the partition would lag behind and fetching could stay paused
+                                if commit == "at_least_once":
+                                    # workers process items in order, so the marker is processed after all the callbacks
+                                    await send_streams[i].send(
+                                        (
+                                            functools.partial(
+                                                watermarks.mark_completed,
+                                                topic_partition,
+                                            ),
+                                            (
+                                                topic_msgs[-1].offset + 1,
+                                                len(topic_msgs),
+                                            ),
+                                        )
+                                    )
+                                if buffered_bytes is not None:
+                                    # with ordering "none", callbacks taken by other workers may still be running at this point
+                                    await send_streams[i].send(
+                                        (buffered_bytes.release, num_bytes)
+                                    )
+                            if commit == "at_least_once" and watermarks.should_commit(
+                                commit_every=commit_every,
+                                commit_interval_ms=commit_interval_ms,
+                            ):
+                                await watermarks.commit(consumer)
+                if waiting_scope is not None:
+                    waiting_scope.cancel()
+            # send streams are closed at this point, workers finish the messages already dispatched
+            if drain_timeout_ms is not None:
+                tg.cancel_scope.deadline = (
+                    anyio.current_time() + drain_timeout_ms / 1000
+                )
+
+        if tg.cancel_scope.cancelled_caught:
+            logger.warning(
+                f"_aiokafka_consumer_loop(): callbacks did not finish in {drain_timeout_ms} ms and were cancelled"
+            )
+
+        if commit == "at_least_once":
+            # commit offsets of messages processed after the last commit, workers are done at this point
+            with anyio.move_on_after(
+                drain_timeout_ms / 1000 if drain_timeout_ms is not None else None
+            ) as commit_scope:
+                await watermarks.commit(consumer)
+            if commit_scope.cancelled_caught:
+                logger.warning(
+                    f"_aiokafka_consumer_loop(): final commit did not finish in {drain_timeout_ms} ms"
+                )
 
-# %% ../../nbs/001_ConsumerLoop.ipynb 19
+# %% ../../nbs/001_ConsumerLoop.ipynb 37
 def sanitize_kafka_config(**kwargs):
     """Sanitize Kafka config"""
     return {k: "*" * len(v) if "pass" in k.lower() else v for k, v in kwargs.items()}
 
-# %% ../../nbs/001_ConsumerLoop.ipynb 21
+# %% ../../nbs/001_ConsumerLoop.ipynb 39
 async def aiokafka_consumer_loop(  # type: ignore
     topics: List[str],
     *,
@@ -134,20 +1079,102 @@ async def aiokafka_consumer_loop(  # type: ignore
     max_poll_records: int = 1_000,
     timeout_ms: int = 100,
     max_buffer_size: int = 10_000,
+    concurrency: int = 1,
+    ordering: str = "partition",
+    max_batch_size: Optional[int] = None,
+    max_batch_wait_ms: Optional[int] = None,
     callbacks: Dict[str, Callable[[BaseModel], Union[None, Awaitable[None]]]],
-    msg_types: Dict[str, Type[BaseModel]],
-    is_shutting_down_f: Callable[[], bool],
+    msg_types: Dict[str, Type[Any]],
+    deserializer: Union[str, Callable[[bytes], Any]] = "json",
+    filter_f: Optional[Callable[[EventMetadata], bool]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    on_failure_f: Optional[OnFailure] = None,
+    delay_ms: Optional[int] = None,
+    executor: str = "thread",
+    workers: Optional[int] = None,
+    commit: str = "auto",
+    commit_every: Optional[int] = None,
+    commit_interval_ms: Optional[int] = 1_000,
+    max_buffered_bytes: Optional[int] = None,
+    resume_buffered_bytes: Optional[int] = None,
+    drain_timeout_ms: Optional[int] = None,
+    shutdown_event: Optional[anyio.Event] = None,
+    is_shutting_down_f: Optional[Callable[[], bool]] = None,
+    start_timeout_ms: Optional[int] = None,
+    start_semaphore: Optional[asyncio.Semaphore] = None,
+    started_event: Optional[anyio.Event] = None,
+    metrics: Optional[ConsumerMetrics] = None,
+    tracer: Optional[Tracer] = None,
     **kwargs,
 ) -> None:
-    """todo: write docs"""
+    """Creates an AIOKafkaConsumer, subscribes it to **topics** and dispatches received messages to **callbacks**
+
+    Params:
+        topics: a list of topics to subscribe to
+        bootstrap_servers: a list of Kafka brokers
+        auto_offset_reset: offset reset policy passed to AIOKafkaConsumer
+        max_poll_records: maximum number of records returned in a single call to `getmany`
+        timeout_ms: timeout in milliseconds passed to `AIOKafkaConsumer.getmany`
+        max_buffer_size: maximum number of messages buffered for each worker
+        concurrency: number of workers awaiting callbacks concurrently
+        ordering: "partition" to preserve ordering of messages within a topic partition, "none" otherwise
+        max_batch_size: maximum number of messages passed to callbacks consuming batches of messages
+        max_batch_wait_ms: maximum time in milliseconds to wait for **max_batch_size** messages to be polled
+        callbacks: a dictionary mapping topics into a callback functions
+        msg_types: a dictionary mapping topics into a message type of a message
+        deserializer: deserializer used for all topics, see `get_deserializer` for details
+        filter_f: function called with `EventMetadata` of each message before it is deserialized,
+            messages for which it returns False are skipped
+        retry_policy: policy for retrying callbacks in-process, if None callbacks are not retried
+        on_failure_f: function called with records which failed, see `process_msgs` for details
+        delay_ms: if set, messages are passed to callbacks only after this many milliseconds passed since their timestamps
+        executor: "thread" to call regular functions in a dedicated pool of **workers** threads, or "process" to
+            deserialize messages and pass them to callbacks in a pool of **workers** processes,
+            see `_aiokafka_consumer_loop` for details
+        workers: number of threads or processes in the pool used by **executor**
+        commit: offset commit strategy, one of "auto", "at_most_once" or "at_least_once", see `_aiokafka_consumer_loop`
+            for details. Auto commit of the consumer is disabled unless it is "auto", other strategies require **group_id**.
+            If "at_least_once", completed offsets of partitions are committed before they are revoked by a rebalance.
+        commit_every: if **commit** is "at_least_once", offsets are committed after callbacks for this many messages completed
+        commit_interval_ms: if **commit** is "at_least_once", offsets are committed at least every this many milliseconds
+        max_buffered_bytes: if set, fetching is paused when payloads of polled messages not yet processed take at least
+            this many bytes, see `_aiokafka_consumer_loop` for details
+        resume_buffered_bytes: fetching is resumed when payloads of polled messages not yet processed take at most
+            this many bytes, if None half of **max_buffered_bytes** is used
+        drain_timeout_ms: maximum time in milliseconds to wait for callbacks of already polled messages
+            and for the final commit when the loop stops, if None the loop waits for all of them
+        shutdown_event: event stopping the loop when set, interrupting a pending poll
+        is_shutting_down_f: function returning **True** when the loop should stop, checked after each poll
+        start_timeout_ms: maximum time in milliseconds for the consumer to connect, if None it is not limited
+        start_semaphore: semaphore acquired while the consumer connects, used to limit the number of consumers
+            connecting at the same time
+        started_event: event set once the consumer is started and subscribed to **topics**
+        metrics: metrics updated by the loop, see `_aiokafka_consumer_loop` for details
+        tracer: tracer recording stages of each message, see `_aiokafka_consumer_loop` for details
+        **kwargs: keyword arguments passed to AIOKafkaConsumer
+    """
     logger.info(f"aiokafka_consumer_loop() starting...")
     try:
+        deserializers = {
+            topic: get_deserializer(
+                deserializer,
+                get_args(msg_type)[0] if get_origin(msg_type) is list else msg_type,
+            )
+            for topic, msg_type in msg_types.items()
+        }
+
         consumer_kwargs = dict(
             bootstrap_servers=bootstrap_servers,
             auto_offset_reset=auto_offset_reset,
             max_poll_records=max_poll_records,
         )
         consumer_kwargs = {**consumer_kwargs, **kwargs}
+        if commit != "auto" and consumer_kwargs.get("group_id") is None:
+            raise ValueError(
+                f"commit '{commit}' requires group_id, offsets of consumers without a group cannot be committed."
+            )
+        if commit != "auto":
+            consumer_kwargs["enable_auto_commit"] = False
         consumer = AIOKafkaConsumer(
             **consumer_kwargs,
         )
@@ -155,19 +1182,56 @@ async def aiokafka_consumer_loop(  # type: ignore
             f"aiokafka_consumer_loop(): Consumer created using the following parameters: {sanitize_kafka_config(**consumer_kwargs)}"
         )
 
-        await consumer.start()
-        logger.info("aiokafka_consumer_loop(): Consumer started.")
-        consumer.subscribe(topics)
-        logger.info("aiokafka_consumer_loop(): Consumer subscribed.")
-
         try:
+            # the consumer is stopped even if it failed to start, so its client does not leak connections
+            async with contextlib.AsyncExitStack() as stack:
+                if start_semaphore is not None:
+                    await stack.enter_async_context(start_semaphore)
+                await asyncio.wait_for(
+                    consumer.start(),
+                    start_timeout_ms / 1000 if start_timeout_ms is not None else None,
+                )
+            logger.info("aiokafka_consumer_loop(): Consumer started.")
+            watermarks = _OffsetWatermarks()
+            consumer.subscribe(
+                topics,
+                listener=_CommitOnRevoke(consumer, watermarks)
+                if commit == "at_least_once"
+                else None,
+            )
+            logger.info("aiokafka_consumer_loop(): Consumer subscribed.")
+            if started_event is not None:
+                started_event.set()
+
             await _aiokafka_consumer_loop(
                 consumer=consumer,
                 max_buffer_size=max_buffer_size,
+                concurrency=concurrency,
+                ordering=ordering,
+                max_batch_size=max_batch_size,
+                max_batch_wait_ms=max_batch_wait_ms,
                 timeout_ms=timeout_ms,
                 callbacks=callbacks,
                 msg_types=msg_types,
+                deserializers=deserializers,
+                filter_f=filter_f,
+                retry_policy=retry_policy,
+                on_failure_f=on_failure_f,
+                delay_ms=delay_ms,
+                executor=executor,
+                workers=workers,
+                deserializer=deserializer,
+                commit=commit,
+                commit_every=commit_every,
+                commit_interval_ms=commit_interval_ms,
+                max_buffered_bytes=max_buffered_bytes,
+                resume_buffered_bytes=resume_buffered_bytes,
+                drain_timeout_ms=drain_timeout_ms,
+                shutdown_event=shutdown_event,
                 is_shutting_down_f=is_shutting_down_f,
+                metrics=metrics,
+                tracer=tracer,
+                watermarks=watermarks,
             )
         finally:
             await consumer.stop()
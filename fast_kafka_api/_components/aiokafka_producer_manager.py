@@ -1,73 +1,369 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/002_ProducerManager.ipynb.
 
 # %% auto 0
-__all__ = ['logger', 'AIOKafkaProducerManager']
+__all__ = ['logger', 'DeliveryTracker', 'send_batches', 'AIOKafkaProducerManager']
 
 # %% ../../nbs/002_ProducerManager.ipynb 1
 import asyncio
+import functools
+import math
+import random
 from contextlib import asynccontextmanager, contextmanager
 from typing import *
 
 import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from aiokafka import AIOKafkaProducer
 
+from .events import KafkaEvent
 from .logger import get_logger
 
 # %% ../../nbs/002_ProducerManager.ipynb 5
 logger = get_logger(__name__)
 
 # %% ../../nbs/002_ProducerManager.ipynb 8
+class DeliveryTracker:
+    """Tracks delivery futures of sent messages without blocking the sender until they are acknowledged"""
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: Optional[int] = 1_000,
+        on_error: Optional[Callable[[str, BaseException], None]] = None,
+    ):
+        """Creates a tracker
+
+        Params:
+            max_in_flight: maximum number of unacknowledged messages, if reached `add` waits until some of them are acknowledged.
+                If None, the number of unacknowledged messages is not limited.
+            on_error: function called with the topic and the exception for each message that failed to be delivered
+        """
+        self.max_in_flight = max_in_flight
+        self.on_error = on_error
+        self.delivered = 0
+        self.failed = 0
+        self._in_flight: Set["asyncio.Future[Any]"] = set()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of sent messages waiting to be acknowledged"""
+        return len(self._in_flight)
+
+    async def wait_for_capacity(self) -> None:
+        """Waits until there are less than **max_in_flight** messages in flight"""
+        while self.max_in_flight is not None and self.in_flight >= self.max_in_flight:
+            await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+    async def add(self, topic: str, fut: "asyncio.Future[Any]") -> None:
+        """Starts tracking a delivery future, waits first if there are already **max_in_flight** messages in flight"""
+        await self.wait_for_capacity()
+        self._in_flight.add(fut)
+        fut.add_done_callback(functools.partial(self._on_done, topic))
+
+    def _on_done(self, topic: str, fut: "asyncio.Future[Any]") -> None:
+        self._in_flight.discard(fut)
+        e = asyncio.CancelledError() if fut.cancelled() else fut.exception()
+        if e is None:
+            self.delivered += 1
+            return
+        self.failed += 1
+        logger.warning(
+            f"DeliveryTracker: delivery of a message to topic '{topic}' failed: {e.__repr__()}"
+        )
+        if self.on_error is not None:
+            try:
+                self.on_error(topic, e)
+            except Exception as on_error_e:
+                logger.warning(
+                    f"DeliveryTracker: exception caught {on_error_e.__repr__()} while calling '{self.on_error}'"
+                )
+
+    async def join(self) -> None:
+        """Waits until all messages in flight are acknowledged"""
+        if self._in_flight:
+            await asyncio.wait(self._in_flight)
+
+# %% ../../nbs/002_ProducerManager.ipynb 10
+async def send_batches(  # type: ignore
+    producer: AIOKafkaProducer,
+    topic: str,
+    events: Sequence[KafkaEvent[bytes]],
+    *,
+    partitioner: Optional[Callable[..., int]] = None,
+) -> List["asyncio.Future[Any]"]:
+    """Sends serialized events to the topic using as few batches as possible
+
+    Events are grouped by partition and appended to batches created by the producer, a new
+    batch is started whenever the previous one is full. Events with a key and without an explicit
+    partition are assigned to one using the **partitioner**, while all events without a key are sent
+    to the same, randomly chosen, partition.
+
+    Params:
+        producer: started AIOKafkaProducer used to send batches
+        topic: topic to send events to
+        events: events with already serialized messages
+        partitioner: the partitioner used by the producer, called with the key, all and available partitions.
+            If None, events with a key and without an explicit partition are sent one by one using
+            `producer.send`, which assigns them to partitions in the same way as other messages of the producer.
+
+    Returns:
+        delivery futures of sent batches
+    """
+    partitions = sorted(await producer.partitions_for(topic))
+    # chosen once for all events without a key
+    keyless_partition: Optional[int] = None
+
+    futs = []
+    events_by_partition: Dict[int, List[KafkaEvent[bytes]]] = {}
+    for event in events:
+        if event.partition is not None:
+            partition = event.partition
+        elif event.key is None:
+            if keyless_partition is None:
+                keyless_partition = (
+                    partitioner(None, partitions, partitions)
+                    if partitioner is not None
+                    else random.choice(partitions)  # nosec
+                )
+            partition = keyless_partition
+        elif partitioner is not None:
+            partition = partitioner(event.key, partitions, partitions)
+        else:
+            futs.append(
+                await producer.send(
+                    topic,
+                    event.message,
+                    key=event.key,
+                    timestamp_ms=event.timestamp_ms,
+                    headers=event.headers,
+                )
+            )
+            continue
+        events_by_partition.setdefault(partition, []).append(event)
+
+    def append(batch: Any, event: KafkaEvent[bytes]) -> bool:
+        return (
+            batch.append(
+                key=event.key,
+                value=event.message,
+                timestamp=event.timestamp_ms,
+                headers=event.headers or [],
+            )
+            is not None
+        )
+
+    for partition, partition_events in events_by_partition.items():
+        batch = producer.create_batch()
+        for event in partition_events:
+            if not append(batch, event):
+                futs.append(
+                    await producer.send_batch(batch, topic, partition=partition)
+                )
+                batch = producer.create_batch()
+                if not append(batch, event):
+                    raise ValueError(
+                        f"Message of size {len(event.message)} does not fit into an empty batch."
+                    )
+        futs.append(await producer.send_batch(batch, topic, partition=partition))
+
+    return futs
+
+# %% ../../nbs/002_ProducerManager.ipynb 13
 @asynccontextmanager
 async def _aiokafka_producer_manager(  # type: ignore
-    producer: AIOKafkaProducer, *, max_buffer_size: int = 10_000
-):
-    """Write docs
+    producer: AIOKafkaProducer,
+    *,
+    max_buffer_size: int = 10_000,
+    delivery_tracker: Optional[DeliveryTracker] = None,
+    drain_scope: Optional[anyio.CancelScope] = None,
+) -> AsyncIterator[MemoryObjectSendStream[Tuple[str, KafkaEvent[bytes]]]]:
+    """Sends messages from the yielded stream using the producer
+
+    Messages are sent without waiting for the previous ones to be acknowledged,
+    the number of unacknowledged messages is limited by the **delivery_tracker**.
+
+    Params:
+        producer: started AIOKafkaProducer used to send messages
+        max_buffer_size: maximum number of messages waiting in the stream to be sent
+        delivery_tracker: tracker of unacknowledged messages, if None a new one
+            with the default **max_in_flight** is used
+        drain_scope: cancel scope wrapping the sending of messages, setting its deadline before exiting
+            bounds the time spent sending messages left in the stream and waiting for their acknowledgements
+
 
     Todo: add batch size if needed
     """
 
     logger.info("_aiokafka_producer_manager(): Starting...")
 
-    async def send_message(receive_stream):
+    if delivery_tracker is None:
+        delivery_tracker = DeliveryTracker()
+
+    async def send_message(
+        receive_stream: MemoryObjectReceiveStream[Tuple[str, KafkaEvent[bytes]]]
+    ) -> None:
         async with receive_stream:
-            async for topic, msg in receive_stream:
-                fut = await producer.send(topic, msg)
-                msg = await fut
+            async for topic, event in receive_stream:
+                await delivery_tracker.wait_for_capacity()
+                fut = await producer.send(
+                    topic,
+                    event.message,
+                    key=event.key,
+                    partition=event.partition,
+                    timestamp_ms=event.timestamp_ms,
+                    headers=event.headers,
+                )
+                await delivery_tracker.add(topic, fut)
+        await delivery_tracker.join()
 
+    send_stream: MemoryObjectSendStream[Tuple[str, KafkaEvent[bytes]]]
+    receive_stream: MemoryObjectReceiveStream[Tuple[str, KafkaEvent[bytes]]]
     send_stream, receive_stream = anyio.create_memory_object_stream(
         max_buffer_size=max_buffer_size
     )
 
+    if drain_scope is None:
+        drain_scope = anyio.CancelScope()
+
     logger.info("_aiokafka_producer_manager(): Starting task group")
-    async with anyio.create_task_group() as task_group:
-        logger.info("_aiokafka_producer_manager(): Starting send_stream")
-        task_group.start_soon(send_message, receive_stream)
-        async with send_stream:
-            yield send_stream
-            logger.info("_aiokafka_producer_manager(): Exiting send_stream")
-        logger.info("_aiokafka_producer_manager(): Exiting task group")
+    with drain_scope:
+        async with anyio.create_task_group() as task_group:
+            logger.info("_aiokafka_producer_manager(): Starting send_stream")
+            task_group.start_soon(send_message, receive_stream)
+            async with send_stream:
+                yield send_stream
+                logger.info("_aiokafka_producer_manager(): Exiting send_stream")
+            logger.info("_aiokafka_producer_manager(): Exiting task group")
+    if drain_scope.cancelled_caught:
+        logger.warning(
+            "_aiokafka_producer_manager(): sending of messages left in the stream was cancelled"
+        )
     logger.info("_aiokafka_producer_manager(): Finished.")
 
-# %% ../../nbs/002_ProducerManager.ipynb 11
+# %% ../../nbs/002_ProducerManager.ipynb 17
 class AIOKafkaProducerManager:
-    def __init__(self, producer: AIOKafkaProducer, *, max_buffer_size: int = 1_000):  # type: ignore
+    def __init__(  # type: ignore
+        self,
+        producer: AIOKafkaProducer,
+        *,
+        max_buffer_size: int = 10_000,
+        max_in_flight: Optional[int] = 1_000,
+        on_error: Optional[Callable[[str, BaseException], None]] = None,
+    ):
+        """Sends messages in the background using the producer
+
+        Params:
+            producer: AIOKafkaProducer used to send messages
+            max_buffer_size: maximum number of messages waiting to be sent, if reached
+                `send` raises `anyio.WouldBlock`
+            max_in_flight: maximum number of sent messages waiting to be acknowledged,
+                if None, the number is not limited
+            on_error: function called with the topic and the exception for each message that failed to be delivered
+        """
         self.producer = producer
         self.max_buffer_size = max_buffer_size
+        self.delivery_tracker = DeliveryTracker(
+            max_in_flight=max_in_flight, on_error=on_error
+        )
+        self.accepted = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of sent messages waiting to be acknowledged"""
+        return self.delivery_tracker.in_flight
 
-    async def start(self) -> None:
+    @property
+    def is_full(self) -> bool:
+        """True if the buffer of messages waiting to be sent is full and `send` would raise `anyio.WouldBlock`"""
+        stats = self.send_stream.statistics()
+        return stats.current_buffer_used >= stats.max_buffer_size
+
+    async def start(self, *, start_producer: bool = True) -> None:
+        """Starts the producer and the background sending of messages
+
+        Params:
+            start_producer: if False, the producer must already be started, e.g. concurrently with other producers.
+                The rest of this method must be called by the same task calling `stop`.
+        """
         logger.info("AIOKafkaProducerManager.start(): Entering...")
-        await self.producer.start()
-        self.producer_manager_generator = _aiokafka_producer_manager(self.producer)
+        if start_producer:
+            await self.producer.start()
+        self.drain_scope = anyio.CancelScope()
+        self.producer_manager_generator = _aiokafka_producer_manager(
+            self.producer,
+            max_buffer_size=self.max_buffer_size,
+            delivery_tracker=self.delivery_tracker,
+            drain_scope=self.drain_scope,
+        )
         self.send_stream = await self.producer_manager_generator.__aenter__()
         logger.info("AIOKafkaProducerManager.start(): Finished.")
 
-    async def stop(self) -> None:
-        # todo: try to flush messages before you exit
+    def close(self) -> None:
+        """Stops accepting new messages, messages already in the buffer are still being sent
+
+        Calling it on all managers before stopping them lets them flush their buffers concurrently.
+        """
+        self.send_stream.close()
+
+    async def stop(self, timeout_ms: Optional[int] = None) -> int:
+        """Sends messages left in the buffer, waits for their acknowledgements and stops the producer
+
+        Params:
+            timeout_ms: maximum time in milliseconds for sending messages left in the buffer and waiting for their
+                acknowledgements, messages not sent by then are dropped. If None, it is not limited in time.
+                The producer is always stopped completely afterwards, which waits until messages it already
+                sent are either acknowledged or expire.
+
+        Returns:
+            number of accepted messages which were neither delivered nor failed to be delivered
+        """
         logger.info("AIOKafkaProducerManager.stop(): Entering...")
+        deadline = (
+            anyio.current_time() + timeout_ms / 1000
+            if timeout_ms is not None
+            else math.inf
+        )
+        self.close()
+        self.drain_scope.deadline = deadline
         await self.producer_manager_generator.__aexit__(None, None, None)
         logger.info("AIOKafkaProducerManager.stop(): Stoping producer...")
-        await self.producer.stop()
+        # a producer whose stop was cancelled cannot be stopped again and keeps its connections open
+        with anyio.CancelScope(shield=True):
+            await self.producer.stop()
+        dropped = (
+            self.accepted
+            - self.delivery_tracker.delivered
+            - self.delivery_tracker.failed
+        )
+        if dropped > 0:
+            logger.warning(
+                f"AIOKafkaProducerManager.stop(): {dropped} messages were dropped"
+            )
         logger.info("AIOKafkaProducerManager.stop(): Finished")
+        return dropped
+
+    def send(
+        self,
+        topic: str,
+        msg: bytes,
+        key: Optional[bytes] = None,
+        *,
+        headers: Optional[List[Tuple[str, bytes]]] = None,
+        partition: Optional[int] = None,
+        timestamp_ms: Optional[int] = None,
+    ) -> None:
+        """Puts the message in the buffer of messages to be sent
 
-    def send(self, topic: str, msg: bytes) -> None:
-        self.send_stream.send_nowait((topic, msg))
+        Raises:
+            anyio.WouldBlock: if the buffer is full, check `is_full` to avoid it
+            anyio.ClosedResourceError: if the manager is closed or stopped
+        """
+        event = KafkaEvent(
+            msg,
+            key=key,
+            headers=headers,
+            partition=partition,
+            timestamp_ms=timestamp_ms,
+        )
+        self.send_stream.send_nowait((topic, event))
+        self.accepted += 1
@@ -6,11 +6,13 @@ __all__ = ['logger', 'ConsumeCallable', 'ProduceCallable', 'sec_scheme_name_mapp
            'yaml_file_cmp', 'export_async_spec']
 
 # %% ../../nbs/003_AsyncAPI.ipynb 1
-import filecmp
+import collections.abc
+import dataclasses
+import hashlib
 import json
-import shutil
 import subprocess  # nosec: B404: Consider possible security implications associated with the subprocess module.
-import tempfile
+import sys
+import threading
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
@@ -27,6 +29,7 @@ import fast_kafka_api._components.logger
 fast_kafka_api._components.logger.should_supress_timestamps = True
 
 import fast_kafka_api
+from .events import EventMetadata, KafkaEvent
 from .logger import get_logger
 
 # %% ../../nbs/003_AsyncAPI.ipynb 2
@@ -153,18 +156,42 @@ class KafkaBrokers(BaseModel):
 
 
 def _get_msg_cls_for_producer(f: ProduceCallable) -> Type[BaseModel]:
-    return f.__annotations__["return"]  # type: ignore
+    msg_cls = f.__annotations__["return"]
+
+    # batches of messages are annotated with List[msg_cls] or AsyncIterator[msg_cls]
+    if get_origin(msg_cls) in [
+        list,
+        collections.abc.AsyncIterator,
+        collections.abc.AsyncIterable,
+        collections.abc.AsyncGenerator,
+    ]:
+        msg_cls = get_args(msg_cls)[0]
+    # messages sent together with their key and headers are annotated with KafkaEvent[msg_cls]
+    if get_origin(msg_cls) is KafkaEvent:
+        msg_cls = get_args(msg_cls)[0]
+    return msg_cls  # type: ignore
 
 # %% ../../nbs/003_AsyncAPI.ipynb 19
 def _get_msg_cls_for_consumer(f: ConsumeCallable) -> Type[BaseModel]:
-    classes = list(get_type_hints(f).values())
+    classes = [
+        cls for name, cls in get_type_hints(f).items() if name not in ["meta", "return"]
+    ]
 
     # @app.consumer takes only message argument
     if len(classes) > 1:
         raise ValueError(classes)
-    return classes[0]  # type: ignore
+    msg_cls = classes[0]
+
+    # batches of messages are annotated with List[msg_cls]
+    if get_origin(msg_cls) is list:
+        msg_cls = get_args(msg_cls)[0]
+    return msg_cls  # type: ignore
+
+# %% ../../nbs/003_AsyncAPI.ipynb 22
+def _get_msg_cls_name(msg_cls: Type[Any]) -> str:
+    return getattr(msg_cls, "__name__", str(msg_cls))
+
 
-# %% ../../nbs/003_AsyncAPI.ipynb 21
 def _get_topic_dict(
     f: Callable[[Any], Any], direction: str = "publish"
 ) -> Dict[str, Any]:
@@ -180,12 +207,14 @@ def _get_topic_dict(
     elif direction == "subscribe":
         msg_cls = _get_msg_cls_for_consumer(f)
 
-    msg_schema = {"message": {"$ref": f"#/components/messages/{msg_cls.__name__}"}}
+    msg_schema = {
+        "message": {"$ref": f"#/components/messages/{_get_msg_cls_name(msg_cls)}"}
+    }
     if f.__doc__ is not None:
         msg_schema["description"] = f.__doc__  # type: ignore
     return {direction: msg_schema}
 
-# %% ../../nbs/003_AsyncAPI.ipynb 24
+# %% ../../nbs/003_AsyncAPI.ipynb 25
 def _get_channels_schema(
     consumers: Dict[str, ConsumeCallable],
     producers: Dict[str, ProduceCallable],
@@ -196,23 +225,60 @@ def _get_channels_schema(
             topics[topic] = _get_topic_dict(f, d)
     return topics
 
-# %% ../../nbs/003_AsyncAPI.ipynb 26
+# %% ../../nbs/003_AsyncAPI.ipynb 27
 def _get_kafka_msg_classes(
     consumers: Dict[str, ConsumeCallable],
     producers: Dict[str, ProduceCallable],
-) -> Set[Type[BaseModel]]:
+) -> Set[Type[Any]]:
     fc = [_get_msg_cls_for_consumer(consumer) for consumer in consumers.values()]
     fp = [_get_msg_cls_for_producer(producer) for producer in producers.values()]
     return set(fc + fp)
 
 
+def _has_pydantic_schema(msg_cls: Type[Any]) -> bool:
+    return isinstance(msg_cls, type) and (
+        issubclass(msg_cls, BaseModel) or dataclasses.is_dataclass(msg_cls)
+    )
+
+
+def _get_other_msg_definitions(msg_classes: Set[Type[Any]]) -> Dict[str, Any]:
+    """Returns schemas of messages which are neither pydantic models nor dataclasses
+
+    Schemas of `msgspec.Struct` messages are generated by msgspec, raw bytes are described as binary strings
+    and messages of other types only by their names.
+    """
+    # msgspec is an optional dependency, it is imported already if messages are msgspec.Structs
+    msgspec = sys.modules.get("msgspec")
+    definitions: Dict[str, Any] = {}
+    for msg_cls in msg_classes:
+        name = _get_msg_cls_name(msg_cls)
+        if (
+            msgspec is not None
+            and isinstance(msg_cls, type)
+            and issubclass(msg_cls, msgspec.Struct)
+        ):
+            _, components = msgspec.json.schema_components(
+                [msg_cls], ref_template="#/definitions/{name}"
+            )
+            definitions.update(components)
+        elif msg_cls in [bytes, bytearray]:
+            definitions[name] = {"title": name, "type": "string", "format": "binary"}
+        else:
+            definitions[name] = {"title": name}
+    return definitions
+
+
 def _get_kafka_msg_definitions(
     consumers: Dict[str, ConsumeCallable],
     producers: Dict[str, ProduceCallable],
 ) -> Dict[str, Dict[str, Any]]:
-    return schema(_get_kafka_msg_classes(consumers, producers))  # type: ignore
+    msg_classes = _get_kafka_msg_classes(consumers, producers)
+    pydantic_classes = {cls for cls in msg_classes if _has_pydantic_schema(cls)}
+    definitions = schema(pydantic_classes).get("definitions", {})
+    definitions.update(_get_other_msg_definitions(msg_classes - pydantic_classes))
+    return {"definitions": definitions}
 
-# %% ../../nbs/003_AsyncAPI.ipynb 28
+# %% ../../nbs/003_AsyncAPI.ipynb 29
 def _get_example(cls: Type[BaseModel]) -> BaseModel:
     kwargs: Dict[str, Any] = {}
     for k, v in cls.__fields__.items():
@@ -229,7 +295,7 @@ def _get_example(cls: Type[BaseModel]) -> BaseModel:
 
     return json.loads(cls(**kwargs).json())  # type: ignore
 
-# %% ../../nbs/003_AsyncAPI.ipynb 30
+# %% ../../nbs/003_AsyncAPI.ipynb 31
 def _add_example_to_msg_definitions(
     msg_cls: Type[BaseModel], msg_schema: Dict[str, Dict[str, Any]]
 ) -> None:
@@ -246,7 +312,7 @@ def _get_msg_definitions_with_examples(
     producers: Dict[str, ProduceCallable],
 ) -> Dict[str, Dict[str, Any]]:
     msg_classes = _get_kafka_msg_classes(consumers, producers)
-    msg_schema: Dict[str : Dict[str, Any]] = schema(msg_classes)  # type: ignore
+    msg_schema = _get_kafka_msg_definitions(consumers, producers)
     for msg_cls in msg_classes:
         _add_example_to_msg_definitions(msg_cls, msg_schema)
 
@@ -254,7 +320,7 @@ def _get_msg_definitions_with_examples(
 
     return msg_schema
 
-# %% ../../nbs/003_AsyncAPI.ipynb 32
+# %% ../../nbs/003_AsyncAPI.ipynb 33
 def _get_security_schemes(kafka_brokers: KafkaBrokers) -> Dict[str, Any]:
     security_schemes = {}
     for key, kafka_broker in kafka_brokers.brokers.items():
@@ -264,14 +330,16 @@ def _get_security_schemes(kafka_brokers: KafkaBrokers) -> Dict[str, Any]:
             )
     return security_schemes
 
-# %% ../../nbs/003_AsyncAPI.ipynb 34
+# %% ../../nbs/003_AsyncAPI.ipynb 35
 def _get_components_schema(
     consumers: Dict[str, ConsumeCallable],
     producers: Dict[str, ProduceCallable],
     kafka_brokers: KafkaBrokers,
 ) -> Dict[str, Any]:
     definitions = _get_msg_definitions_with_examples(consumers, producers)
-    msg_classes = [cls.__name__ for cls in _get_kafka_msg_classes(consumers, producers)]
+    msg_classes = [
+        _get_msg_cls_name(cls) for cls in _get_kafka_msg_classes(consumers, producers)
+    ]
     components = {
         "messages": {k: v for k, v in definitions.items() if k in msg_classes},
         "schemas": {k: v for k, v in definitions.items() if k not in msg_classes},
@@ -297,7 +365,7 @@ def _get_components_schema(
 
     return _sub_values(components)  # type: ignore
 
-# %% ../../nbs/003_AsyncAPI.ipynb 36
+# %% ../../nbs/003_AsyncAPI.ipynb 38
 def _get_servers_schema(kafka_brokers: KafkaBrokers) -> Dict[str, Any]:
     servers = json.loads(kafka_brokers.json(sort_keys=False))["brokers"]
 
@@ -306,7 +374,7 @@ def _get_servers_schema(kafka_brokers: KafkaBrokers) -> Dict[str, Any]:
             servers[key]["security"] = [{f"{key}_default_security": []}]
     return servers  # type: ignore
 
-# %% ../../nbs/003_AsyncAPI.ipynb 38
+# %% ../../nbs/003_AsyncAPI.ipynb 40
 def _get_asyncapi_schema(
     consumers: Dict[str, ConsumeCallable],
     producers: Dict[str, ProduceCallable],
@@ -327,7 +395,7 @@ def _get_asyncapi_schema(
         "components": components,
     }
 
-# %% ../../nbs/003_AsyncAPI.ipynb 40
+# %% ../../nbs/003_AsyncAPI.ipynb 42
 def yaml_file_cmp(file_1: Union[Path, str], file_2: Union[Path, str]) -> bool:
     def _read(f: Union[Path, str]) -> Dict[str, Any]:
         with open(f) as stream:
@@ -336,7 +404,11 @@ def yaml_file_cmp(file_1: Union[Path, str], file_2: Union[Path, str]) -> bool:
     d = [_read(f) for f in [file_1, file_2]]
     return d[0] == d[1]
 
-# %% ../../nbs/003_AsyncAPI.ipynb 41
+# %% ../../nbs/003_AsyncAPI.ipynb 43
+def _read_hash(hash_path: Path) -> Optional[str]:
+    return hash_path.read_text().strip() if hash_path.exists() else None
+
+
 def _generate_async_spec(
     *,
     consumers: Dict[str, ConsumeCallable],
@@ -346,36 +418,52 @@ def _generate_async_spec(
     spec_path: Path,
     force_rebuild: bool,
 ) -> bool:
+    """Writes the specification to **spec_path** if its content changed
+
+    The sha256 hash of the specification is stored next to it, so an unchanged specification
+    is detected without reading and parsing the old one.
+
+    Returns:
+        True if the specification was written
+    """
     # generate spec file
     asyncapi_schema = _get_asyncapi_schema(
         consumers, producers, kafka_brokers, kafka_service_info
     )
+    spec = yaml.dump(asyncapi_schema, sort_keys=False)
+    spec_hash = hashlib.sha256(spec.encode("utf-8")).hexdigest()
+    hash_path = spec_path.parent / f"{spec_path.name}.sha256"
+
     if not spec_path.exists():
         logger.info(
             f"Old async specifications at '{spec_path.resolve()}' does not exist."
         )
-    spec_path.parent.mkdir(exist_ok=True, parents=True)
-    with tempfile.TemporaryDirectory() as d:
-        with open(Path(d) / "asyncapi.yml", "w") as f:
-            yaml.dump(asyncapi_schema, f, sort_keys=False)
-        spec_changed = not (
-            spec_path.exists() and yaml_file_cmp(Path(d) / "asyncapi.yml", spec_path)
-        )
-        if spec_changed or force_rebuild:
-            shutil.copyfile(Path(d) / "asyncapi.yml", spec_path)
-            logger.info(f"New async specifications generated at: '{spec_path}'")
-            return True
-        else:
-            logger.info(f"Keeping the old async specifications at: '{spec_path}'")
-            return False
+    spec_changed = not (spec_path.exists() and _read_hash(hash_path) == spec_hash)
+    if spec_changed or force_rebuild:
+        spec_path.parent.mkdir(exist_ok=True, parents=True)
+        spec_path.write_text(spec)
+        hash_path.write_text(spec_hash)
+        logger.info(f"New async specifications generated at: '{spec_path}'")
+        return True
+    else:
+        logger.info(f"Keeping the old async specifications at: '{spec_path}'")
+        return False
 
-# %% ../../nbs/003_AsyncAPI.ipynb 43
+# %% ../../nbs/003_AsyncAPI.ipynb 45
 def _generate_async_docs(
     *,
     spec_path: Path,
     docs_path: Path,
-) -> None:
+    stop_event: Optional[threading.Event] = None,
+) -> bool:
+    """Generates the documentation from the specification using Node.js tooling
 
+    Params:
+        stop_event: if set while the documentation is being generated, the Node.js process is terminated
+
+    Returns:
+        True if the documentation was generated, False if the generation was stopped
+    """
     cmd = [
         "npx",
         "-y",
@@ -388,20 +476,32 @@ def _generate_async_docs(
         f"{docs_path}",
         "--force-write",
     ]
-    p = subprocess.run(  # nosec: B603 subprocess call - check for execution of untrusted input.
+    with subprocess.Popen(  # nosec: B603 subprocess call - check for execution of untrusted input.
         cmd, stderr=subprocess.STDOUT, stdout=subprocess.PIPE
-    )
+    ) as p:
+        while True:
+            try:
+                stdout, _ = p.communicate(timeout=None if stop_event is None else 0.5)
+                break
+            except subprocess.TimeoutExpired:
+                if stop_event.is_set():  # type: ignore
+                    p.terminate()
+                    p.communicate()
+                    logger.info(f"Generation of async docs at '{docs_path}' stopped")
+                    return False
+
     if p.returncode == 0:
         logger.info(f"Async docs generated at '{docs_path}'")
-        logger.info(f"Output of '$ {' '.join(cmd)}'{p.stdout.decode()}")
+        logger.info(f"Output of '$ {' '.join(cmd)}'{stdout.decode()}")
     else:
         logger.error(f"Generation of async docs failed!")
-        logger.info(f"Output of '$ {' '.join(cmd)}'{p.stdout.decode()}")
+        logger.info(f"Output of '$ {' '.join(cmd)}'{stdout.decode()}")
         raise ValueError(
-            f"Generation of async docs failed, used '$ {' '.join(cmd)}'{p.stdout.decode()}"
+            f"Generation of async docs failed, used '$ {' '.join(cmd)}'{stdout.decode()}"
         )
+    return True
 
-# %% ../../nbs/003_AsyncAPI.ipynb 45
+# %% ../../nbs/003_AsyncAPI.ipynb 48
 def export_async_spec(
     *,
     consumers: Dict[str, ConsumeCallable],
@@ -410,13 +510,20 @@ def export_async_spec(
     kafka_service_info: KafkaServiceInfo,
     asyncapi_path: Union[Path, str],
     force_rebuild: bool = False,
+    generate_docs: bool = True,
+    stop_event: Optional[threading.Event] = None,
 ) -> None:
     """Export async specification to a given path
 
     Params:
         path: path where the specification will be exported. If parent subdirectories do not exist, they will be created.
-
-
+        force_rebuild: if True, the specification and the documentation are generated even if the specification did not change
+        generate_docs: if False, only the specification is generated, without running Node.js tooling for the documentation.
+            The documentation is regenerated only if it was generated for a different specification, which is detected
+            by comparing the hash of the specification with the one stored in `spec/asyncapi.yml.docs.sha256`
+            after the documentation was generated.
+        stop_event: if set while the documentation is being generated, the generation is stopped and
+            the documentation is left outdated
     """
     # generate spec file
     spec_path = Path(asyncapi_path) / "spec" / "asyncapi.yml"
@@ -432,13 +539,26 @@ def export_async_spec(
     # generate docs folder
     docs_path = Path(asyncapi_path) / "docs"
 
-    if not is_spec_built and docs_path.exists():
+    spec_hash = _read_hash(spec_path.parent / f"{spec_path.name}.sha256")
+    # the hash is kept out of the documentation, which is served as static files
+    docs_hash_path = spec_path.parent / f"{spec_path.name}.docs.sha256"
+
+    if not force_rebuild and _read_hash(docs_hash_path) == spec_hash:
         logger.info(
             f"Skipping generating async documentation in '{docs_path.resolve()}'"
         )
         return
 
-    _generate_async_docs(
+    if not generate_docs:
+        logger.info(
+            f"Async documentation in '{docs_path.resolve()}' is outdated, it will be generated later"
+        )
+        return
+
+    is_docs_built = _generate_async_docs(
         spec_path=spec_path,
         docs_path=docs_path,
+        stop_event=stop_event,
     )
+    if is_docs_built:
+        docs_hash_path.write_text(spec_hash)  # type: ignore
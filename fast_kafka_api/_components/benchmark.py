@@ -0,0 +1,553 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/011_Benchmark.ipynb.
+
+# %% auto 0
+__all__ = ['logger', 'MODELS', 'BENCHMARKS', 'create_msg', 'benchmark_process_msgs', 'benchmark_consumer_loop',
+           'benchmark_produce_sync', 'benchmark_produce_async', 'benchmark_producer_manager', 'run_benchmarks']
+
+# %% ../../nbs/011_Benchmark.ipynb 1
+import asyncio
+import contextlib
+import platform
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import *
+
+import anyio
+from aiokafka import AIOKafkaProducer
+from aiokafka.structs import ConsumerRecord, TopicPartition
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+import fast_kafka_api
+from ..application import FastKafkaAPI
+from ..testing import InMemoryBroker, InMemoryProducer
+from fast_kafka_api._components.aiokafka_consumer_loop import (
+    aiokafka_consumer_loop,
+    process_msgs,
+)
+from fast_kafka_api._components.aiokafka_producer_manager import (
+    AIOKafkaProducerManager,
+)
+from .event_loop import get_event_loop_name
+from .logger import get_logger
+from .serialization import get_deserializer
+
+# %% ../../nbs/011_Benchmark.ipynb 3
+logger = get_logger(__name__)
+
+# %% ../../nbs/011_Benchmark.ipynb 6
+class _Item(BaseModel):
+    name: str
+    value: float
+    tags: List[str]
+
+
+class _FlatMsg(BaseModel):
+    i: int
+    payload: str
+
+
+class _NestedMsg(BaseModel):
+    i: int
+    items: List[_Item]
+
+
+MODELS: Dict[str, Type[BaseModel]] = {"flat": _FlatMsg, "nested": _NestedMsg}
+
+
+def create_msg(model: str, i: int, payload_size: int) -> BaseModel:
+    """Creates a message of the model whose JSON encoding takes approximately **payload_size** bytes
+
+    Params:
+        model: one of "flat" or "nested"
+        i: index of the message, stored in the message
+        payload_size: size of the message in bytes
+
+    Raises:
+        ValueError: if **model** is not one of the supported models
+    """
+    if model not in MODELS:
+        raise ValueError(f"model must be one of {list(MODELS)}, but it is '{model}'.")
+    if model == "flat":
+        overhead = len(_FlatMsg(i=i, payload="").json())
+        return _FlatMsg(i=i, payload="x" * max(payload_size - overhead, 0))
+
+    item = _Item(name="item", value=0.5, tags=["a", "b", "c"])
+    overhead = len(_NestedMsg(i=i, items=[]).json())
+    # items are separated by ", " in JSON
+    num_items = max((payload_size - overhead) // (len(item.json()) + 2), 1)
+    msg = _NestedMsg(i=i, items=[item] * num_items)
+    # the rest of the payload is added to the name of the first item
+    padding = max(payload_size - len(msg.json()), 0)
+    msg.items[0] = _Item(
+        name=item.name + "x" * padding, value=item.value, tags=item.tags
+    )
+    return msg
+
+
+def _create_values(model: str, payload_size: int, num_msgs: int) -> List[bytes]:
+    return [
+        create_msg(model, i, payload_size).json().encode("utf-8")
+        for i in range(num_msgs)
+    ]
+
+# %% ../../nbs/011_Benchmark.ipynb 9
+def _get_result(
+    benchmark: str,
+    *,
+    model: str,
+    payload_size: int,
+    num_msgs: int,
+    seconds: float,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    return dict(
+        benchmark=benchmark,
+        model=model,
+        payload_size=payload_size,
+        num_msgs=num_msgs,
+        seconds=seconds,
+        msgs_per_s=num_msgs / seconds if seconds > 0 else None,
+        **kwargs,
+    )
+
+
+async def benchmark_process_msgs(
+    *,
+    model: str,
+    payload_size: int,
+    num_msgs: int,
+    bootstrap_servers: Optional[str] = None,
+    max_poll_records: int = 500,
+) -> Dict[str, Any]:
+    """Measures decoding of polled messages and their dispatching to workers by `process_msgs`
+
+    Params:
+        model: one of "flat" or "nested", see `create_msg` for details
+        payload_size: size of messages in bytes
+        num_msgs: number of messages
+        bootstrap_servers: not used, the benchmark does not need a broker
+        max_poll_records: number of messages passed to each call of `process_msgs`
+    """
+    topic = "benchmark"
+    msg_type = MODELS[model]
+    values = _create_values(model, payload_size, num_msgs)
+    polls = [
+        {
+            TopicPartition(topic, 0): [
+                ConsumerRecord(
+                    topic=topic,
+                    partition=0,
+                    offset=offset,
+                    timestamp=0,
+                    timestamp_type=0,
+                    key=None,
+                    value=values[offset],
+                    checksum=None,
+                    serialized_key_size=-1,
+                    serialized_value_size=len(values[offset]),
+                    headers=(),
+                )
+                for offset in range(start, min(start + max_poll_records, num_msgs))
+            ]
+        }
+        for start in range(0, num_msgs, max_poll_records)
+    ]
+
+    async def callback(msg: BaseModel) -> None:
+        pass
+
+    dispatched = 0
+
+    async def process_f(item: Any) -> None:
+        nonlocal dispatched
+        dispatched += 1
+
+    t0 = time.perf_counter()
+    for msgs in polls:
+        await process_msgs(
+            msgs=msgs,
+            callbacks={topic: callback},
+            msg_types={topic: msg_type},
+            process_f=process_f,
+            deserializers={topic: get_deserializer("json", msg_type)},
+        )
+    seconds = time.perf_counter() - t0
+    assert dispatched == num_msgs, dispatched
+
+    return _get_result(
+        "process_msgs",
+        model=model,
+        payload_size=payload_size,
+        num_msgs=num_msgs,
+        seconds=seconds,
+    )
+
+# %% ../../nbs/011_Benchmark.ipynb 11
+@contextlib.contextmanager
+def _use_broker(
+    bootstrap_servers: Optional[str],
+) -> Generator[Optional[InMemoryBroker], None, None]:
+    """Yields an in-memory broker used in place of Kafka if **bootstrap_servers** is None, and None otherwise"""
+    if bootstrap_servers is None:
+        with InMemoryBroker(num_partitions=3) as broker:
+            yield broker
+    else:
+        yield None
+
+
+def _get_topic() -> str:
+    return f"benchmark_{uuid.uuid4().hex}"
+
+
+async def _fill_topic(
+    topic: str,
+    values: List[bytes],
+    *,
+    broker: Optional[InMemoryBroker],
+    bootstrap_servers: Optional[str],
+) -> None:
+    if broker is not None:
+        for value in values:
+            broker.produce(topic, value)
+        return
+
+    producer = AIOKafkaProducer(bootstrap_servers=bootstrap_servers)
+    await producer.start()
+    try:
+        futs = [await producer.send(topic, value) for value in values]
+        await asyncio.gather(*futs)
+    finally:
+        await producer.stop()
+
+
+async def benchmark_consumer_loop(
+    *,
+    model: str,
+    payload_size: int,
+    num_msgs: int,
+    bootstrap_servers: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Measures consuming of messages by `aiokafka_consumer_loop`, from polling to awaiting the callback
+
+    The time is measured from the moment the consumer is started and subscribed, until the last message is passed to
+    the callback. The consumer is not a member of a consumer group, so that joining a group does not skew the results.
+
+    Params:
+        model: one of "flat" or "nested", see `create_msg` for details
+        payload_size: size of messages in bytes
+        num_msgs: number of messages
+        bootstrap_servers: Kafka brokers, if None an `InMemoryBroker` is used
+    """
+    topic = _get_topic()
+    msg_type = MODELS[model]
+    values = _create_values(model, payload_size, num_msgs)
+    with _use_broker(bootstrap_servers) as broker:
+        await _fill_topic(
+            topic, values, broker=broker, bootstrap_servers=bootstrap_servers
+        )
+
+        consumed = 0
+        started_event = anyio.Event()
+        shutdown_event = anyio.Event()
+
+        async def callback(msg: BaseModel) -> None:
+            nonlocal consumed
+            consumed += 1
+            if consumed == num_msgs:
+                shutdown_event.set()
+
+        task = asyncio.create_task(
+            aiokafka_consumer_loop(
+                topics=[topic],
+                bootstrap_servers=bootstrap_servers
+                if bootstrap_servers is not None
+                else "localhost:9092",
+                auto_offset_reset="earliest",
+                group_id=None,
+                callbacks={topic: callback},
+                msg_types={topic: msg_type},
+                started_event=started_event,
+                shutdown_event=shutdown_event,
+            )
+        )
+        try:
+            await started_event.wait()
+            t0 = time.perf_counter()
+            await shutdown_event.wait()
+            seconds = time.perf_counter() - t0
+        finally:
+            shutdown_event.set()
+            await task
+
+    return _get_result(
+        "consumer_loop",
+        model=model,
+        payload_size=payload_size,
+        num_msgs=num_msgs,
+        seconds=seconds,
+    )
+
+# %% ../../nbs/011_Benchmark.ipynb 13
+async def _benchmark_produce(
+    *,
+    model: str,
+    payload_size: int,
+    num_msgs: int,
+    bootstrap_servers: Optional[str],
+    sync: bool,
+) -> Dict[str, Any]:
+    topic = _get_topic()
+    msg_type = MODELS[model]
+    msgs = [create_msg(model, i, payload_size) for i in range(num_msgs)]
+    # the specification and the documentation of the app are not kept
+    with _use_broker(bootstrap_servers) as broker, tempfile.TemporaryDirectory() as d:
+        app = FastKafkaAPI(
+            FastAPI(),
+            root_path=d,
+            bootstrap_servers=bootstrap_servers
+            if bootstrap_servers is not None
+            else "localhost:9092",
+        )
+
+        if sync:
+
+            def to_topic(msg: msg_type) -> msg_type:  # type: ignore
+                return msg
+
+        else:
+
+            async def to_topic(msg: msg_type) -> msg_type:  # type: ignore
+                return msg
+
+        produce = app.produces(topic)(to_topic)
+        await app._populate_producers()
+        try:
+            t0 = time.perf_counter()
+            if sync:
+                # regular functions put messages into the buffer of a producer manager
+                _, manager, _ = app._producers_store[topic]
+                for msg in msgs:
+                    while manager.is_full:
+                        await asyncio.sleep(0)
+                    produce(msg)
+            else:
+                for msg in msgs:
+                    await produce(msg)
+        finally:
+            # messages of regular functions are delivered once producers are flushed
+            await app._shutdown_producers()
+        seconds = time.perf_counter() - t0
+
+    return _get_result(
+        "produce_sync" if sync else "produce_async",
+        model=model,
+        payload_size=payload_size,
+        num_msgs=num_msgs,
+        seconds=seconds,
+    )
+
+
+async def benchmark_produce_sync(
+    *,
+    model: str,
+    payload_size: int,
+    num_msgs: int,
+    bootstrap_servers: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Measures sending of messages returned by a regular function decorated with `FastKafkaAPI.produces`,
+    until all of them are delivered
+
+    Params:
+        model: one of "flat" or "nested", see `create_msg` for details
+        payload_size: size of messages in bytes
+        num_msgs: number of messages
+        bootstrap_servers: Kafka brokers, if None an `InMemoryBroker` is used
+    """
+    return await _benchmark_produce(
+        model=model,
+        payload_size=payload_size,
+        num_msgs=num_msgs,
+        bootstrap_servers=bootstrap_servers,
+        sync=True,
+    )
+
+
+async def benchmark_produce_async(
+    *,
+    model: str,
+    payload_size: int,
+    num_msgs: int,
+    bootstrap_servers: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Measures sending of messages returned by a coroutine decorated with `FastKafkaAPI.produces`,
+    awaiting each of them until it is delivered
+
+    Params:
+        model: one of "flat" or "nested", see `create_msg` for details
+        payload_size: size of messages in bytes
+        num_msgs: number of messages
+        bootstrap_servers: Kafka brokers, if None an `InMemoryBroker` is used
+    """
+    return await _benchmark_produce(
+        model=model,
+        payload_size=payload_size,
+        num_msgs=num_msgs,
+        bootstrap_servers=bootstrap_servers,
+        sync=False,
+    )
+
+# %% ../../nbs/011_Benchmark.ipynb 15
+def _get_percentiles(latencies_ns: List[int]) -> Dict[str, float]:
+    """Returns the median, 99th percentile and the maximum of latencies in milliseconds"""
+    latencies = sorted(latencies_ns)
+    return {
+        "p50": latencies[len(latencies) // 2] / 1e6,
+        "p99": latencies[min(len(latencies) * 99 // 100, len(latencies) - 1)] / 1e6,
+        "max": latencies[-1] / 1e6,
+    }
+
+
+async def benchmark_producer_manager(
+    *,
+    model: str,
+    payload_size: int,
+    num_msgs: int,
+    bootstrap_servers: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Measures throughput of `AIOKafkaProducerManager` and latency of its messages, from putting a message into
+    its buffer until its delivery is acknowledged
+
+    Messages are put into the buffer as fast as it accepts them, so the latency includes the time spent in the buffer.
+
+    Params:
+        model: one of "flat" or "nested", see `create_msg` for details
+        payload_size: size of messages in bytes
+        num_msgs: number of messages
+        bootstrap_servers: Kafka brokers, if None an `InMemoryBroker` is used
+    """
+    topic = _get_topic()
+    values = _create_values(model, payload_size, num_msgs)
+    enqueued_ns = [0] * num_msgs
+    delivered_ns = [0] * num_msgs
+
+    with _use_broker(bootstrap_servers) as broker:
+        producer = (
+            InMemoryProducer(broker)
+            if broker is not None
+            else AIOKafkaProducer(bootstrap_servers=bootstrap_servers)
+        )
+        send = producer.send
+
+        # keys of messages are their indices, used to record the time their deliveries are acknowledged
+        async def timed_send(topic: str, value: bytes, **kwargs: Any) -> Any:
+            fut = await send(topic, value, **kwargs)
+            i = int(kwargs["key"])
+            fut.add_done_callback(
+                lambda _: delivered_ns.__setitem__(i, time.perf_counter_ns())
+            )
+            return fut
+
+        producer.send = timed_send  # type: ignore
+
+        manager = AIOKafkaProducerManager(producer)
+        await manager.start()
+        t0 = time.perf_counter()
+        try:
+            for i, value in enumerate(values):
+                while manager.is_full:
+                    await asyncio.sleep(0)
+                enqueued_ns[i] = time.perf_counter_ns()
+                manager.send(topic, value, key=b"%d" % i)
+        finally:
+            await manager.stop()
+        seconds = time.perf_counter() - t0
+
+    return _get_result(
+        "producer_manager",
+        model=model,
+        payload_size=payload_size,
+        num_msgs=num_msgs,
+        seconds=seconds,
+        latency_ms=_get_percentiles(
+            [
+                delivered - enqueued
+                for enqueued, delivered in zip(enqueued_ns, delivered_ns)
+            ]
+        ),
+    )
+
+# %% ../../nbs/011_Benchmark.ipynb 18
+BENCHMARKS: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+    "process_msgs": benchmark_process_msgs,
+    "consumer_loop": benchmark_consumer_loop,
+    "produce_sync": benchmark_produce_sync,
+    "produce_async": benchmark_produce_async,
+    "producer_manager": benchmark_producer_manager,
+}
+
+
+async def run_benchmarks(
+    *,
+    benchmarks: Optional[List[str]] = None,
+    models: Optional[List[str]] = None,
+    payload_sizes: Sequence[int] = (100, 1_000, 10_000),
+    num_msgs: int = 10_000,
+    bootstrap_servers: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Runs benchmarks for each combination of a message model and a payload size
+
+    Params:
+        benchmarks: names of benchmarks from `BENCHMARKS`, if None all of them are run
+        models: names of message models from `MODELS`, if None all of them are used
+        payload_sizes: sizes of messages in bytes
+        num_msgs: number of messages sent or consumed by each benchmark
+        bootstrap_servers: Kafka brokers, if None an `InMemoryBroker` is used
+
+    Returns:
+        A dictionary with the description of the environment under "environment" and
+        the list of results of benchmarks under "results"
+
+    Raises:
+        ValueError: if a benchmark or a model is not supported
+    """
+    benchmarks = benchmarks if benchmarks is not None else list(BENCHMARKS)
+    models = models if models is not None else list(MODELS)
+    for benchmark in benchmarks:
+        if benchmark not in BENCHMARKS:
+            raise ValueError(
+                f"benchmark must be one of {list(BENCHMARKS)}, but it is '{benchmark}'."
+            )
+    for model in models:
+        if model not in MODELS:
+            raise ValueError(
+                f"model must be one of {list(MODELS)}, but it is '{model}'."
+            )
+
+    environment = {
+        "fast_kafka_api": fast_kafka_api.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "event_loop": get_event_loop_name(),
+        "broker": bootstrap_servers if bootstrap_servers is not None else "in-memory",
+        "started_at": datetime.utcnow().isoformat(),
+    }
+    results = []
+    for benchmark in benchmarks:
+        for model in models:
+            for payload_size in payload_sizes:
+                logger.info(
+                    f"run_benchmarks(): running {benchmark} for {num_msgs} '{model}' messages of {payload_size} bytes"
+                )
+                results.append(
+                    await BENCHMARKS[benchmark](
+                        model=model,
+                        payload_size=payload_size,
+                        num_msgs=num_msgs,
+                        bootstrap_servers=bootstrap_servers,
+                    )
+                )
+
+    return {"environment": environment, "results": results}
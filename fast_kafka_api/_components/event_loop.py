@@ -0,0 +1,78 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/010_EventLoop.ipynb.
+
+# %% auto 0
+__all__ = ['logger', 'EVENT_LOOPS', 'get_event_loop_policy', 'install_event_loop', 'get_event_loop_name', 'set_thread_pool_size']
+
+# %% ../../nbs/010_EventLoop.ipynb 1
+import asyncio
+import importlib
+from typing import *
+
+import anyio.to_thread
+
+from .logger import get_logger
+
+# %% ../../nbs/010_EventLoop.ipynb 3
+logger = get_logger(__name__)
+
+# %% ../../nbs/010_EventLoop.ipynb 6
+EVENT_LOOPS = ["auto", "asyncio", "uvloop"]
+
+
+def get_event_loop_policy(event_loop: str = "auto") -> asyncio.AbstractEventLoopPolicy:
+    """Returns the policy creating event loops of the implementation
+
+    Params:
+        event_loop: one of "auto", "asyncio" or "uvloop", "auto" chooses uvloop if it is installed and asyncio otherwise
+
+    Raises:
+        ValueError: if **event_loop** is not one of the supported implementations
+        ImportError: if **event_loop** is "uvloop" and it is not installed
+    """
+    if event_loop not in EVENT_LOOPS:
+        raise ValueError(
+            f"event_loop must be one of {EVENT_LOOPS}, but it is '{event_loop}'."
+        )
+    if event_loop in ["auto", "uvloop"]:
+        try:
+            # nosemgrep: python.lang.security.audit.non-literal-import.non-literal-import
+            uvloop = importlib.import_module("uvloop")
+            return uvloop.EventLoopPolicy()  # type: ignore
+        except ImportError as e:
+            if event_loop == "uvloop":
+                raise ImportError(
+                    "Package 'uvloop' is required for the 'uvloop' event loop, please install it with 'pip install uvloop'"
+                ) from e
+    return asyncio.DefaultEventLoopPolicy()
+
+
+def install_event_loop(event_loop: str = "auto") -> None:
+    """Installs the policy of the event loop implementation, event loops created afterwards use it
+
+    Params:
+        event_loop: one of "auto", "asyncio" or "uvloop", see `get_event_loop_policy` for details
+    """
+    policy = get_event_loop_policy(event_loop)
+    asyncio.set_event_loop_policy(policy)
+    logger.info(f"install_event_loop(): using {type(policy).__module__} event loops")
+
+
+def get_event_loop_name(loop: Optional[asyncio.AbstractEventLoop] = None) -> str:
+    """Returns "uvloop" for uvloop event loops and "asyncio" for others
+
+    Params:
+        loop: event loop, if None the running one is used
+    """
+    loop = loop if loop is not None else asyncio.get_running_loop()
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
+
+# %% ../../nbs/010_EventLoop.ipynb 9
+def set_thread_pool_size(size: int) -> None:
+    """Sets the maximum number of worker threads running blocking functions in the running event loop
+
+    Params:
+        size: maximum number of worker threads, e.g. of functions passed to `asyncer.asyncify`
+    """
+    if size < 1:
+        raise ValueError(f"size must be a positive integer, got {size}")
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
@@ -0,0 +1,70 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/006_Events.ipynb.
+
+# %% auto 0
+__all__ = ['T', 'KafkaEvent', 'EventMetadata']
+
+# %% ../../nbs/006_Events.ipynb 1
+from dataclasses import dataclass
+from typing import *
+
+from aiokafka.structs import ConsumerRecord
+
+# %% ../../nbs/006_Events.ipynb 4
+T = TypeVar("T")
+
+
+@dataclass
+class KafkaEvent(Generic[T]):
+    """A message to be produced together with its key, headers, partition and timestamp
+
+    Functions decorated with `produces` can return `KafkaEvent[T]` instead of **T** to control how
+    the message is sent.
+
+    Params:
+        message: the message to be serialized and sent
+        key: the key of the message, used to assign the message to a partition if **partition** is None
+        headers: a list of header names and values
+        partition: the partition to send the message to, if None it is assigned by the partitioner
+        timestamp_ms: the timestamp of the message in milliseconds, if None the current time is used
+    """
+
+    message: T
+    key: Optional[bytes] = None
+    headers: Optional[List[Tuple[str, bytes]]] = None
+    partition: Optional[int] = None
+    timestamp_ms: Optional[int] = None
+
+# %% ../../nbs/006_Events.ipynb 7
+@dataclass
+class EventMetadata:
+    """Metadata of a consumed message
+
+    Functions decorated with `consumes` receive it if they have a parameter named **meta**.
+
+    Params:
+        topic: the topic the message was consumed from
+        partition: the partition the message was consumed from
+        offset: the offset of the message in the partition
+        timestamp: the timestamp of the message in milliseconds
+        key: the raw key of the message
+        headers: a list of header names and values
+    """
+
+    topic: str
+    partition: int
+    offset: int
+    timestamp: int
+    key: Optional[bytes]
+    headers: Sequence[Tuple[str, bytes]]
+
+    @staticmethod
+    def from_record(record: ConsumerRecord) -> "EventMetadata":
+        """Creates metadata of a record returned by `AIOKafkaConsumer.getmany`"""
+        return EventMetadata(
+            topic=record.topic,
+            partition=record.partition,
+            offset=record.offset,
+            timestamp=record.timestamp,
+            key=record.key,
+            headers=record.headers,
+        )
@@ -0,0 +1,279 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/008_Metrics.ipynb.
+
+# %% auto 0
+__all__ = ['logger', 'LabelValues', 'CounterMetric', 'Histogram', 'GaugeFunction', 'MetricsRegistry', 'ConsumerMetrics',
+           'ProducerMetrics']
+
+# %% ../../nbs/008_Metrics.ipynb 1
+from bisect import bisect_left
+from typing import *
+
+from .logger import get_logger
+
+# %% ../../nbs/008_Metrics.ipynb 3
+logger = get_logger(__name__)
+
+# %% ../../nbs/008_Metrics.ipynb 6
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str]) -> str:
+    if not labelnames:
+        return ""
+    labels = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)
+    )
+    return "{" + labels + "}"
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        # the last count is for observations larger than all buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class CounterMetric:
+    """Monotonically increasing value, e.g. the number of consumed messages"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, _CounterChild] = {}
+
+    def labels(self, *labelvalues: str) -> _CounterChild:
+        """Returns the child for the label values, it should be kept and reused on the hot path"""
+        if labelvalues not in self._children:
+            self._children[labelvalues] = _CounterChild()
+        return self._children[labelvalues]
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labelvalues)} {child.value}"
+            for labelvalues, child in self._children.items()
+        ]
+
+
+class Histogram:
+    """Distribution of observed values, e.g. latencies, counted in cumulative buckets"""
+
+    type_name = "histogram"
+
+    DEFAULT_BUCKETS = (
+        0.0001,
+        0.0005,
+        0.001,
+        0.005,
+        0.01,
+        0.05,
+        0.1,
+        0.5,
+        1.0,
+        5.0,
+        10.0,
+    )
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[LabelValues, _HistogramChild] = {}
+
+    def labels(self, *labelvalues: str) -> _HistogramChild:
+        """Returns the child for the label values, it should be kept and reused on the hot path"""
+        if labelvalues not in self._children:
+            self._children[labelvalues] = _HistogramChild(self.buckets)
+        return self._children[labelvalues]
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for labelvalues, child in self._children.items():
+            cumulative = 0
+            for le, count in zip([*self.buckets, "+Inf"], child.counts):
+                cumulative += count
+                labels = _format_labels(
+                    [*self.labelnames, "le"], [*labelvalues, str(le)]
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {child.sum}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class GaugeFunction:
+    """Value read when metrics are rendered, e.g. the current depth of a queue
+
+    Functions are registered under a key, e.g. one for each consumer, and return values for combinations of label values.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._functions: Dict[Any, Callable[[], Dict[LabelValues, float]]] = {}
+
+    def set_function(self, key: Any, f: Callable[[], Dict[LabelValues, float]]) -> None:
+        self._functions[key] = f
+
+    def remove_function(self, key: Any) -> None:
+        self._functions.pop(key, None)
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for f in list(self._functions.values()):
+            try:
+                values = f()
+            except Exception as e:
+                logger.warning(
+                    f"GaugeFunction.render(): exception caught {e.__repr__()} while calling '{f}'"
+                )
+                continue
+            lines.extend(
+                f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}"
+                for labelvalues, value in values.items()
+            )
+        return lines
+
+
+_Metric = TypeVar("_Metric", CounterMetric, Histogram, GaugeFunction)
+
+
+class MetricsRegistry:
+    """Registry of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Union[CounterMetric, Histogram, GaugeFunction]] = {}
+
+    def _get_or_create(
+        self, cls: Type[_Metric], name: str, *args: Any, **kwargs: Any
+    ) -> _Metric:
+        if name not in self._metrics:
+            self._metrics[name] = cls(name, *args, **kwargs)
+        metric = self._metrics[name]
+        if not isinstance(metric, cls):
+            raise ValueError(
+                f"Metric '{name}' is already registered as {type(metric).__name__}."
+            )
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> CounterMetric:
+        """Returns the counter with the name, creating it if needed"""
+        return self._get_or_create(CounterMetric, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Returns the histogram with the name, creating it if needed"""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def gauge_function(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> GaugeFunction:
+        """Returns the gauge with the name, creating it if needed"""
+        return self._get_or_create(GaugeFunction, name, documentation, labelnames)
+
+    def render(self) -> str:
+        """Renders all metrics in the Prometheus text format"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# %% ../../nbs/008_Metrics.ipynb 9
+class ConsumerMetrics:
+    """Metrics updated by consumer loops"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.consumed = registry.counter(
+            "fast_kafka_api_consumed_messages_total",
+            "Number of messages polled from the topic",
+            ["topic"],
+        )
+        self.failed = registry.counter(
+            "fast_kafka_api_failed_messages_total",
+            "Number of messages for which the callback failed after retries or which could not be decoded",
+            ["topic"],
+        )
+        self.decode_seconds = registry.histogram(
+            "fast_kafka_api_decode_seconds",
+            "Time spent decoding messages polled from a topic partition at once",
+            ["topic"],
+        )
+        self.callback_seconds = registry.histogram(
+            "fast_kafka_api_callback_seconds",
+            "Time spent in a callback, including in-process retries",
+            ["topic"],
+        )
+        self.queue_depth = registry.gauge_function(
+            "fast_kafka_api_consumer_queue_depth",
+            "Number of items waiting in memory streams of a consumer loop",
+            ["topics"],
+        )
+        self.lag = registry.gauge_function(
+            "fast_kafka_api_consumer_lag",
+            "Number of messages in the partition not polled yet, based on the last known high watermark",
+            ["topic", "partition"],
+        )
+
+
+class ProducerMetrics:
+    """Metrics updated by producers"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.produced = registry.counter(
+            "fast_kafka_api_produced_messages_total",
+            "Number of messages sent to the topic",
+            ["topic"],
+        )
+        self.queue_depth = registry.gauge_function(
+            "fast_kafka_api_producer_queue_depth",
+            "Number of messages waiting in the buffer of a producer manager",
+            ["producer"],
+        )
+        self.in_flight = registry.gauge_function(
+            "fast_kafka_api_in_flight_messages",
+            "Number of sent messages waiting to be acknowledged",
+            ["producer"],
+        )
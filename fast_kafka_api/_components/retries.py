@@ -0,0 +1,131 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/007_Retries.ipynb.
+
+# %% auto 0
+__all__ = ['logger', 'ORIGINAL_TOPIC_HEADER', 'EXCEPTION_HEADER', 'OnFailure', 'RetryPolicy', 'call_with_retries',
+           'call_with_retries_sync', 'get_failure_headers']
+
+# %% ../../nbs/007_Retries.ipynb 1
+import asyncio
+import time
+from typing import *
+
+from aiokafka.structs import ConsumerRecord
+from pydantic import BaseModel, Field, NonNegativeInt, confloat
+
+from .logger import get_logger
+
+# %% ../../nbs/007_Retries.ipynb 3
+logger = get_logger(__name__)
+
+# %% ../../nbs/007_Retries.ipynb 6
+class RetryPolicy(BaseModel):
+    """Policy for messages whose consumer raised an exception
+
+    A failed message is first retried in-process up to **max_retries** times with an exponential backoff.
+    If it still fails, it is sent to the first retry topic, consumed again after a delay and, if it fails
+    again, sent to the next retry topic. Messages failing in the last retry topic, and messages which cannot
+    be deserialized, are sent to the dead-letter topic.
+    """
+
+    max_retries: NonNegativeInt = Field(
+        3,
+        description="number of in-process retries before the message is sent to a retry topic",
+    )
+    backoff_ms: NonNegativeInt = Field(
+        100, description="delay before the first in-process retry in milliseconds"
+    )
+    backoff_multiplier: confloat(ge=1.0) = Field(  # type: ignore
+        2.0, description="factor by which the delay increases after each retry"
+    )
+    max_backoff_ms: NonNegativeInt = Field(
+        10_000, description="maximum delay between in-process retries in milliseconds"
+    )
+    retry_delays_ms: List[NonNegativeInt] = Field(
+        [],
+        description="delays of retry topics in milliseconds, a retry topic is created for each of them",
+    )
+    dead_letter_topic: Optional[str] = Field(
+        None,
+        description="topic failed messages are sent to, if None the dead-letter topic of the app is used",
+    )
+
+    def get_backoff_ms(self, attempt: int) -> float:
+        """Returns the delay in milliseconds before the in-process retry number **attempt** (starting from 0)"""
+        return float(
+            min(
+                self.backoff_ms * self.backoff_multiplier**attempt,
+                self.max_backoff_ms,
+            )
+        )
+
+    def get_retry_topics(self, topic: str) -> List[str]:
+        """Returns names of retry topics for the topic, one for each delay in **retry_delays_ms**"""
+        return [f"{topic}_retry_{delay_ms}ms" for delay_ms in self.retry_delays_ms]
+
+# %% ../../nbs/007_Retries.ipynb 8
+async def call_with_retries(
+    callback: Callable[[Any], Awaitable[None]],
+    msg: Any,
+    *,
+    retry_policy: Optional[RetryPolicy],
+) -> None:
+    """Awaits the callback with the message, retrying it according to the retry policy
+
+    Raises:
+        the exception raised by the last attempt if all attempts failed
+    """
+    max_retries = retry_policy.max_retries if retry_policy is not None else 0
+    for attempt in range(max_retries + 1):
+        try:
+            await callback(msg)
+            return
+        except Exception as e:
+            if attempt == max_retries:
+                raise e
+            backoff_ms = retry_policy.get_backoff_ms(attempt)  # type: ignore
+            logger.info(
+                f"call_with_retries(): exception caught {e.__repr__()}, retrying in {backoff_ms} ms"
+            )
+            await asyncio.sleep(backoff_ms / 1000)
+
+# %% ../../nbs/007_Retries.ipynb 10
+def call_with_retries_sync(
+    callback: Callable[[Any], None],
+    msg: Any,
+    *,
+    retry_policy: Optional[RetryPolicy],
+) -> None:
+    """Calls the callback with the message, retrying it according to the retry policy
+
+    Blocking version of `call_with_retries` used in worker processes.
+
+    Raises:
+        the exception raised by the last attempt if all attempts failed
+    """
+    max_retries = retry_policy.max_retries if retry_policy is not None else 0
+    for attempt in range(max_retries + 1):
+        try:
+            callback(msg)
+            return
+        except Exception as e:
+            if attempt == max_retries:
+                raise e
+            time.sleep(retry_policy.get_backoff_ms(attempt) / 1000)  # type: ignore
+
+# %% ../../nbs/007_Retries.ipynb 13
+ORIGINAL_TOPIC_HEADER = "x-original-topic"
+EXCEPTION_HEADER = "x-exception"
+
+OnFailure = Callable[[List[ConsumerRecord], BaseException, bool], None]  # type: ignore
+"""Function called with failed records, the exception and a flag telling if the records should be retried"""
+
+
+def get_failure_headers(  # type: ignore
+    record: ConsumerRecord, e: BaseException
+) -> List[Tuple[str, bytes]]:
+    """Returns headers of the record extended with its original topic and the exception it failed with"""
+    headers = [(k, v) for k, v in record.headers if k != EXCEPTION_HEADER]
+    if not any(k == ORIGINAL_TOPIC_HEADER for k, _ in headers):
+        headers.append((ORIGINAL_TOPIC_HEADER, record.topic.encode("utf-8")))
+    headers.append((EXCEPTION_HEADER, e.__repr__().encode("utf-8")))
+    return headers
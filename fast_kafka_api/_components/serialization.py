@@ -0,0 +1,220 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/005_Serialization.ipynb.
+
+# %% auto 0
+__all__ = ['logger', 'Deserializer', 'Serializer', 'get_deserializer', 'get_serializer']
+
+# %% ../../nbs/005_Serialization.ipynb 1
+import importlib
+import json
+from typing import *
+
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+from .logger import get_logger
+
+# %% ../../nbs/005_Serialization.ipynb 3
+logger = get_logger(__name__)
+
+# %% ../../nbs/005_Serialization.ipynb 6
+def _import_optional(module_name: str, option: str) -> Any:
+    """Imports a package needed only for some of the (de)serialization options"""
+    try:
+        # nosemgrep: python.lang.security.audit.non-literal-import.non-literal-import
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(
+            f"Package '{module_name}' is required for the '{option}' option, please install it with 'pip install {module_name.split('.')[0]}'"
+        ) from e
+
+# %% ../../nbs/005_Serialization.ipynb 8
+Deserializer = Callable[[List[bytes]], List[Any]]
+
+
+def _get_json_deserializer(msg_type: Type[BaseModel]) -> Deserializer:
+    parse_raw = msg_type.parse_raw
+
+    def _deserialize(values: List[bytes]) -> List[Any]:
+        return [parse_raw(value) for value in values]
+
+    return _deserialize
+
+
+def _get_orjson_deserializer(msg_type: Type[BaseModel]) -> Deserializer:
+    loads = _import_optional("orjson", "orjson").loads
+    parse_obj = msg_type.parse_obj
+
+    def _deserialize(values: List[bytes]) -> List[Any]:
+        return [parse_obj(loads(value)) for value in values]
+
+    return _deserialize
+
+
+def _get_msgspec_deserializer(msg_type: Type[Any]) -> Deserializer:
+    msgspec = _import_optional("msgspec", "msgspec")
+
+    if isinstance(msg_type, type) and issubclass(msg_type, msgspec.Struct):
+        decode = msgspec.json.Decoder(msg_type).decode
+
+        def _deserialize(values: List[bytes]) -> List[Any]:
+            return [decode(value) for value in values]
+
+    else:
+        decode = msgspec.json.Decoder().decode
+        parse_obj = msg_type.parse_obj
+
+        def _deserialize(values: List[bytes]) -> List[Any]:
+            return [parse_obj(decode(value)) for value in values]
+
+    return _deserialize
+
+
+def _get_trusted_deserializer(msg_type: Type[BaseModel]) -> Deserializer:
+    try:
+        loads = _import_optional("orjson", "trusted").loads
+    except ImportError:
+        loads = json.loads
+    construct = msg_type.construct
+
+    def _deserialize(values: List[bytes]) -> List[Any]:
+        return [construct(**loads(value)) for value in values]
+
+    return _deserialize
+
+
+def _get_raw_deserializer(msg_type: Type[Any]) -> Deserializer:
+    def _deserialize(values: List[bytes]) -> List[Any]:
+        return values
+
+    return _deserialize
+
+
+_deserializers: Dict[str, Callable[[Type[Any]], Deserializer]] = {
+    "json": _get_json_deserializer,
+    "orjson": _get_orjson_deserializer,
+    "msgspec": _get_msgspec_deserializer,
+    "trusted": _get_trusted_deserializer,
+    "raw": _get_raw_deserializer,
+}
+
+
+def get_deserializer(
+    deserializer: Union[str, Callable[[bytes], Any]], msg_type: Type[Any]
+) -> Deserializer:
+    """Returns a function deserializing a list of raw message values into a list of messages
+
+    The function is meant to be created once per topic and reused for every batch of polled messages.
+
+    Params:
+        deserializer: either a function deserializing a single raw message value or one of the following:
+            "json": validates messages using pydantic's `parse_raw`, default
+            "orjson": decodes messages using orjson and validates them using pydantic's `parse_obj`
+            "msgspec": decodes messages using msgspec, directly into **msg_type** if it is a `msgspec.Struct`
+            "trusted": decodes messages and creates them using pydantic's `construct` without any validation,
+                nested models are left as dictionaries
+            "raw": passes raw bytes to the consumer
+        msg_type: type of the messages
+
+    Returns:
+        A function deserializing a list of raw message values
+
+    Throws:
+        ValueError, ImportError
+    """
+    if callable(deserializer):
+        f = deserializer
+
+        def _deserialize(values: List[bytes]) -> List[Any]:
+            return [f(value) for value in values]
+
+        return _deserialize
+
+    if deserializer not in _deserializers:
+        raise ValueError(
+            f"deserializer must be a callable or one of {list(_deserializers.keys())}, but it is '{deserializer}'."
+        )
+    return _deserializers[deserializer](msg_type)
+
+# %% ../../nbs/005_Serialization.ipynb 12
+def _to_json_utf8(o: Any) -> bytes:
+    """Converts to JSON and then encodes with UTF-8"""
+    if hasattr(o, "json"):
+        return o.json().encode("utf-8")  # type: ignore
+    else:
+        return json.dumps(o).encode("utf-8")
+
+# %% ../../nbs/005_Serialization.ipynb 14
+Serializer = Callable[[Any], bytes]
+
+
+def _get_json_serializer(msg_type: Optional[Type[Any]]) -> Serializer:
+    return _to_json_utf8
+
+
+def _get_json_default(msg_type: Optional[Type[Any]]) -> Callable[[Any], Any]:
+    """Returns the JSON encoder of a pydantic model, including custom `json_encoders` from its config"""
+    return getattr(msg_type, "__json_encoder__", pydantic_encoder)  # type: ignore
+
+
+def _get_orjson_serializer(msg_type: Optional[Type[Any]]) -> Serializer:
+    dumps = _import_optional("orjson", "orjson").dumps
+    default = _get_json_default(msg_type)
+
+    def _serialize(o: Any) -> bytes:
+        return dumps(o.dict() if isinstance(o, BaseModel) else o, default=default)  # type: ignore
+
+    return _serialize
+
+
+def _get_msgspec_serializer(msg_type: Optional[Type[Any]]) -> Serializer:
+    msgspec = _import_optional("msgspec", "msgspec")
+    default = _get_json_default(msg_type)
+
+    def _enc_hook(o: Any) -> Any:
+        # msgspec does not encode subclasses of str such as pydantic.HttpUrl
+        return str(o) if isinstance(o, str) else default(o)
+
+    encode = msgspec.json.Encoder(enc_hook=_enc_hook).encode
+
+    def _serialize(o: Any) -> bytes:
+        return encode(o.dict() if isinstance(o, BaseModel) else o)  # type: ignore
+
+    return _serialize
+
+
+_serializers: Dict[str, Callable[[Optional[Type[Any]]], Serializer]] = {
+    "json": _get_json_serializer,
+    "orjson": _get_orjson_serializer,
+    "msgspec": _get_msgspec_serializer,
+}
+
+
+def get_serializer(
+    serializer: Union[str, Serializer], msg_type: Optional[Type[Any]] = None
+) -> Serializer:
+    """Returns a function serializing a message into bytes
+
+    The function is meant to be created once per topic and reused for every produced message.
+
+    Params:
+        serializer: either a function serializing a single message into bytes (e.g. Avro or Protobuf encoder)
+            or one of the following:
+            "json": serializes messages using pydantic's `json`, default
+            "orjson": serializes messages using orjson
+            "msgspec": serializes messages using msgspec, `msgspec.Struct` messages are serialized directly
+        msg_type: type of the messages, used to precompile the encoder of custom types
+
+    Returns:
+        A function serializing a message into bytes
+
+    Throws:
+        ValueError, ImportError
+    """
+    if callable(serializer):
+        return serializer
+
+    if serializer not in _serializers:
+        raise ValueError(
+            f"serializer must be a callable or one of {list(_serializers.keys())}, but it is '{serializer}'."
+        )
+    return _serializers[serializer](msg_type)
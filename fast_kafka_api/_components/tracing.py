@@ -0,0 +1,180 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../../nbs/009_Tracing.ipynb.
+
+# %% auto 0
+__all__ = ['logger', 'Headers', 'get_record_attributes', 'Tracer', 'record_stages', 'OpenTelemetryTracer']
+
+# %% ../../nbs/009_Tracing.ipynb 1
+import contextlib
+import importlib
+from typing import *
+
+from aiokafka.structs import ConsumerRecord
+
+from .logger import get_logger
+
+# %% ../../nbs/009_Tracing.ipynb 3
+logger = get_logger(__name__)
+
+# %% ../../nbs/009_Tracing.ipynb 6
+Headers = Sequence[Tuple[str, bytes]]
+
+
+def get_record_attributes(record: ConsumerRecord) -> Dict[str, Any]:
+    """Returns attributes of spans of a consumed record, following OpenTelemetry semantic conventions for messaging"""
+    return {
+        "messaging.system": "kafka",
+        "messaging.destination": record.topic,
+        "messaging.kafka.partition": record.partition,
+        "messaging.kafka.message.offset": record.offset,
+    }
+
+
+class Tracer:
+    """Interface of tracers of the consume, handle and produce path, this implementation does nothing"""
+
+    def record_stage(
+        self,
+        name: str,
+        *,
+        start_ns: int,
+        end_ns: int,
+        attributes: Dict[str, Any],
+        headers: Optional[Headers] = None,
+    ) -> None:
+        """Records a finished stage, e.g. polling or decoding of a message
+
+        Params:
+            name: name of the stage
+            start_ns: start of the stage, in nanoseconds since the epoch
+            end_ns: end of the stage, in nanoseconds since the epoch
+            attributes: attributes of the stage, e.g. the topic and the offset of the message
+            headers: headers of the message, carrying the context of the trace it belongs to
+        """
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        kind: str,
+        attributes: Dict[str, Any],
+        headers: Optional[Headers] = None,
+    ) -> ContextManager[Any]:
+        """Returns a context manager of a stage which is current while it runs, e.g. handling of a message
+
+        Params:
+            name: name of the stage
+            kind: "consumer" for stages processing consumed messages, "producer" for stages producing messages
+            attributes: attributes of the stage
+            headers: headers of the consumed message, carrying the context of the trace it belongs to
+        """
+        return contextlib.nullcontext()
+
+    def inject(self, headers: Optional[Headers]) -> Optional[Headers]:
+        """Returns **headers** of a message to be produced with the context of the current stage added"""
+        return headers
+
+
+def record_stages(
+    tracer: Tracer,
+    name: str,
+    records: Iterable[ConsumerRecord],
+    *,
+    start_ns: int,
+    end_ns: int,
+) -> None:
+    """Records a finished stage shared by records, e.g. the poll which returned them, in the trace of each of them"""
+    for record in records:
+        tracer.record_stage(
+            name,
+            start_ns=start_ns,
+            end_ns=end_ns,
+            attributes=get_record_attributes(record),
+            headers=record.headers,
+        )
+
+# %% ../../nbs/009_Tracing.ipynb 9
+def _import_opentelemetry(module_name: str) -> Any:
+    try:
+        # nosemgrep: python.lang.security.audit.non-literal-import.non-literal-import
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(
+            "Package 'opentelemetry-api' is required for OpenTelemetryTracer, please install it with 'pip install opentelemetry-api'"
+        ) from e
+
+
+class OpenTelemetryTracer(Tracer):
+    """Tracer recording stages as OpenTelemetry spans"""
+
+    def __init__(
+        self, tracer_provider: Optional[Any] = None, propagator: Optional[Any] = None
+    ):
+        """Creates a tracer
+
+        Params:
+            tracer_provider: OpenTelemetry tracer provider, if None the global one is used
+            propagator: OpenTelemetry text map propagator used for headers, if None the global one is used
+        """
+        trace = _import_opentelemetry("opentelemetry.trace")
+        propagate = _import_opentelemetry("opentelemetry.propagate")
+        self._tracer = trace.get_tracer(
+            "fast_kafka_api", tracer_provider=tracer_provider
+        )
+        self._propagator = (
+            propagator if propagator is not None else propagate.get_global_textmap()
+        )
+        self._span_kinds = {
+            "consumer": trace.SpanKind.CONSUMER,
+            "producer": trace.SpanKind.PRODUCER,
+        }
+
+    def _extract(self, headers: Optional[Headers]) -> Optional[Any]:
+        if not headers:
+            return None
+        carrier = {
+            key: value.decode("latin-1") for key, value in headers if value is not None
+        }
+        return self._propagator.extract(carrier=carrier)
+
+    def record_stage(
+        self,
+        name: str,
+        *,
+        start_ns: int,
+        end_ns: int,
+        attributes: Dict[str, Any],
+        headers: Optional[Headers] = None,
+    ) -> None:
+        span = self._tracer.start_span(
+            name,
+            context=self._extract(headers),
+            kind=self._span_kinds["consumer"],
+            attributes=attributes,
+            start_time=start_ns,
+        )
+        span.end(end_time=end_ns)
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        kind: str,
+        attributes: Dict[str, Any],
+        headers: Optional[Headers] = None,
+    ) -> ContextManager[Any]:
+        return self._tracer.start_as_current_span(  # type: ignore
+            name,
+            context=self._extract(headers),
+            kind=self._span_kinds[kind],
+            attributes=attributes,
+        )
+
+    def inject(self, headers: Optional[Headers]) -> Optional[Headers]:
+        carrier: Dict[str, str] = {}
+        self._propagator.inject(carrier)
+        if not carrier:
+            return headers
+        return [
+            *((key, value) for key, value in headers or [] if key not in carrier),
+            *((key, value.encode("latin-1")) for key, value in carrier.items()),
+        ]
@@ -5,28 +5,104 @@ d = { 'settings': { 'branch': 'main',
                 'doc_host': 'https://airtai.github.io',
                 'git_url': 'https://github.com/airtai/fast-kafka-api',
                 'lib_path': 'fast_kafka_api'},
-  'syms': { 'fast_kafka_api._components.aiokafka_consumer_loop': { 'fast_kafka_api._components.aiokafka_consumer_loop._aiokafka_consumer_loop': ( 'consumerloop.html#_aiokafka_consumer_loop',
+  'syms': { 'fast_kafka_api._components.aiokafka_consumer_loop': { 'fast_kafka_api._components.aiokafka_consumer_loop._BufferedBytes': ( 'consumerloop.html#_bufferedbytes',
+                                                                                                                                         'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._BufferedBytes.__init__': ( 'consumerloop.html#_bufferedbytes.__init__',
                                                                                                                                                   'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._BufferedBytes.add': ( 'consumerloop.html#_bufferedbytes.add',
+                                                                                                                                             'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._BufferedBytes.release': ( 'consumerloop.html#_bufferedbytes.release',
+                                                                                                                                                 'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._CommitOnRevoke': ( 'consumerloop.html#_commitonrevoke',
+                                                                                                                                          'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._CommitOnRevoke.__init__': ( 'consumerloop.html#_commitonrevoke.__init__',
+                                                                                                                                                   'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._CommitOnRevoke.on_partitions_assigned': ( 'consumerloop.html#_commitonrevoke.on_partitions_assigned',
+                                                                                                                                                                 'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._CommitOnRevoke.on_partitions_revoked': ( 'consumerloop.html#_commitonrevoke.on_partitions_revoked',
+                                                                                                                                                                'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._OffsetWatermarks': ( 'consumerloop.html#_offsetwatermarks',
+                                                                                                                                            'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._OffsetWatermarks.__init__': ( 'consumerloop.html#_offsetwatermarks.__init__',
+                                                                                                                                                     'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._OffsetWatermarks.commit': ( 'consumerloop.html#_offsetwatermarks.commit',
+                                                                                                                                                   'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._OffsetWatermarks.mark_completed': ( 'consumerloop.html#_offsetwatermarks.mark_completed',
+                                                                                                                                                           'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._OffsetWatermarks.revoke': ( 'consumerloop.html#_offsetwatermarks.revoke',
+                                                                                                                                                   'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._OffsetWatermarks.should_commit': ( 'consumerloop.html#_offsetwatermarks.should_commit',
+                                                                                                                                                          'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._accepts_meta': ( 'consumerloop.html#_accepts_meta',
+                                                                                                                                        'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._aiokafka_consumer_loop': ( 'consumerloop.html#_aiokafka_consumer_loop',
+                                                                                                                                                  'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._call_sync': ( 'consumerloop.html#_call_sync',
+                                                                                                                                     'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._cancel_on_event': ( 'consumerloop.html#_cancel_on_event',
+                                                                                                                                           'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._deserialize_records': ( 'consumerloop.html#_deserialize_records',
+                                                                                                                                               'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._get_lag': ( 'consumerloop.html#_get_lag',
+                                                                                                                                   'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._get_record_size': ( 'consumerloop.html#_get_record_size',
+                                                                                                                                           'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._get_worker_deserializer': ( 'consumerloop.html#_get_worker_deserializer',
+                                                                                                                                                   'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._get_worker_index': ( 'consumerloop.html#_get_worker_index',
+                                                                                                                                            'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._getmany': ( 'consumerloop.html#_getmany',
+                                                                                                                                   'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._prepare_callback': ( 'consumerloop.html#_prepare_callback',
+                                                                                                                                            'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._process_in_worker': ( 'consumerloop.html#_process_in_worker',
+                                                                                                                                             'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop._safe_on_failure': ( 'consumerloop.html#_safe_on_failure',
+                                                                                                                                           'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
                                                                    'fast_kafka_api._components.aiokafka_consumer_loop.aiokafka_consumer_loop': ( 'consumerloop.html#aiokafka_consumer_loop',
                                                                                                                                                  'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
                                                                    'fast_kafka_api._components.aiokafka_consumer_loop.process_message_callback': ( 'consumerloop.html#process_message_callback',
                                                                                                                                                    'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
                                                                    'fast_kafka_api._components.aiokafka_consumer_loop.process_msgs': ( 'consumerloop.html#process_msgs',
                                                                                                                                        'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
+                                                                   'fast_kafka_api._components.aiokafka_consumer_loop.process_msgs_in_executor': ( 'consumerloop.html#process_msgs_in_executor',
+                                                                                                                                                   'fast_kafka_api/_components/aiokafka_consumer_loop.py'),
                                                                    'fast_kafka_api._components.aiokafka_consumer_loop.sanitize_kafka_config': ( 'consumerloop.html#sanitize_kafka_config',
                                                                                                                                                 'fast_kafka_api/_components/aiokafka_consumer_loop.py')},
             'fast_kafka_api._components.aiokafka_producer_manager': { 'fast_kafka_api._components.aiokafka_producer_manager.AIOKafkaProducerManager': ( 'producermanager.html#aiokafkaproducermanager',
                                                                                                                                                         'fast_kafka_api/_components/aiokafka_producer_manager.py'),
                                                                       'fast_kafka_api._components.aiokafka_producer_manager.AIOKafkaProducerManager.__init__': ( 'producermanager.html#aiokafkaproducermanager.__init__',
                                                                                                                                                                  'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.AIOKafkaProducerManager.close': ( 'producermanager.html#aiokafkaproducermanager.close',
+                                                                                                                                                              'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.AIOKafkaProducerManager.in_flight': ( 'producermanager.html#aiokafkaproducermanager.in_flight',
+                                                                                                                                                                  'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.AIOKafkaProducerManager.is_full': ( 'producermanager.html#aiokafkaproducermanager.is_full',
+                                                                                                                                                                'fast_kafka_api/_components/aiokafka_producer_manager.py'),
                                                                       'fast_kafka_api._components.aiokafka_producer_manager.AIOKafkaProducerManager.send': ( 'producermanager.html#aiokafkaproducermanager.send',
                                                                                                                                                              'fast_kafka_api/_components/aiokafka_producer_manager.py'),
                                                                       'fast_kafka_api._components.aiokafka_producer_manager.AIOKafkaProducerManager.start': ( 'producermanager.html#aiokafkaproducermanager.start',
                                                                                                                                                               'fast_kafka_api/_components/aiokafka_producer_manager.py'),
                                                                       'fast_kafka_api._components.aiokafka_producer_manager.AIOKafkaProducerManager.stop': ( 'producermanager.html#aiokafkaproducermanager.stop',
                                                                                                                                                              'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.DeliveryTracker': ( 'producermanager.html#deliverytracker',
+                                                                                                                                                'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.DeliveryTracker.__init__': ( 'producermanager.html#deliverytracker.__init__',
+                                                                                                                                                         'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.DeliveryTracker._on_done': ( 'producermanager.html#deliverytracker._on_done',
+                                                                                                                                                         'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.DeliveryTracker.add': ( 'producermanager.html#deliverytracker.add',
+                                                                                                                                                    'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.DeliveryTracker.in_flight': ( 'producermanager.html#deliverytracker.in_flight',
+                                                                                                                                                          'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.DeliveryTracker.join': ( 'producermanager.html#deliverytracker.join',
+                                                                                                                                                     'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.DeliveryTracker.wait_for_capacity': ( 'producermanager.html#deliverytracker.wait_for_capacity',
+                                                                                                                                                                  'fast_kafka_api/_components/aiokafka_producer_manager.py'),
                                                                       'fast_kafka_api._components.aiokafka_producer_manager._aiokafka_producer_manager': ( 'producermanager.html#_aiokafka_producer_manager',
-                                                                                                                                                           'fast_kafka_api/_components/aiokafka_producer_manager.py')},
+                                                                                                                                                           'fast_kafka_api/_components/aiokafka_producer_manager.py'),
+                                                                      'fast_kafka_api._components.aiokafka_producer_manager.send_batches': ( 'producermanager.html#send_batches',
+                                                                                                                                             'fast_kafka_api/_components/aiokafka_producer_manager.py')},
             'fast_kafka_api._components.asyncapi': { 'fast_kafka_api._components.asyncapi.APIKeyLocation': ( 'asyncapi.html#apikeylocation',
                                                                                                              'fast_kafka_api/_components/asyncapi.py'),
                                                      'fast_kafka_api._components.asyncapi.ContactInfo': ( 'asyncapi.html#contactinfo',
@@ -77,18 +153,74 @@ d = { 'settings': { 'branch': 'main',
                                                                                                                         'fast_kafka_api/_components/asyncapi.py'),
                                                      'fast_kafka_api._components.asyncapi._get_msg_cls_for_producer': ( 'asyncapi.html#_get_msg_cls_for_producer',
                                                                                                                         'fast_kafka_api/_components/asyncapi.py'),
+                                                     'fast_kafka_api._components.asyncapi._get_msg_cls_name': ( 'asyncapi.html#_get_msg_cls_name',
+                                                                                                                'fast_kafka_api/_components/asyncapi.py'),
                                                      'fast_kafka_api._components.asyncapi._get_msg_definitions_with_examples': ( 'asyncapi.html#_get_msg_definitions_with_examples',
                                                                                                                                  'fast_kafka_api/_components/asyncapi.py'),
+                                                     'fast_kafka_api._components.asyncapi._get_other_msg_definitions': ( 'asyncapi.html#_get_other_msg_definitions',
+                                                                                                                         'fast_kafka_api/_components/asyncapi.py'),
                                                      'fast_kafka_api._components.asyncapi._get_security_schemes': ( 'asyncapi.html#_get_security_schemes',
                                                                                                                     'fast_kafka_api/_components/asyncapi.py'),
                                                      'fast_kafka_api._components.asyncapi._get_servers_schema': ( 'asyncapi.html#_get_servers_schema',
                                                                                                                   'fast_kafka_api/_components/asyncapi.py'),
                                                      'fast_kafka_api._components.asyncapi._get_topic_dict': ( 'asyncapi.html#_get_topic_dict',
                                                                                                               'fast_kafka_api/_components/asyncapi.py'),
+                                                     'fast_kafka_api._components.asyncapi._has_pydantic_schema': ( 'asyncapi.html#_has_pydantic_schema',
+                                                                                                                   'fast_kafka_api/_components/asyncapi.py'),
+                                                     'fast_kafka_api._components.asyncapi._read_hash': ( 'asyncapi.html#_read_hash',
+                                                                                                         'fast_kafka_api/_components/asyncapi.py'),
                                                      'fast_kafka_api._components.asyncapi.export_async_spec': ( 'asyncapi.html#export_async_spec',
                                                                                                                 'fast_kafka_api/_components/asyncapi.py'),
                                                      'fast_kafka_api._components.asyncapi.yaml_file_cmp': ( 'asyncapi.html#yaml_file_cmp',
                                                                                                             'fast_kafka_api/_components/asyncapi.py')},
+            'fast_kafka_api._components.benchmark': { 'fast_kafka_api._components.benchmark._FlatMsg': ( 'benchmark.html#_flatmsg',
+                                                                                                         'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark._Item': ( 'benchmark.html#_item',
+                                                                                                      'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark._NestedMsg': ( 'benchmark.html#_nestedmsg',
+                                                                                                           'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark._benchmark_produce': ( 'benchmark.html#_benchmark_produce',
+                                                                                                                   'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark._create_values': ( 'benchmark.html#_create_values',
+                                                                                                               'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark._fill_topic': ( 'benchmark.html#_fill_topic',
+                                                                                                            'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark._get_percentiles': ( 'benchmark.html#_get_percentiles',
+                                                                                                                 'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark._get_result': ( 'benchmark.html#_get_result',
+                                                                                                            'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark._get_topic': ( 'benchmark.html#_get_topic',
+                                                                                                           'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark._use_broker': ( 'benchmark.html#_use_broker',
+                                                                                                            'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark.benchmark_consumer_loop': ( 'benchmark.html#benchmark_consumer_loop',
+                                                                                                                        'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark.benchmark_process_msgs': ( 'benchmark.html#benchmark_process_msgs',
+                                                                                                                       'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark.benchmark_produce_async': ( 'benchmark.html#benchmark_produce_async',
+                                                                                                                        'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark.benchmark_produce_sync': ( 'benchmark.html#benchmark_produce_sync',
+                                                                                                                       'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark.benchmark_producer_manager': ( 'benchmark.html#benchmark_producer_manager',
+                                                                                                                           'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark.create_msg': ( 'benchmark.html#create_msg',
+                                                                                                           'fast_kafka_api/_components/benchmark.py'),
+                                                      'fast_kafka_api._components.benchmark.run_benchmarks': ( 'benchmark.html#run_benchmarks',
+                                                                                                               'fast_kafka_api/_components/benchmark.py')},
+            'fast_kafka_api._components.event_loop': { 'fast_kafka_api._components.event_loop.get_event_loop_name': ( 'eventloop.html#get_event_loop_name',
+                                                                                                                      'fast_kafka_api/_components/event_loop.py'),
+                                                       'fast_kafka_api._components.event_loop.get_event_loop_policy': ( 'eventloop.html#get_event_loop_policy',
+                                                                                                                        'fast_kafka_api/_components/event_loop.py'),
+                                                       'fast_kafka_api._components.event_loop.install_event_loop': ( 'eventloop.html#install_event_loop',
+                                                                                                                     'fast_kafka_api/_components/event_loop.py'),
+                                                       'fast_kafka_api._components.event_loop.set_thread_pool_size': ( 'eventloop.html#set_thread_pool_size',
+                                                                                                                       'fast_kafka_api/_components/event_loop.py')},
+            'fast_kafka_api._components.events': { 'fast_kafka_api._components.events.EventMetadata': ( 'events.html#eventmetadata',
+                                                                                                        'fast_kafka_api/_components/events.py'),
+                                                   'fast_kafka_api._components.events.EventMetadata.from_record': ( 'events.html#eventmetadata.from_record',
+                                                                                                                    'fast_kafka_api/_components/events.py'),
+                                                   'fast_kafka_api._components.events.KafkaEvent': ( 'events.html#kafkaevent',
+                                                                                                     'fast_kafka_api/_components/events.py')},
             'fast_kafka_api._components.logger': { 'fast_kafka_api._components.logger.get_default_logger_configuration': ( 'logger.html#get_default_logger_configuration',
                                                                                                                            'fast_kafka_api/_components/logger.py'),
                                                    'fast_kafka_api._components.logger.get_logger': ( 'logger.html#get_logger',
@@ -97,10 +229,140 @@ d = { 'settings': { 'branch': 'main',
                                                                                                     'fast_kafka_api/_components/logger.py'),
                                                    'fast_kafka_api._components.logger.supress_timestamps': ( 'logger.html#supress_timestamps',
                                                                                                              'fast_kafka_api/_components/logger.py')},
+            'fast_kafka_api._components.metrics': { 'fast_kafka_api._components.metrics.ConsumerMetrics': ( 'metrics.html#consumermetrics',
+                                                                                                            'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.ConsumerMetrics.__init__': ( 'metrics.html#consumermetrics.__init__',
+                                                                                                                     'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.CounterMetric': ( 'metrics.html#countermetric',
+                                                                                                          'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.CounterMetric.__init__': ( 'metrics.html#countermetric.__init__',
+                                                                                                                   'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.CounterMetric.labels': ( 'metrics.html#countermetric.labels',
+                                                                                                                 'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.CounterMetric.render': ( 'metrics.html#countermetric.render',
+                                                                                                                 'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.GaugeFunction': ( 'metrics.html#gaugefunction',
+                                                                                                          'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.GaugeFunction.__init__': ( 'metrics.html#gaugefunction.__init__',
+                                                                                                                   'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.GaugeFunction.remove_function': ( 'metrics.html#gaugefunction.remove_function',
+                                                                                                                          'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.GaugeFunction.render': ( 'metrics.html#gaugefunction.render',
+                                                                                                                 'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.GaugeFunction.set_function': ( 'metrics.html#gaugefunction.set_function',
+                                                                                                                       'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.Histogram': ( 'metrics.html#histogram',
+                                                                                                      'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.Histogram.__init__': ( 'metrics.html#histogram.__init__',
+                                                                                                               'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.Histogram.labels': ( 'metrics.html#histogram.labels',
+                                                                                                             'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.Histogram.render': ( 'metrics.html#histogram.render',
+                                                                                                             'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.MetricsRegistry': ( 'metrics.html#metricsregistry',
+                                                                                                            'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.MetricsRegistry.__init__': ( 'metrics.html#metricsregistry.__init__',
+                                                                                                                     'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.MetricsRegistry._get_or_create': ( 'metrics.html#metricsregistry._get_or_create',
+                                                                                                                           'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.MetricsRegistry.counter': ( 'metrics.html#metricsregistry.counter',
+                                                                                                                    'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.MetricsRegistry.gauge_function': ( 'metrics.html#metricsregistry.gauge_function',
+                                                                                                                           'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.MetricsRegistry.histogram': ( 'metrics.html#metricsregistry.histogram',
+                                                                                                                      'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.MetricsRegistry.render': ( 'metrics.html#metricsregistry.render',
+                                                                                                                   'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.ProducerMetrics': ( 'metrics.html#producermetrics',
+                                                                                                            'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics.ProducerMetrics.__init__': ( 'metrics.html#producermetrics.__init__',
+                                                                                                                     'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics._CounterChild': ( 'metrics.html#_counterchild',
+                                                                                                          'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics._CounterChild.__init__': ( 'metrics.html#_counterchild.__init__',
+                                                                                                                   'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics._CounterChild.inc': ( 'metrics.html#_counterchild.inc',
+                                                                                                              'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics._HistogramChild': ( 'metrics.html#_histogramchild',
+                                                                                                            'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics._HistogramChild.__init__': ( 'metrics.html#_histogramchild.__init__',
+                                                                                                                     'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics._HistogramChild.observe': ( 'metrics.html#_histogramchild.observe',
+                                                                                                                    'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics._escape': ( 'metrics.html#_escape',
+                                                                                                    'fast_kafka_api/_components/metrics.py'),
+                                                    'fast_kafka_api._components.metrics._format_labels': ( 'metrics.html#_format_labels',
+                                                                                                           'fast_kafka_api/_components/metrics.py')},
+            'fast_kafka_api._components.retries': { 'fast_kafka_api._components.retries.RetryPolicy': ( 'retries.html#retrypolicy',
+                                                                                                        'fast_kafka_api/_components/retries.py'),
+                                                    'fast_kafka_api._components.retries.RetryPolicy.get_backoff_ms': ( 'retries.html#retrypolicy.get_backoff_ms',
+                                                                                                                       'fast_kafka_api/_components/retries.py'),
+                                                    'fast_kafka_api._components.retries.RetryPolicy.get_retry_topics': ( 'retries.html#retrypolicy.get_retry_topics',
+                                                                                                                         'fast_kafka_api/_components/retries.py'),
+                                                    'fast_kafka_api._components.retries.call_with_retries': ( 'retries.html#call_with_retries',
+                                                                                                              'fast_kafka_api/_components/retries.py'),
+                                                    'fast_kafka_api._components.retries.call_with_retries_sync': ( 'retries.html#call_with_retries_sync',
+                                                                                                                   'fast_kafka_api/_components/retries.py'),
+                                                    'fast_kafka_api._components.retries.get_failure_headers': ( 'retries.html#get_failure_headers',
+                                                                                                                'fast_kafka_api/_components/retries.py')},
+            'fast_kafka_api._components.serialization': { 'fast_kafka_api._components.serialization._get_json_default': ( 'serialization.html#_get_json_default',
+                                                                                                                          'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._get_json_deserializer': ( 'serialization.html#_get_json_deserializer',
+                                                                                                                               'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._get_json_serializer': ( 'serialization.html#_get_json_serializer',
+                                                                                                                             'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._get_msgspec_deserializer': ( 'serialization.html#_get_msgspec_deserializer',
+                                                                                                                                  'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._get_msgspec_serializer': ( 'serialization.html#_get_msgspec_serializer',
+                                                                                                                                'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._get_orjson_deserializer': ( 'serialization.html#_get_orjson_deserializer',
+                                                                                                                                 'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._get_orjson_serializer': ( 'serialization.html#_get_orjson_serializer',
+                                                                                                                               'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._get_raw_deserializer': ( 'serialization.html#_get_raw_deserializer',
+                                                                                                                              'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._get_trusted_deserializer': ( 'serialization.html#_get_trusted_deserializer',
+                                                                                                                                  'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._import_optional': ( 'serialization.html#_import_optional',
+                                                                                                                         'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization._to_json_utf8': ( 'serialization.html#_to_json_utf8',
+                                                                                                                      'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization.get_deserializer': ( 'serialization.html#get_deserializer',
+                                                                                                                         'fast_kafka_api/_components/serialization.py'),
+                                                          'fast_kafka_api._components.serialization.get_serializer': ( 'serialization.html#get_serializer',
+                                                                                                                       'fast_kafka_api/_components/serialization.py')},
+            'fast_kafka_api._components.tracing': { 'fast_kafka_api._components.tracing.OpenTelemetryTracer': ( 'tracing.html#opentelemetrytracer',
+                                                                                                                'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.OpenTelemetryTracer.__init__': ( 'tracing.html#opentelemetrytracer.__init__',
+                                                                                                                         'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.OpenTelemetryTracer._extract': ( 'tracing.html#opentelemetrytracer._extract',
+                                                                                                                         'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.OpenTelemetryTracer.inject': ( 'tracing.html#opentelemetrytracer.inject',
+                                                                                                                       'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.OpenTelemetryTracer.record_stage': ( 'tracing.html#opentelemetrytracer.record_stage',
+                                                                                                                             'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.OpenTelemetryTracer.start_span': ( 'tracing.html#opentelemetrytracer.start_span',
+                                                                                                                           'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.Tracer': ( 'tracing.html#tracer',
+                                                                                                   'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.Tracer.inject': ( 'tracing.html#tracer.inject',
+                                                                                                          'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.Tracer.record_stage': ( 'tracing.html#tracer.record_stage',
+                                                                                                                'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.Tracer.start_span': ( 'tracing.html#tracer.start_span',
+                                                                                                              'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing._import_opentelemetry': ( 'tracing.html#_import_opentelemetry',
+                                                                                                                  'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.get_record_attributes': ( 'tracing.html#get_record_attributes',
+                                                                                                                  'fast_kafka_api/_components/tracing.py'),
+                                                    'fast_kafka_api._components.tracing.record_stages': ( 'tracing.html#record_stages',
+                                                                                                          'fast_kafka_api/_components/tracing.py')},
             'fast_kafka_api.application': { 'fast_kafka_api.application.FastKafkaAPI': ( 'fastkafkaapi.html#fastkafkaapi',
                                                                                          'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.FastKafkaAPI.__init__': ( 'fastkafkaapi.html#fastkafkaapi.__init__',
                                                                                                   'fast_kafka_api/application.py'),
+                                            'fast_kafka_api.application.FastKafkaAPI._generate_async_docs_in_background': ( 'fastkafkaapi.html#fastkafkaapi._generate_async_docs_in_background',
+                                                                                                                            'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.FastKafkaAPI._on_shutdown': ( 'fastkafkaapi.html#fastkafkaapi._on_shutdown',
                                                                                                       'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.FastKafkaAPI._on_startup': ( 'fastkafkaapi.html#fastkafkaapi._on_startup',
@@ -111,6 +373,8 @@ d = { 'settings': { 'branch': 'main',
                                                                                                              'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.FastKafkaAPI._populate_producers': ( 'fastkafkaapi.html#fastkafkaapi._populate_producers',
                                                                                                              'fast_kafka_api/application.py'),
+                                            'fast_kafka_api.application.FastKafkaAPI._send_failed_records': ( 'fastkafkaapi.html#fastkafkaapi._send_failed_records',
+                                                                                                              'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.FastKafkaAPI._shutdown_bg_tasks': ( 'fastkafkaapi.html#fastkafkaapi._shutdown_bg_tasks',
                                                                                                             'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.FastKafkaAPI._shutdown_consumers': ( 'fastkafkaapi.html#fastkafkaapi._shutdown_consumers',
@@ -121,12 +385,20 @@ d = { 'settings': { 'branch': 'main',
                                                                                                   'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.FastKafkaAPI.generate_async_spec': ( 'fastkafkaapi.html#fastkafkaapi.generate_async_spec',
                                                                                                              'fast_kafka_api/application.py'),
+                                            'fast_kafka_api.application.FastKafkaAPI.is_ready': ( 'fastkafkaapi.html#fastkafkaapi.is_ready',
+                                                                                                  'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.FastKafkaAPI.produces': ( 'fastkafkaapi.html#fastkafkaapi.produces',
                                                                                                   'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.FastKafkaAPI.run_in_background': ( 'fastkafkaapi.html#fastkafkaapi.run_in_background',
                                                                                                            'fast_kafka_api/application.py'),
+                                            'fast_kafka_api.application.FastKafkaAPI.wait_until_ready': ( 'fastkafkaapi.html#fastkafkaapi.wait_until_ready',
+                                                                                                          'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application._create_producer': ( 'fastkafkaapi.html#_create_producer',
                                                                                              'fast_kafka_api/application.py'),
+                                            'fast_kafka_api.application._get_config_key': ( 'fastkafkaapi.html#_get_config_key',
+                                                                                            'fast_kafka_api/application.py'),
+                                            'fast_kafka_api.application._get_consumer_msg_type': ( 'fastkafkaapi.html#_get_consumer_msg_type',
+                                                                                                   'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application._get_contact_info': ( 'fastkafkaapi.html#_get_contact_info',
                                                                                               'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application._get_fast_api_app': ( 'fastkafkaapi.html#_get_fast_api_app',
@@ -137,15 +409,115 @@ d = { 'settings': { 'branch': 'main',
                                                                                                'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application._get_kafka_config': ( 'fastkafkaapi.html#_get_kafka_config',
                                                                                               'fast_kafka_api/application.py'),
+                                            'fast_kafka_api.application._get_pooled_producer': ( 'fastkafkaapi.html#_get_pooled_producer',
+                                                                                                 'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application._get_topic_name': ( 'fastkafkaapi.html#_get_topic_name',
                                                                                             'fast_kafka_api/application.py'),
-                                            'fast_kafka_api.application._to_json_utf8': ( 'fastkafkaapi.html#_to_json_utf8',
-                                                                                          'fast_kafka_api/application.py'),
+                                            'fast_kafka_api.application._register_producer_gauges': ( 'fastkafkaapi.html#_register_producer_gauges',
+                                                                                                      'fast_kafka_api/application.py'),
+                                            'fast_kafka_api.application._start_producers': ( 'fastkafkaapi.html#_start_producers',
+                                                                                             'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.filter_using_signature': ( 'fastkafkaapi.html#filter_using_signature',
                                                                                                    'fast_kafka_api/application.py'),
                                             'fast_kafka_api.application.produce_decorator': ( 'fastkafkaapi.html#produce_decorator',
                                                                                               'fast_kafka_api/application.py')},
-            'fast_kafka_api.testing': { 'fast_kafka_api.testing.change_dir': ('test_utils.html#change_dir', 'fast_kafka_api/testing.py'),
+            'fast_kafka_api.testing': { 'fast_kafka_api.testing.InMemoryBroker': ( 'test_utils.html#inmemorybroker',
+                                                                                   'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker.__enter__': ( 'test_utils.html#inmemorybroker.__enter__',
+                                                                                             'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker.__exit__': ( 'test_utils.html#inmemorybroker.__exit__',
+                                                                                            'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker.__init__': ( 'test_utils.html#inmemorybroker.__init__',
+                                                                                            'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker._get_assignment': ( 'test_utils.html#inmemorybroker._get_assignment',
+                                                                                                   'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker._get_partitions': ( 'test_utils.html#inmemorybroker._get_partitions',
+                                                                                                   'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker._join': ( 'test_utils.html#inmemorybroker._join',
+                                                                                         'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker._leave': ( 'test_utils.html#inmemorybroker._leave',
+                                                                                          'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker._notify': ( 'test_utils.html#inmemorybroker._notify',
+                                                                                           'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker._wait': ( 'test_utils.html#inmemorybroker._wait',
+                                                                                         'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker.create_topic': ( 'test_utils.html#inmemorybroker.create_topic',
+                                                                                                'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker.delete_topic': ( 'test_utils.html#inmemorybroker.delete_topic',
+                                                                                                'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker.highwater': ( 'test_utils.html#inmemorybroker.highwater',
+                                                                                             'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryBroker.produce': ( 'test_utils.html#inmemorybroker.produce',
+                                                                                           'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer': ( 'test_utils.html#inmemoryconsumer',
+                                                                                     'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.__init__': ( 'test_utils.html#inmemoryconsumer.__init__',
+                                                                                              'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer._commit': ( 'test_utils.html#inmemoryconsumer._commit',
+                                                                                             'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer._deserialize': ( 'test_utils.html#inmemoryconsumer._deserialize',
+                                                                                                  'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer._fetch': ( 'test_utils.html#inmemoryconsumer._fetch',
+                                                                                            'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer._rebalance': ( 'test_utils.html#inmemoryconsumer._rebalance',
+                                                                                                'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer._reset_position': ( 'test_utils.html#inmemoryconsumer._reset_position',
+                                                                                                     'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.assignment': ( 'test_utils.html#inmemoryconsumer.assignment',
+                                                                                                'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.commit': ( 'test_utils.html#inmemoryconsumer.commit',
+                                                                                            'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.committed': ( 'test_utils.html#inmemoryconsumer.committed',
+                                                                                               'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.getmany': ( 'test_utils.html#inmemoryconsumer.getmany',
+                                                                                             'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.highwater': ( 'test_utils.html#inmemoryconsumer.highwater',
+                                                                                               'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.pause': ( 'test_utils.html#inmemoryconsumer.pause',
+                                                                                           'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.paused': ( 'test_utils.html#inmemoryconsumer.paused',
+                                                                                            'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.position': ( 'test_utils.html#inmemoryconsumer.position',
+                                                                                              'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.resume': ( 'test_utils.html#inmemoryconsumer.resume',
+                                                                                            'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.start': ( 'test_utils.html#inmemoryconsumer.start',
+                                                                                           'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.stop': ( 'test_utils.html#inmemoryconsumer.stop',
+                                                                                          'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryConsumer.subscribe': ( 'test_utils.html#inmemoryconsumer.subscribe',
+                                                                                               'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer': ( 'test_utils.html#inmemoryproducer',
+                                                                                     'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer.__init__': ( 'test_utils.html#inmemoryproducer.__init__',
+                                                                                              'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer._produce': ( 'test_utils.html#inmemoryproducer._produce',
+                                                                                              'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer.create_batch': ( 'test_utils.html#inmemoryproducer.create_batch',
+                                                                                                  'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer.flush': ( 'test_utils.html#inmemoryproducer.flush',
+                                                                                           'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer.partitions_for': ( 'test_utils.html#inmemoryproducer.partitions_for',
+                                                                                                    'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer.send': ( 'test_utils.html#inmemoryproducer.send',
+                                                                                          'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer.send_and_wait': ( 'test_utils.html#inmemoryproducer.send_and_wait',
+                                                                                                   'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer.send_batch': ( 'test_utils.html#inmemoryproducer.send_batch',
+                                                                                                'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer.start': ( 'test_utils.html#inmemoryproducer.start',
+                                                                                           'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.InMemoryProducer.stop': ( 'test_utils.html#inmemoryproducer.stop',
+                                                                                          'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing._InMemoryBatch': ( 'test_utils.html#_inmemorybatch',
+                                                                                   'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing._InMemoryBatch.__init__': ( 'test_utils.html#_inmemorybatch.__init__',
+                                                                                            'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing._InMemoryBatch.append': ( 'test_utils.html#_inmemorybatch.append',
+                                                                                          'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing._InMemoryBatch.record_count': ( 'test_utils.html#_inmemorybatch.record_count',
+                                                                                                'fast_kafka_api/testing.py'),
+                                        'fast_kafka_api.testing.change_dir': ('test_utils.html#change_dir', 'fast_kafka_api/testing.py'),
                                         'fast_kafka_api.testing.create_and_fill_testing_topic': ( 'test_utils.html#create_and_fill_testing_topic',
                                                                                                   'fast_kafka_api/testing.py'),
                                         'fast_kafka_api.testing.create_missing_topics': ( 'test_utils.html#create_missing_topics',
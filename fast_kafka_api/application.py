@@ -5,16 +5,19 @@ __all__ = ['logger', 'FastKafkaAPI', 'produce_decorator', 'filter_using_signatur
 
 # %% ../nbs/000_FastKafkaAPI.ipynb 1
 import asyncio
+import dataclasses
 import functools
 import json
+import math
 import tempfile
+import threading
 import time
 from asyncio import iscoroutinefunction  # do not use the version from inspect
-from contextlib import asynccontextmanager, contextmanager
+from contextlib import asynccontextmanager, contextmanager, nullcontext, suppress
 from copy import deepcopy
 from datetime import datetime, timedelta
 from enum import Enum
-from inspect import signature
+from inspect import isasyncgenfunction, signature
 from os import environ
 from pathlib import Path
 from typing import *
@@ -26,12 +29,14 @@ import confluent_kafka
 import httpx
 import yaml
 from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+from aiokafka.partitioner import DefaultPartitioner
+from aiokafka.structs import ConsumerRecord
 from confluent_kafka import KafkaError, Message, Producer
 from confluent_kafka.admin import AdminClient, NewTopic
 from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, PlainTextResponse, RedirectResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
 from fastcore.foundation import patch
@@ -49,7 +54,25 @@ from fast_kafka_api._components.aiokafka_consumer_loop import (
     aiokafka_consumer_loop,
     sanitize_kafka_config,
 )
-from ._components.aiokafka_producer_manager import AIOKafkaProducerManager
+from fast_kafka_api._components.event_loop import (
+    get_event_loop_name,
+    get_event_loop_policy,
+    set_thread_pool_size,
+)
+from ._components.tracing import Tracer
+from fast_kafka_api._components.metrics import (
+    ConsumerMetrics,
+    MetricsRegistry,
+    ProducerMetrics,
+)
+
+from fast_kafka_api._components.aiokafka_producer_manager import (
+    AIOKafkaProducerManager,
+    DeliveryTracker,
+    send_batches,
+)
+from ._components.events import EventMetadata, KafkaEvent
+from ._components.retries import RetryPolicy, get_failure_headers
 from fast_kafka_api._components.asyncapi import (
     ConsumeCallable,
     ContactInfo,
@@ -58,9 +81,11 @@ from fast_kafka_api._components.asyncapi import (
     KafkaMessage,
     KafkaServiceInfo,
     ProduceCallable,
+    _get_msg_cls_for_producer,
     export_async_spec,
 )
 from ._components.logger import get_logger, supress_timestamps
+from ._components.serialization import Serializer, get_serializer
 
 # %% ../nbs/000_FastKafkaAPI.ipynb 2
 logger = get_logger(__name__)
@@ -189,6 +214,19 @@ class FastKafkaAPI:
         contact: Optional[Dict[str, str]] = None,
         kafka_brokers: Optional[Dict[str, Any]] = None,
         root_path: Optional[Union[Path, str]] = None,
+        deserializer: Union[str, Callable[[bytes], Any]] = "json",
+        serializer: Union[str, Serializer] = "json",
+        producer_pool_size: Optional[int] = None,
+        share_consumers: bool = False,
+        dead_letter_topic: Optional[str] = None,
+        shutdown_timeout_ms: Optional[int] = None,
+        startup_concurrency: int = 10,
+        startup_timeout_ms: Optional[int] = None,
+        generate_docs_on_startup: bool = True,
+        metrics_route: Optional[str] = None,
+        tracer: Optional[Tracer] = None,
+        event_loop: str = "auto",
+        thread_pool_size: Optional[int] = None,
         **kwargs,
     ):
         """Combined REST and Kafka service
@@ -202,6 +240,38 @@ class FastKafkaAPI:
             contact: optional contact for the documentation. If None, the contact of passed fast_api_app will be used
             kafka_brokers: dictionary describing kafka brokers used for generating documentation
             root_path: path to where documentation will be created
+            deserializer: default deserializer for consumed messages, one of "json", "orjson", "msgspec",
+                "trusted" or "raw", or a function deserializing a single raw message value. It can be overridden
+                for each topic by passing **deserializer** to `consumes`.
+            serializer: default serializer for produced messages, one of "json", "orjson" or "msgspec", or a function
+                serializing a single message into bytes. It can be overridden for each topic by passing **serializer** to `produces`.
+            producer_pool_size: maximum number of producers shared by topics with the same producer config. If None,
+                each topic not given an explicit producer gets its own producer.
+            share_consumers: if True, topics with the same consumer config are consumed by a single consumer
+                and poll loop, otherwise each topic gets its own consumer.
+            dead_letter_topic: topic messages which could not be processed are sent to, unless overridden by the
+                **retry_policy** passed to `consumes`. If None, such messages are only logged.
+            shutdown_timeout_ms: maximum time in milliseconds for flushing all producers on shutdown, messages
+                not sent by then are dropped and their number is logged. If None, the shutdown waits for all of them.
+                Producers are always stopped completely afterwards, waiting until messages they already sent are
+                either acknowledged or expire.
+            startup_concurrency: maximum number of producers and, separately, consumers connecting to brokers at the same time on startup
+            startup_timeout_ms: maximum time in milliseconds for each producer and consumer to connect on startup.
+                If None, it is not limited.
+            generate_docs_on_startup: if True, outdated AsyncAPI documentation is generated in the background after
+                the startup, otherwise it is generated only by the `fast-kafka-api generate-docs` command.
+                The specification itself is always generated on startup.
+            metrics_route: the route serving metrics of consumers and producers in the Prometheus text format,
+                e.g. "/metrics". It must not be a route of **fast_api_app** already. If **None**, metrics are neither
+                collected nor served.
+            tracer: tracer recording stages of consumed messages and passing the context of traces to produced messages
+                in their headers, e.g. `OpenTelemetryTracer`. If None, messages are not traced.
+            event_loop: event loop implementation used by `fast-kafka-api run`, one of "auto", "asyncio" or "uvloop".
+                "auto" uses uvloop if it is installed. Servers started otherwise should install it using `install_event_loop`.
+            thread_pool_size: maximum number of threads of the default anyio thread limiter, used by functions
+                passed to `asyncer.asyncify` or `anyio.to_thread.run_sync`, set on startup. If None, the default of anyio
+                is used. It does not size the threads calling regular functions decorated with `consumes`, which are
+                set by their **workers** parameter.
         """
         self._fast_api_app = fast_api_app
 
@@ -232,6 +302,45 @@ class FastKafkaAPI:
         # this is used as default parameters for creating AIOProducer and AIOConsumer objects
         self._kafka_config = _get_kafka_config(**kwargs)
 
+        # this is used as default deserializer for all consumers
+        self._deserializer = deserializer
+        # this is used as default serializer for all producers
+        self._serializer = serializer
+        # this is used to share producers between topics with the same config
+        self._producer_pool_size = producer_pool_size
+        # this is used to consume topics with the same config using one consumer
+        self._share_consumers = share_consumers
+        # this is used to limit the time spent flushing producers on shutdown
+        self._shutdown_timeout_ms = shutdown_timeout_ms
+        # this is used to start producers and consumers concurrently
+        self._startup_concurrency = startup_concurrency
+        self._startup_timeout_ms = startup_timeout_ms
+        # this is used to keep Node.js tooling off the startup
+        self._generate_docs_on_startup = generate_docs_on_startup
+        self._docs_task: Optional[asyncio.Task[None]] = None
+        # this is used to terminate Node.js tooling still generating the documentation on shutdown
+        self._docs_stop_event = threading.Event()
+        # workers started by `fast-kafka-api run` leave the specification and documentation to the parent process
+        self._generate_spec_on_startup = True
+        # metrics are aggregated in place and rendered only when the route is requested
+        self._metrics: Optional[MetricsRegistry] = None
+        self._consumer_metrics: Optional[ConsumerMetrics] = None
+        self._producer_metrics: Optional[ProducerMetrics] = None
+        if metrics_route is not None:
+            if metrics_route in [getattr(r, "path", None) for r in fast_api_app.routes]:
+                raise ValueError(
+                    f"metrics_route must not be a route of the FastAPI app already, but it is '{metrics_route}'."
+                )
+            self._metrics = MetricsRegistry()
+            self._consumer_metrics = ConsumerMetrics(self._metrics)
+            self._producer_metrics = ProducerMetrics(self._metrics)
+        # this is used for tracing consumers and producers
+        self._tracer = tracer
+        # this is used for choosing and tuning the event loop, validated here to fail early
+        get_event_loop_policy(event_loop)
+        self._event_loop = event_loop
+        self._thread_pool_size = thread_pool_size
+
         #
         self._consumers_store: Dict[str, Tuple[ConsumeCallable, Dict[str, Any]]] = {}
 
@@ -241,14 +350,19 @@ class FastKafkaAPI:
         self._producers_store: Dict[  # type: ignore
             str, Tuple[ProduceCallable, AIOKafkaProducer, Dict[str, Any]]
         ] = {}
+        # delivery trackers of producers not awaiting acknowledgments
+        self._delivery_trackers: Dict[str, DeliveryTracker] = {}
 
         # background tasks
         self._scheduled_bg_tasks: List[Callable[..., Coroutine[Any, Any, Any]]] = []
         self._bg_task_group_generator: Optional[anyio.abc.TaskGroup] = None
         self._bg_tasks_group: Optional[anyio.abc.TaskGroup]
 
-        # todo: use this for errrors
-        self._on_error_topic: Optional[str] = None
+        # dead-letter topic for consumers without one set in their retry policy
+        self._on_error_topic: Optional[str] = dead_letter_topic
+        # topics failed records are sent to, as (retry topic, dead-letter topic) pairs keyed by the consumed topic
+        self._failure_routes: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._error_producer: Optional[AIOKafkaProducerManager] = None
 
         self._asyncapi_path = self._root_path / "asyncapi"
         (self._asyncapi_path / "docs").mkdir(exist_ok=True, parents=True)
@@ -260,6 +374,12 @@ class FastKafkaAPI:
         )
 
         self._is_shutting_down: bool = False
+        # set on shutdown to interrupt pending polls of consumers, created on startup
+        self._shutdown_event: Optional[anyio.Event] = None
+        # used for readiness, see `is_ready`
+        self._producers_started: Optional[anyio.Event] = None
+        self._consumers_started: List[anyio.Event] = []
+        self._startup_exception: Optional[BaseException] = None
         self._kafka_consumer_tasks: List[asyncio.Task[Any]] = []
         self._kafka_producer_tasks: List[asyncio.Task[Any]] = []
 
@@ -275,6 +395,15 @@ class FastKafkaAPI:
         async def download_asyncapi_yml():
             return FileResponse(self._asyncapi_path / "spec" / "asyncapi.yml")
 
+        if metrics_route is not None:
+
+            @self._fast_api_app.get(metrics_route, include_in_schema=False)
+            async def get_metrics():
+                return PlainTextResponse(
+                    self._metrics.render(),  # type: ignore
+                    media_type="text/plain; version=0.0.4",
+                )
+
         @self._fast_api_app.on_event("startup")
         async def on_startup(app=self):
             await app._on_startup()
@@ -283,6 +412,34 @@ class FastKafkaAPI:
         async def on_shutdown(app=self):
             await app._on_shutdown()
 
+    @property
+    def is_ready(self) -> bool:
+        """True once all producers are started and all consumers are started and subscribed to their topics"""
+        return (
+            self._startup_exception is None
+            and self._producers_started is not None
+            and self._producers_started.is_set()
+            and all(started.is_set() for started in self._consumers_started)
+        )
+
+    async def wait_until_ready(self) -> None:
+        """Waits until `is_ready` is True
+
+        Raises:
+            RuntimeError: if the startup of the app did not begin yet, or if a producer or a consumer failed to start
+        """
+        if self._producers_started is None:
+            raise RuntimeError(
+                "wait_until_ready() must be called after the startup of the app began"
+            )
+        await self._producers_started.wait()
+        for started in self._consumers_started:
+            await started.wait()
+        if self._startup_exception is not None:
+            raise RuntimeError(
+                "the startup of the app failed"
+            ) from self._startup_exception
+
     async def _on_startup(self) -> None:
         raise NotImplementedError
 
@@ -304,6 +461,11 @@ class FastKafkaAPI:
         *,
         prefix: str = "to_",
         producer: Optional[AIOKafkaProducer] = None,
+        serializer: Optional[Union[str, Serializer]] = None,
+        ack: str = "sync",
+        max_in_flight: int = 1_000,
+        on_delivery_error: Optional[Callable[[str, BaseException], None]] = None,
+        key_f: Optional[Callable[[Any], Optional[bytes]]] = None,
         **kwargs: Dict[str, Any],
     ) -> ProduceCallable:
         raise NotImplementedError
@@ -322,13 +484,21 @@ class FastKafkaAPI:
     async def _populate_producers(self) -> None:
         raise NotImplementedError
 
-    def generate_async_spec(self) -> None:
+    def _send_failed_records(  # type: ignore
+        self, records: List[ConsumerRecord], e: BaseException, retriable: bool
+    ) -> None:
+        raise NotImplementedError
+
+    def generate_async_spec(self, generate_docs: bool = True) -> None:
+        raise NotImplementedError
+
+    async def _generate_async_docs_in_background(self) -> None:
         raise NotImplementedError
 
     async def _shutdown_consumers(self) -> None:
         raise NotImplementedError
 
-    async def _shutdown_producers(self) -> None:
+    async def _shutdown_producers(self) -> int:
         raise NotImplementedError
 
     async def _populate_bg_tasks(self) -> None:
@@ -348,6 +518,12 @@ def consumes(
 ) -> Callable[[ConsumeCallable], ConsumeCallable]:
     """Decorator registering the callback called when a message is received in a topic.
 
+    The decorated function is called either with a single message passed as **msg** argument, or with
+    a batch of messages from a topic partition passed as **msgs** argument annotated with `List[T]`.
+    If the decorated function has a parameter named **meta**, `EventMetadata` of the message (or a list of them
+    for batches) containing its key, headers, partition, offset and timestamp is passed to it as well.
+
+
     This function decorator is also responsible for registering topics for AsyncAPI specificiation and documentation.
 
     Params:
@@ -355,7 +531,38 @@ def consumes(
             If the topic is not specified, topic name will be inferred from the decorated function name by stripping the defined prefix
         prefix: Prefix stripped from the decorated function to define a topic name if the topic argument is not passed, default: "on_"
             If the decorated function name is not prefixed with the defined prefix and topic argument is not passed, then this method will throw ValueError
-        **kwargs: Keyword arguments that will be passed to AIOKafkaConsumer, used to configure the consumer
+        **kwargs: Keyword arguments that will be passed to AIOKafkaConsumer, used to configure the consumer.
+            The following keyword arguments are used to configure the consumer loop instead:
+                concurrency: number of workers awaiting the decorated function concurrently, default: 1
+                ordering: if "partition", messages from the same partition are processed in order while different
+                    partitions are processed in parallel. If "none", messages are processed by the first available worker, default: "partition"
+                max_batch_size: maximum number of messages in a batch passed to the decorated function, default: None
+                max_batch_wait_ms: maximum time in milliseconds to wait for max_batch_size messages to be polled, default: None
+                deserializer: deserializer for messages in the topic, overrides the default deserializer passed to `FastKafkaAPI`
+                filter_f: function called with `EventMetadata` of each message before it is deserialized, messages
+                    for which it returns False are skipped, default: None
+                commit: offset commit strategy, strategies other than "auto" require group_id, default: "auto"
+                    "auto": offsets are committed periodically by the consumer, regardless of whether the decorated function completed
+                    "at_most_once": offsets are committed as soon as messages are polled
+                    "at_least_once": offsets are committed after the decorated function completed for all previous messages
+                        in the partition, requires ordering "partition" if concurrency is larger than 1
+                commit_every: if commit is "at_least_once", offsets are committed after this many messages are processed, default: None
+                commit_interval_ms: if commit is "at_least_once", offsets are committed at least every this many milliseconds, default: 1000
+                executor: where the decorated function is called if it is a regular function, default: "thread"
+                    "thread": in a dedicated pool of worker threads
+                    "process": messages are deserialized and passed to the decorated function in a pool of worker
+                        processes. The decorated function must be defined at the module level, so it can be pickled
+                workers: number of worker threads or processes, default: the default size of `ThreadPoolExecutor`
+                    for threads and the number of CPUs for processes. Each consumer has its own pool, which is not
+                    limited by **thread_pool_size** of the app
+                max_buffered_bytes: if set, fetching is paused while keys and values of polled messages not processed yet
+                    take at least this many bytes, default: None
+                resume_buffered_bytes: fetching is resumed when keys and values of polled messages not processed yet
+                    take at most this many bytes, default: half of max_buffered_bytes
+                drain_timeout_ms: on shutdown, maximum time in milliseconds to wait for the decorated function to process
+                    already polled messages and for the final commit of offsets, default: None
+                retry_policy: `RetryPolicy` for messages the decorated function raised an exception for. Messages are retried
+                    in-process, then consumed again from retry topics and finally sent to the dead-letter topic, default: None
 
     Returns:
         A function returning the same function
@@ -378,42 +585,151 @@ def consumes(
 
         self._consumers_store[topic_resolved] = (on_topic, kwargs)
 
+        retry_policy: Optional[RetryPolicy] = kwargs.get("retry_policy")  # type: ignore
+        dead_letter_topic = self._on_error_topic
+        retry_topics: List[str] = []
+        if retry_policy is not None:
+            if retry_policy.dead_letter_topic is not None:
+                dead_letter_topic = retry_policy.dead_letter_topic
+            retry_topics = retry_policy.get_retry_topics(topic_resolved)
+            # retry topics are consumed by the same function after a delay
+            for retry_topic, delay_ms in zip(
+                retry_topics, retry_policy.retry_delays_ms
+            ):
+                self._consumers_store[retry_topic] = (
+                    on_topic,
+                    {**kwargs, "delay_ms": delay_ms},
+                )
+        # messages failing in a topic are sent to the next retry topic or to the dead-letter topic
+        for source_topic, next_topic in zip(
+            [topic_resolved] + retry_topics, retry_topics + [dead_letter_topic]
+        ):
+            if next_topic is not None:
+                self._failure_routes[source_topic] = (next_topic, dead_letter_topic)
+
         return on_topic
 
     return _decorator
 
 # %% ../nbs/000_FastKafkaAPI.ipynb 30
-def _to_json_utf8(o: Any) -> bytes:
-    """Converts to JSON and then encodes with UTF-8"""
-    if hasattr(o, "json"):
-        return o.json().encode("utf-8")  # type: ignore
-    else:
-        return json.dumps(o).encode("utf-8")
-
-# %% ../nbs/000_FastKafkaAPI.ipynb 32
 def produce_decorator(
-    self: FastKafkaAPI, func: ProduceCallable, topic: str
+    self: FastKafkaAPI,
+    func: ProduceCallable,
+    topic: str,
+    *,
+    serializer: Optional[Serializer] = None,
+    delivery_tracker: Optional[DeliveryTracker] = None,
+    key_f: Optional[Callable[[Any], Optional[bytes]]] = None,
+    tracer: Optional[Tracer] = None,
+    partitioner: Optional[Callable[..., int]] = None,
 ) -> ProduceCallable:
+    serialize = serializer if serializer is not None else get_serializer("json")
+    # messages are sent in a span carried by their headers only if a tracer is set
+    produce_span: Callable[[], ContextManager[Any]] = (
+        functools.partial(
+            tracer.start_span,
+            "produce",
+            kind="producer",
+            attributes={"messaging.system": "kafka", "messaging.destination": topic},
+        )
+        if tracer is not None
+        else nullcontext
+    )
+    produced = (
+        self._producer_metrics.produced.labels(topic)
+        if self._producer_metrics is not None
+        else None
+    )
+
+    def _to_events(msgs: List[Any]) -> List[KafkaEvent[bytes]]:
+        events = [
+            msg if isinstance(msg, KafkaEvent) else KafkaEvent(msg) for msg in msgs
+        ]
+        return [
+            dataclasses.replace(
+                event,
+                message=serialize(event.message),
+                key=key_f(event.message)
+                if event.key is None and key_f is not None
+                else event.key,
+                headers=tracer.inject(event.headers)  # type: ignore
+                if tracer is not None
+                else event.headers,
+            )
+            for event in events
+        ]
+
+    async def _send_async(return_val: Any) -> None:
+        _, producer, _ = self._producers_store[topic]
+        num_events = len(return_val) if isinstance(return_val, list) else 1
+        with produce_span():
+            if isinstance(return_val, list):
+                futs = await send_batches(
+                    producer, topic, _to_events(return_val), partitioner=partitioner
+                )
+            else:
+                [event] = _to_events([return_val])
+                fut = await producer.send(
+                    topic,
+                    event.message,
+                    key=event.key,
+                    partition=event.partition,
+                    timestamp_ms=event.timestamp_ms,
+                    headers=event.headers,
+                )
+                futs = [fut]
+        if produced is not None:
+            produced.inc(num_events)
+        if delivery_tracker is None:
+            await asyncio.gather(*futs)
+        else:
+            for fut in futs:
+                await delivery_tracker.add(topic, fut)
+
     @functools.wraps(func)
     async def _produce_async(*args: List[Any], **kwargs: Dict[str, Any]) -> BaseModel:
         f: Callable[..., Awaitable[BaseModel]] = func  # type: ignore
         return_val = await f(*args, **kwargs)
-        _, producer, _ = self._producers_store[topic]
-        fut = await producer.send(topic, _to_json_utf8(return_val))
-        msg = await fut
+        await _send_async(return_val)
         return return_val
 
+    @functools.wraps(func)
+    async def _produce_async_gen(
+        *args: List[Any], **kwargs: Dict[str, Any]
+    ) -> AsyncIterator[BaseModel]:
+        f: Callable[..., AsyncIterator[BaseModel]] = func  # type: ignore
+        msgs = []
+        async for msg in f(*args, **kwargs):
+            msgs.append(msg)
+            yield msg
+        # messages are sent in batches once the generator is exhausted
+        await _send_async(msgs)
+
     @functools.wraps(func)
     def _produce_sync(*args: List[Any], **kwargs: Dict[str, Any]) -> BaseModel:
         f: Callable[..., BaseModel] = func  # type: ignore
         return_val = f(*args, **kwargs)
         _, producer, _ = self._producers_store[topic]
-        producer.send(topic, _to_json_utf8(return_val))
+        msgs = return_val if isinstance(return_val, list) else [return_val]
+        with produce_span():
+            for event in _to_events(msgs):
+                producer.send(
+                    topic,
+                    event.message,
+                    event.key,
+                    headers=event.headers,
+                    partition=event.partition,
+                    timestamp_ms=event.timestamp_ms,
+                )
+        if produced is not None:
+            produced.inc(len(msgs))
         return return_val
 
+    if isasyncgenfunction(func):
+        return _produce_async_gen  # type: ignore
     return _produce_async if iscoroutinefunction(func) else _produce_sync  # type: ignore
 
-# %% ../nbs/000_FastKafkaAPI.ipynb 34
+# %% ../nbs/000_FastKafkaAPI.ipynb 37
 @patch  # type: ignore
 def produces(
     self: FastKafkaAPI,
@@ -421,18 +737,42 @@ def produces(
     *,
     prefix: str = "to_",
     producer: AIOKafkaProducer = None,
+    serializer: Optional[Union[str, Serializer]] = None,
+    ack: str = "sync",
+    max_in_flight: int = 1_000,
+    on_delivery_error: Optional[Callable[[str, BaseException], None]] = None,
+    key_f: Optional[Callable[[Any], Optional[bytes]]] = None,
     **kwargs: Dict[str, Any],
 ) -> Callable[[ProduceCallable], ProduceCallable]:
     """Decorator registering the callback called when delivery report for a produced message is received
 
     This function decorator is also responsible for registering topics for AsyncAPI specificiation and documentation.
 
+    The decorated function can return a single message, a list of messages or be an async generator of messages.
+    Lists returned by coroutines and messages yielded by async generators are sent in batches grouped by partition,
+    messages yielded by async generators are sent once the generator is exhausted.
+    Each message can be wrapped in `KafkaEvent` to send it with a key, headers, partition or timestamp.
+
     Params:
         topic: Kafka topic that the producer will send returned values from the decorated function to, default: None
             If the topic is not specified, topic name will be inferred from the decorated function name by stripping the defined prefix
         prefix: Prefix stripped from the decorated function to define a topic name if the topic argument is not passed, default: "to_"
             If the decorated function name is not prefixed with the defined prefix and topic argument is not passed, then this method will throw ValueError
         producer:
+        serializer: serializer for messages sent to the topic, one of "json", "orjson" or "msgspec", or a function serializing
+            a single message into bytes. If None, the default serializer passed to `FastKafkaAPI` is used, default: None
+        ack: delivery mode of messages returned by coroutines, default: "sync"
+            "sync": the decorated function returns after the message is acknowledged by the broker
+            "async": the decorated function returns as soon as the message is added to the producer's batch,
+                while at most **max_in_flight** messages can wait for acknowledgment
+            "fire_and_forget": the decorated function returns as soon as the message is added to the producer's batch
+            Messages returned by regular functions are always sent in the background, so **ack** must be "sync" for them.
+        max_in_flight: maximum number of unacknowledged messages if **ack** is "async", default: 1000
+        on_delivery_error: function called with the topic and the exception if a message sent with **ack** set
+            to "async" or "fire_and_forget" fails to be delivered, default: None
+        key_f: function returning the key of a message as bytes, used to assign messages to partitions.
+            It is not called for messages wrapped in `KafkaEvent` with an explicit key.
+            If None, messages are sent without a key, default: None
         **kwargs: Keyword arguments that will be passed to AIOKafkaProducer, used to configure the producer
 
     Returns:
@@ -443,6 +783,11 @@ def produces(
 
     """
 
+    if ack not in ["sync", "async", "fire_and_forget"]:
+        raise ValueError(
+            f"ack must be one of ['sync', 'async', 'fire_and_forget'], but it is '{ack}'."
+        )
+
     def _decorator(
         on_topic: ProduceCallable,
         topic: Optional[str] = topic,
@@ -453,14 +798,53 @@ def produces(
             if topic is None
             else topic
         )
+        if ack != "sync" and not (
+            iscoroutinefunction(on_topic) or isasyncgenfunction(on_topic)
+        ):
+            raise ValueError(
+                f"ack must be 'sync' for regular functions, which always send messages in the background, but it is '{ack}'."
+            )
 
         self._producers_store[topic_resolved] = (on_topic, producer, kwargs)
 
-        return produce_decorator(self, on_topic, topic_resolved)
+        serialize = get_serializer(
+            serializer if serializer is not None else self._serializer,
+            _get_msg_cls_for_producer(on_topic)
+            if "return" in on_topic.__annotations__
+            else None,
+        )
+
+        if ack == "sync":
+            delivery_tracker = None
+        else:
+            delivery_tracker = DeliveryTracker(
+                max_in_flight=max_in_flight if ack == "async" else None,
+                on_error=on_delivery_error,
+            )
+            self._delivery_trackers[topic_resolved] = delivery_tracker
+
+        # batches are grouped by the partitioner from the config of the created producer,
+        # the partitioner of a passed producer is left to the producer itself
+        partitioner = (
+            {**self._kafka_config, **kwargs}.get("partitioner", DefaultPartitioner())
+            if producer is None
+            else None
+        )
+
+        return produce_decorator(
+            self,
+            on_topic,
+            topic_resolved,
+            serializer=serialize,
+            delivery_tracker=delivery_tracker,
+            key_f=key_f,
+            tracer=self._tracer,
+            partitioner=partitioner,
+        )
 
     return _decorator
 
-# %% ../nbs/000_FastKafkaAPI.ipynb 36
+# %% ../nbs/000_FastKafkaAPI.ipynb 41
 @patch  # type: ignore
 def run_in_background(
     self: FastKafkaAPI,
@@ -494,12 +878,29 @@ def run_in_background(
 
     return _decorator
 
-# %% ../nbs/000_FastKafkaAPI.ipynb 40
+# %% ../nbs/000_FastKafkaAPI.ipynb 45
 def filter_using_signature(f: Callable, **kwargs: Dict[str, Any]) -> Dict[str, Any]:
     param_names = list(signature(f).parameters.keys())
     return {k: v for k, v in kwargs.items() if k in param_names}
 
-# %% ../nbs/000_FastKafkaAPI.ipynb 42
+# %% ../nbs/000_FastKafkaAPI.ipynb 47
+def _get_consumer_msg_type(consumer: ConsumeCallable) -> Type[Any]:
+    """Returns the type of the message the consumer is called with
+
+    Consumers are called either with a single message passed as **msg** argument or
+    with a batch of messages passed as **msgs** argument annotated with `List[T]`.
+    """
+    params = signature(consumer).parameters
+    if "msgs" in params:
+        return params["msgs"].annotation  # type: ignore
+    return params["msg"].annotation  # type: ignore
+
+# %% ../nbs/000_FastKafkaAPI.ipynb 49
+def _get_config_key(config: Dict[str, Any]) -> str:
+    """Returns a string identifying the config, equal for equal configs regardless of the order of keys"""
+    return json.dumps(config, sort_keys=True, default=repr)
+
+# %% ../nbs/000_FastKafkaAPI.ipynb 51
 @patch  # type: ignore
 def _populate_consumers(
     self: FastKafkaAPI,
@@ -508,18 +909,58 @@ def _populate_consumers(
     default_config: Dict[str, Any] = filter_using_signature(
         AIOKafkaConsumer, **self._kafka_config
     )
+
+    # topics consumed by the same consumer, grouped by their config
+    consumer_groups: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+    for topic, (consumer, override_config) in self._consumers_store.items():
+        config = {
+            "deserializer": self._deserializer,
+            **default_config,
+            **override_config,
+        }
+        if topic in self._failure_routes:
+            config["on_failure_f"] = self._send_failed_records
+        key = _get_config_key(config) if self._share_consumers else topic
+        consumer_groups.setdefault(key, (config, []))[1].append(topic)
+
+    self._consumers_started = [anyio.Event() for _ in consumer_groups]
+
+    def on_consumer_done(task: "asyncio.Task[None]", started: anyio.Event) -> None:
+        # a consumer which failed before it was started fails the startup of the app, see `wait_until_ready`
+        if started.is_set() or task.cancelled() or task.exception() is None:
+            return
+        logger.error(
+            f"_populate_consumers(): consumer failed to start: {task.exception().__repr__()}"
+        )
+        self._startup_exception = task.exception()
+        started.set()
+
+    start_semaphore = asyncio.Semaphore(self._startup_concurrency)
     self._kafka_consumer_tasks = [
         asyncio.create_task(
             aiokafka_consumer_loop(
-                topics=[topic],
-                callbacks={topic: consumer},
-                msg_types={topic: signature(consumer).parameters["msg"].annotation},
+                topics=topics,
+                callbacks={topic: self._consumers_store[topic][0] for topic in topics},
+                msg_types={
+                    topic: _get_consumer_msg_type(self._consumers_store[topic][0])
+                    for topic in topics
+                },
+                shutdown_event=self._shutdown_event,
                 is_shutting_down_f=is_shutting_down_f,
-                **{**default_config, **override_config},
+                start_timeout_ms=self._startup_timeout_ms,
+                start_semaphore=start_semaphore,
+                started_event=started,
+                metrics=self._consumer_metrics,
+                tracer=self._tracer,
+                **config,
             )
         )
-        for topic, (consumer, override_config) in self._consumers_store.items()
+        for (config, topics), started in zip(
+            consumer_groups.values(), self._consumers_started
+        )
     ]
+    for task, started in zip(self._kafka_consumer_tasks, self._consumers_started):
+        task.add_done_callback(functools.partial(on_consumer_done, started=started))
 
 
 @patch  # type: ignore
@@ -529,20 +970,20 @@ async def _shutdown_consumers(
     if self._kafka_consumer_tasks:
         await asyncio.wait(self._kafka_consumer_tasks)
 
-# %% ../nbs/000_FastKafkaAPI.ipynb 44
+# %% ../nbs/000_FastKafkaAPI.ipynb 54
 # TODO: Add passing of vars
-async def _create_producer(  # type: ignore
+def _create_producer(  # type: ignore
     *,
-    callback: ProduceCallable,
+    use_manager: bool,
     producer: Optional[AIOKafkaProducer],
     default_config: Dict[str, Any],
     override_config: Dict[str, Any],
     producers_list: List[Union[AIOKafkaProducer, AIOKafkaProducerManager]],
 ) -> Union[AIOKafkaProducer, AIOKafkaProducerManager]:
-    """Creates a producer
+    """Creates a producer, which is started later by `_start_producers`
 
     Args:
-        callback: A callback function that is called when the producer is ready.
+        use_manager: If True, the producer is wrapped in a producer manager sending messages in the background.
         producer: An existing producer to use.
         default_config: A dictionary of default configuration values.
         override_config: A dictionary of configuration values to override.
@@ -562,20 +1003,158 @@ async def _create_producer(  # type: ignore
             f"_create_producer() : created producer using the config: '{sanitize_kafka_config(**config)}'"
         )
 
-    if not iscoroutinefunction(callback):
+    if use_manager:
         producer = AIOKafkaProducerManager(producer)
 
-    await producer.start()
-
     producers_list.append(producer)
 
     return producer
 
 
+def _get_pooled_producer(  # type: ignore
+    *,
+    use_manager: bool,
+    default_config: Dict[str, Any],
+    override_config: Dict[str, Any],
+    pool_size: int,
+    producer_pools: Dict[str, List[AIOKafkaProducerManager]],
+    producers_list: List[Union[AIOKafkaProducer, AIOKafkaProducerManager]],
+) -> Union[AIOKafkaProducer, AIOKafkaProducerManager]:
+    """Returns a producer shared by all topics with the same config
+
+    Topics with the same config are assigned to at most **pool_size** producers in a round-robin fashion.
+
+    Args:
+        use_manager: If True, the producer manager is returned instead of its producer.
+        default_config: A dictionary of default configuration values.
+        override_config: A dictionary of configuration values to override.
+        pool_size: The maximum number of producers sharing the same config.
+        producer_pools: A dictionary of already created producers, keyed by their config.
+        producers_list: A list of producers to add the new producer to.
+
+    Returns:
+        A producer manager if **use_manager** is True, otherwise its producer.
+    """
+    config = {
+        **filter_using_signature(AIOKafkaProducer, **default_config),
+        **override_config,
+    }
+    key = _get_config_key(config)
+    pool = producer_pools.setdefault(key, [])
+    if len(pool) < pool_size:
+        manager = AIOKafkaProducerManager(AIOKafkaProducer(**config))
+        logger.info(
+            f"_get_pooled_producer() : created producer using the config: '{sanitize_kafka_config(**config)}'"
+        )
+        pool.append(manager)
+        producers_list.append(manager)
+    # rotate the pool so that the next topic gets the producer used least recently
+    manager = pool.pop(0)
+    pool.append(manager)
+
+    return manager if use_manager else manager.producer
+
+
+async def _start_producers(
+    producers: List[Union[AIOKafkaProducer, AIOKafkaProducerManager]],
+    *,
+    max_concurrency: int,
+    timeout_ms: Optional[int],
+) -> None:
+    """Starts producers concurrently
+
+    Producers connect to brokers concurrently, at most **max_concurrency** of them at a time. Producer managers
+    start sending messages afterwards, one after another, because they must be stopped by the task starting them.
+
+    Args:
+        producers: Producers and producer managers to start.
+        max_concurrency: The maximum number of producers connecting at the same time.
+        timeout_ms: The maximum time in milliseconds for each producer to connect, if None it is not limited.
+
+    Raises:
+        asyncio.TimeoutError: If a producer does not connect in time. Producers which connected are stopped
+            before the first exception raised by any of the producers is reraised.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def start(producer: AIOKafkaProducer) -> None:
+        async with semaphore:
+            await asyncio.wait_for(
+                producer.start(), timeout_ms / 1000 if timeout_ms is not None else None
+            )
+
+    aiokafka_producers = [
+        p.producer if isinstance(p, AIOKafkaProducerManager) else p for p in producers
+    ]
+    results = await asyncio.gather(
+        *[start(p) for p in aiokafka_producers], return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        # producers which connected would otherwise keep their connections and background tasks
+        for producer, result in zip(aiokafka_producers, results):
+            if not isinstance(result, BaseException):
+                try:
+                    await producer.stop()
+                except Exception as e:
+                    logger.warning(
+                        f"_start_producers(): exception caught {e.__repr__()} while stopping a started producer"
+                    )
+        raise errors[0]
+    for p in producers:
+        if isinstance(p, AIOKafkaProducerManager):
+            await p.start(start_producer=False)
+
+
+def _register_producer_gauges(
+    metrics: ProducerMetrics,
+    *,
+    key: Any,
+    producers: List[Union[AIOKafkaProducer, AIOKafkaProducerManager]],
+    delivery_trackers: Dict[str, DeliveryTracker],
+) -> None:
+    """Registers functions reading queue depths and in-flight messages of producers when metrics are rendered
+
+    Args:
+        metrics: Metrics of producers.
+        key: The key functions are registered under, used for removing them.
+        producers: Started producers and producer managers.
+        delivery_trackers: Delivery trackers of producers not awaiting acknowledgments, keyed by their topics.
+
+    Returns:
+        None.
+    """
+    managers = [p for p in producers if isinstance(p, AIOKafkaProducerManager)]
+    metrics.queue_depth.set_function(
+        key,
+        lambda: {
+            (f"manager_{i}",): manager.send_stream.statistics().current_buffer_used
+            for i, manager in enumerate(managers)
+        },
+    )
+    metrics.in_flight.set_function(
+        key,
+        lambda: {
+            **{
+                (topic,): tracker.in_flight
+                for topic, tracker in delivery_trackers.items()
+            },
+            **{
+                (f"manager_{i}",): manager.in_flight
+                for i, manager in enumerate(managers)
+            },
+        },
+    )
+
+
 @patch  # type: ignore
 async def _populate_producers(self: FastKafkaAPI) -> None:
     """Populates the producers for the FastKafkaAPI instance.
 
+    Topics without an explicitly passed producer get their own producer, unless **producer_pool_size**
+    was passed to `FastKafkaAPI`, in which case topics with the same config share a pool of producers.
+    All producers are started concurrently once they are created.
+
     Args:
         self: The FastKafkaAPI instance.
 
@@ -583,35 +1162,181 @@ async def _populate_producers(self: FastKafkaAPI) -> None:
         None.
 
     Raises:
-        None.
+        asyncio.TimeoutError: If a producer does not connect within **startup_timeout_ms** passed to `FastKafkaAPI`.
     """
     default_config: Dict[str, Any] = self._kafka_config
     self._producers_list = []
-    self._producers_store = {
-        topic: (
-            callback,
-            await _create_producer(
-                callback=callback,
+    producer_pools: Dict[str, List[AIOKafkaProducerManager]] = {}
+    producers_store = {}
+    for topic, (
+        callback,
+        producer,
+        override_config,
+    ) in self._producers_store.items():
+        # messages returned by regular functions are sent in the background by a producer manager
+        use_manager = not (
+            iscoroutinefunction(callback) or isasyncgenfunction(callback)
+        )
+        if producer is None and self._producer_pool_size is not None:
+            producer = _get_pooled_producer(
+                use_manager=use_manager,
+                default_config=default_config,
+                override_config=override_config,
+                pool_size=self._producer_pool_size,
+                producer_pools=producer_pools,
+                producers_list=self._producers_list,
+            )
+        else:
+            producer = _create_producer(
+                use_manager=use_manager,
                 producer=producer,
                 default_config=default_config,
                 override_config=override_config,
                 producers_list=self._producers_list,
-            ),
-            override_config,
+            )
+        producers_store[topic] = (callback, producer, override_config)
+    self._producers_store = producers_store
+
+    # failed consumed messages are sent to retry and dead-letter topics using a producer manager
+    if self._failure_routes:
+        if self._producer_pool_size is not None:
+            error_producer = _get_pooled_producer(
+                use_manager=True,
+                default_config=default_config,
+                override_config={},
+                pool_size=self._producer_pool_size,
+                producer_pools=producer_pools,
+                producers_list=self._producers_list,
+            )
+        else:
+            error_producer = _create_producer(
+                use_manager=True,
+                producer=None,
+                default_config=default_config,
+                override_config={},
+                producers_list=self._producers_list,
+            )
+        self._error_producer = error_producer
+
+    await _start_producers(
+        self._producers_list,
+        max_concurrency=self._startup_concurrency,
+        timeout_ms=self._startup_timeout_ms,
+    )
+    if self._producer_metrics is not None:
+        _register_producer_gauges(
+            self._producer_metrics,
+            key=self,
+            producers=self._producers_list,
+            delivery_trackers=self._delivery_trackers,
         )
-        for topic, (
-            callback,
-            producer,
-            override_config,
-        ) in self._producers_store.items()
-    }
+    if self._producers_started is not None:
+        self._producers_started.set()
 
 
 @patch  # type: ignore
-async def _shutdown_producers(self: FastKafkaAPI) -> None:
-    [await producer.stop() for producer in self._producers_list[::-1]]
+def _send_failed_records(  # type: ignore
+    self: FastKafkaAPI,
+    records: List[ConsumerRecord],
+    e: BaseException,
+    retriable: bool,
+) -> None:
+    """Sends failed consumed records to the next retry topic or, if they are not retriable, to the dead-letter topic
+
+    Records are put into the buffer of the error producer manager and sent in the background without blocking consumers.
+
+    Args:
+        self: The FastKafkaAPI instance.
+        records: Records which failed to be processed.
+        e: The exception the records failed with.
+        retriable: False if the records could not be deserialized and retrying them is pointless.
+
+    Returns:
+        None.
+    """
+    for record in records:
+        retry_topic, dead_letter_topic = self._failure_routes.get(
+            record.topic, (None, None)
+        )
+        target_topic = retry_topic if retriable else dead_letter_topic
+        if target_topic is None or self._error_producer is None:
+            logger.warning(
+                f"_send_failed_records(): no topic to send the failed message from topic '{record.topic}' to, message dropped"
+            )
+            continue
+        try:
+            self._error_producer.send(
+                target_topic,
+                record.value,
+                record.key,
+                headers=get_failure_headers(record, e),
+            )
+        except anyio.WouldBlock as send_e:
+            logger.warning(
+                f"_send_failed_records(): exception caught {send_e.__repr__()} while sending the failed message from topic '{record.topic}' to '{target_topic}', message dropped"
+            )
+
+
+@patch  # type: ignore
+async def _shutdown_producers(self: FastKafkaAPI) -> int:
+    """Flushes and stops all producers concurrently, within **shutdown_timeout_ms** passed to `FastKafkaAPI`
+
+    Stopping of producers is not cancelled at the deadline, a producer whose stop was cancelled cannot
+    be stopped again and keeps its connections open.
+
+    Args:
+        self: The FastKafkaAPI instance.
+
+    Returns:
+        The number of dropped messages, which were neither delivered nor failed to be delivered.
+    """
+    self._producers_started = None
+    if self._producer_metrics is not None:
+        self._producer_metrics.queue_depth.remove_function(self)
+        self._producer_metrics.in_flight.remove_function(self)
+    deadline = (
+        anyio.current_time() + self._shutdown_timeout_ms / 1000
+        if self._shutdown_timeout_ms is not None
+        else math.inf
+    )
+
+    def remaining_ms() -> Optional[int]:
+        if deadline == math.inf:
+            return None
+        return max(int((deadline - anyio.current_time()) * 1000), 0)
+
+    managers = [
+        p for p in self._producers_list if isinstance(p, AIOKafkaProducerManager)
+    ]
+    producers = [
+        p for p in self._producers_list if not isinstance(p, AIOKafkaProducerManager)
+    ]
+
+    # managers start flushing their buffers in the background right away
+    for manager in managers:
+        manager.close()
+
+    async def stop(producer: AIOKafkaProducer) -> None:  # type: ignore
+        with anyio.CancelScope(shield=True):
+            await producer.stop()
+
+    with anyio.CancelScope(deadline=deadline):
+        async with anyio.create_task_group() as tg:
+            for tracker in self._delivery_trackers.values():
+                tg.start_soon(tracker.join)
+            for producer in producers:
+                tg.start_soon(stop, producer)
+    dropped = sum(tracker.in_flight for tracker in self._delivery_trackers.values())
+
+    # managers must be stopped by the task which started them, in the reverse order
+    for manager in managers[::-1]:
+        dropped += await manager.stop(timeout_ms=remaining_ms())
 
-# %% ../nbs/000_FastKafkaAPI.ipynb 46
+    if dropped > 0:
+        logger.warning(f"_shutdown_producers(): {dropped} messages were dropped")
+    return dropped
+
+# %% ../nbs/000_FastKafkaAPI.ipynb 62
 @patch  # type: ignore
 async def _populate_bg_tasks(
     self: FastKafkaAPI,
@@ -629,9 +1354,14 @@ async def _shutdown_bg_tasks(
     self._bg_tasks_group.cancel_scope.cancel()  # type: ignore
     await self._bg_task_group_generator.__aexit__(None, None, None)  # type: ignore
 
-# %% ../nbs/000_FastKafkaAPI.ipynb 48
+# %% ../nbs/000_FastKafkaAPI.ipynb 64
 @patch  # type: ignore
-def generate_async_spec(self: FastKafkaAPI) -> None:
+def generate_async_spec(self: FastKafkaAPI, generate_docs: bool = True) -> None:
+    """Generates the AsyncAPI specification and, if it changed, the documentation
+
+    Params:
+        generate_docs: if False, only the specification is generated, without running Node.js tooling
+    """
     export_async_spec(
         consumers={
             topic: callback for topic, (callback, _) in self._consumers_store.items()
@@ -642,19 +1372,55 @@ def generate_async_spec(self: FastKafkaAPI) -> None:
         kafka_brokers=self._kafka_brokers,
         kafka_service_info=self._kafka_service_info,
         asyncapi_path=self._asyncapi_path,
+        generate_docs=generate_docs,
+        stop_event=self._docs_stop_event,
     )
 
-# %% ../nbs/000_FastKafkaAPI.ipynb 50
+
+@patch  # type: ignore
+async def _generate_async_docs_in_background(self: FastKafkaAPI) -> None:
+    """Generates the documentation in a worker thread, failures are logged without affecting the app"""
+    try:
+        await asyncer.asyncify(self.generate_async_spec)()
+    except Exception as e:
+        logger.warning(
+            f"_generate_async_docs_in_background(): exception caught {e.__repr__()} while generating docs"
+        )
+
+# %% ../nbs/000_FastKafkaAPI.ipynb 67
 @patch  # type: ignore
 async def _on_startup(self: FastKafkaAPI) -> None:
 
     self._is_shutting_down = False
+    self._shutdown_event = anyio.Event()
+    self._producers_started = anyio.Event()
+    self._startup_exception = None
 
     def is_shutting_down_f(self: FastKafkaAPI = self) -> bool:
         return self._is_shutting_down
 
-    self.generate_async_spec()
-    await self._populate_producers()
+    if self._thread_pool_size is not None:
+        set_thread_pool_size(self._thread_pool_size)
+    if self._event_loop == "uvloop" and get_event_loop_name() != "uvloop":
+        logger.warning(
+            "_on_startup(): event_loop 'uvloop' was requested, but the app is running on an asyncio event loop"
+        )
+
+    if self._generate_spec_on_startup:
+        # documentation is generated by Node.js tooling, which must not block the startup
+        self.generate_async_spec(generate_docs=False)
+        if self._generate_docs_on_startup:
+            self._docs_stop_event.clear()
+            self._docs_task = asyncio.create_task(
+                self._generate_async_docs_in_background()
+            )
+    try:
+        await self._populate_producers()
+    except BaseException as e:
+        # wakes up `wait_until_ready` before the exception fails the startup
+        self._startup_exception = e
+        self._producers_started.set()
+        raise
     self._populate_consumers(is_shutting_down_f)
     await self._populate_bg_tasks()
 
@@ -662,6 +1428,16 @@ async def _on_startup(self: FastKafkaAPI) -> None:
 @patch  # type: ignore
 async def _on_shutdown(self: FastKafkaAPI) -> None:
     self._is_shutting_down = True
+    if self._shutdown_event is not None:
+        self._shutdown_event.set()
+
+    if self._docs_task is not None:
+        # the worker thread cannot be cancelled, the stop event terminates Node.js tooling it is waiting for
+        self._docs_stop_event.set()
+        self._docs_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._docs_task
+        self._docs_task = None
 
     await self._shutdown_bg_tasks()
     await self._shutdown_consumers()
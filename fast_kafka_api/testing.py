@@ -3,11 +3,12 @@
 # %% auto 0
 __all__ = ['logger', 'kafka_server_url', 'kafka_server_port', 'kafka_config', 'true_after', 'create_missing_topics',
            'create_testing_topic', 'create_and_fill_testing_topic', 'nb_safe_seed', 'mock_AIOKafkaProducer_send',
-           'change_dir', 'run_script_and_cancel']
+           'change_dir', 'run_script_and_cancel', 'InMemoryBroker', 'InMemoryProducer', 'InMemoryConsumer']
 
 # %% ../nbs/999_Test_Utils.ipynb 1
 import asyncio
 import contextlib
+import functools
 import hashlib
 import os
 import random
@@ -22,9 +23,31 @@ from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, AsyncIterator
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    AsyncIterator,
+)
 
-from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, ConsumerRebalanceListener
+from aiokafka.errors import (
+    ConsumerStoppedError,
+    IllegalOperation,
+    IllegalStateError,
+    NoOffsetForPartitionError,
+    ProducerClosed,
+    UnknownTopicOrPartitionError,
+)
+from aiokafka.partitioner import DefaultPartitioner
+from aiokafka.structs import ConsumerRecord, RecordMetadata, TopicPartition
 from confluent_kafka.admin import AdminClient, NewTopic
 
 from ._components.logger import get_logger
@@ -59,6 +82,9 @@ def true_after(seconds: float) -> Callable[[], bool]:
 #             - Replication factor (less than and greater than number of brokers)
 #             - Num partitions
 
+# brokers entered as context managers, helpers creating testing topics use the last one instead of Kafka
+_in_memory_brokers: List["InMemoryBroker"] = []
+
 
 def create_missing_topics(  # type: ignore
     admin: AdminClient,
@@ -68,6 +94,11 @@ def create_missing_topics(  # type: ignore
     replication_factor: Optional[int] = None,
     **kwargs,
 ) -> None:
+    if _in_memory_brokers:
+        for topic in topic_names:
+            _in_memory_brokers[-1].create_topic(topic, num_partitions=num_partitions)
+        return
+
     if not replication_factor:
         replication_factor = len(admin.list_topics().brokers)
     if not num_partitions:
@@ -104,6 +135,16 @@ def create_testing_topic(
 
     topic = topic_prefix + suffix.zfill(3)
 
+    if _in_memory_brokers:
+        broker = _in_memory_brokers[-1]
+        broker.delete_topic(topic)
+        broker.create_topic(topic)
+        try:
+            yield topic
+        finally:
+            broker.delete_topic(topic)
+        return
+
     # delete topic if it already exists
     admin = AdminClient(kafka_config)
     existing_topics = admin.list_topics().topics.keys()
@@ -135,7 +176,11 @@ async def create_and_fill_testing_topic(
 
     with create_testing_topic(kafka_config, "my_topic_", seed=seed) as topic:
 
-        producer = AIOKafkaProducer(bootstrap_servers=kafka_config["bootstrap.servers"])
+        producer = (
+            InMemoryProducer(_in_memory_brokers[-1])
+            if _in_memory_brokers
+            else AIOKafkaProducer(bootstrap_servers=kafka_config["bootstrap.servers"])
+        )
         logger.info(f"Producer {producer} created.")
 
         await producer.start()
@@ -219,3 +264,575 @@ def run_script_and_cancel(
             output, _ = proc.communicate()
 
         return (proc.returncode, output)
+
+# %% ../nbs/999_Test_Utils.ipynb 22
+class InMemoryBroker:
+    """In-process stand-in for a Kafka cluster, used by tests and benchmarks which should not need a running broker
+
+    Topics are lists of partitions holding `ConsumerRecord`s. Consumers with the same **group_id** share the
+    partitions of topics they are subscribed to and commit their offsets to the broker, while consumers
+    without a **group_id** are assigned all partitions of their topics.
+
+    Used as a context manager, it replaces `AIOKafkaConsumer` and `AIOKafkaProducer` created by `FastKafkaAPI`
+    with `InMemoryConsumer` and `InMemoryProducer` connected to it, and `create_missing_topics`,
+    `create_testing_topic` and `create_and_fill_testing_topic` create topics in it. The broker must be used
+    by a single event loop.
+    """
+
+    def __init__(self, *, num_partitions: int = 1, auto_create_topics: bool = True):
+        """Creates a broker without topics
+
+        Params:
+            num_partitions: number of partitions of topics created on the first use
+            auto_create_topics: if False, topics must be created using `create_topic` before they are used
+        """
+        self.num_partitions = num_partitions
+        self.auto_create_topics = auto_create_topics
+        self.topics: Dict[str, List[List[ConsumerRecord]]] = {}  # type: ignore
+        # committed offsets by group_id
+        self.committed: Dict[str, Dict[TopicPartition, int]] = {}  # type: ignore
+        self._partitioner = DefaultPartitioner()
+        self._members: Dict[str, List["InMemoryConsumer"]] = {}
+        self._waiters: Set[asyncio.Future] = set()
+        self._patches: Optional[contextlib.ExitStack] = None
+
+    def create_topic(self, topic: str, num_partitions: Optional[int] = None) -> None:
+        """Creates the topic if it does not exist
+
+        Params:
+            topic: name of the topic
+            num_partitions: number of partitions, if None **num_partitions** of the broker is used
+        """
+        if topic not in self.topics:
+            n = num_partitions if num_partitions is not None else self.num_partitions
+            self.topics[topic] = [[] for _ in range(n)]
+            self._notify()
+
+    def delete_topic(self, topic: str) -> None:
+        """Deletes the topic and offsets committed for its partitions if it exists
+
+        Params:
+            topic: name of the topic
+        """
+        if self.topics.pop(topic, None) is not None:
+            for offsets in self.committed.values():
+                for topic_partition in [tp for tp in offsets if tp.topic == topic]:
+                    del offsets[topic_partition]
+            self._notify()
+
+    def _get_partitions(self, topic: str) -> List[List[ConsumerRecord]]:  # type: ignore
+        if topic not in self.topics:
+            if not self.auto_create_topics:
+                raise UnknownTopicOrPartitionError(f"Topic '{topic}' does not exist.")
+            self.create_topic(topic)
+        return self.topics[topic]
+
+    def produce(  # type: ignore
+        self,
+        topic: str,
+        value: Optional[bytes],
+        *,
+        key: Optional[bytes] = None,
+        partition: Optional[int] = None,
+        timestamp_ms: Optional[int] = None,
+        headers: Optional[Sequence[Tuple[str, bytes]]] = None,
+    ) -> RecordMetadata:
+        """Appends a message to a partition of the topic
+
+        Params:
+            topic: topic to append the message to
+            value: serialized message
+            key: serialized key, used to choose the partition if **partition** is None
+            partition: partition to append the message to, if None it is chosen by `DefaultPartitioner`
+            timestamp_ms: timestamp of the message, if None the current time is used
+            headers: headers of the message
+
+        Returns:
+            metadata of the appended message
+        """
+        partitions = self._get_partitions(topic)
+        if partition is None:
+            ixs = list(range(len(partitions)))
+            partition = self._partitioner(key, ixs, ixs)
+        if not 0 <= partition < len(partitions):
+            raise ValueError(
+                f"partition must be one of {list(range(len(partitions)))}, but it is '{partition}'."
+            )
+        records = partitions[partition]
+        offset = len(records)
+        timestamp = (
+            timestamp_ms if timestamp_ms is not None else int(time.time() * 1000)
+        )
+        records.append(
+            ConsumerRecord(
+                topic=topic,
+                partition=partition,
+                offset=offset,
+                timestamp=timestamp,
+                timestamp_type=0,
+                key=key,
+                value=value,
+                checksum=None,
+                serialized_key_size=len(key) if key is not None else -1,
+                serialized_value_size=len(value) if value is not None else -1,
+                headers=tuple(headers or ()),
+            )
+        )
+        self._notify()
+        return RecordMetadata(
+            topic=topic,
+            partition=partition,
+            topic_partition=TopicPartition(topic, partition),
+            offset=offset,
+            timestamp=timestamp,
+            timestamp_type=0,
+            log_start_offset=0,
+        )
+
+    def highwater(self, topic_partition: TopicPartition) -> int:  # type: ignore
+        """Returns the offset of the next message appended to the partition"""
+        return len(
+            self._get_partitions(topic_partition.topic)[topic_partition.partition]
+        )
+
+    def _join(self, consumer: "InMemoryConsumer") -> None:
+        if consumer.group_id is not None:
+            members = self._members.setdefault(consumer.group_id, [])
+            if consumer not in members:
+                members.append(consumer)
+        self._notify()
+
+    def _leave(self, consumer: "InMemoryConsumer") -> None:
+        members = self._members.get(consumer.group_id, [])  # type: ignore
+        if consumer in members:
+            members.remove(consumer)
+        self._notify()
+
+    def _get_assignment(self, consumer: "InMemoryConsumer") -> List[TopicPartition]:  # type: ignore
+        """Returns partitions assigned to the consumer, partitions of a topic are assigned to members of
+        the consumer group subscribed to it in a round-robin fashion in the order they joined the group"""
+        assignment = []
+        for topic in sorted(consumer._topics):
+            if consumer.group_id is None:
+                subscribers = [consumer]
+            else:
+                subscribers = [
+                    member
+                    for member in self._members.get(consumer.group_id, [])
+                    if topic in member._topics
+                ]
+            for partition in range(len(self.topics.get(topic, []))):
+                if subscribers[partition % len(subscribers)] is consumer:
+                    assignment.append(TopicPartition(topic, partition))
+        return assignment
+
+    def _notify(self) -> None:
+        """Wakes up consumers waiting for messages in `getmany`"""
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters = set()
+
+    async def _wait(self, timeout: float) -> None:
+        """Waits until messages are produced or the assignment changes, but at most **timeout** seconds"""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait([waiter], timeout=timeout)
+        finally:
+            self._waiters.discard(waiter)
+
+    def __enter__(self) -> "InMemoryBroker":
+        _in_memory_brokers.append(self)
+        self._patches = contextlib.ExitStack()
+        self._patches.enter_context(
+            unittest.mock.patch(
+                "fast_kafka_api.application.AIOKafkaProducer",
+                functools.partial(InMemoryProducer, self),
+            )
+        )
+        self._patches.enter_context(
+            unittest.mock.patch(
+                "fast_kafka_api._components.aiokafka_consumer_loop.AIOKafkaConsumer",
+                functools.partial(InMemoryConsumer, self),
+            )
+        )
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._patches.close()  # type: ignore
+        self._patches = None
+        _in_memory_brokers.remove(self)
+
+# %% ../nbs/999_Test_Utils.ipynb 23
+class _InMemoryBatch:
+    """Batch of messages created by `InMemoryProducer.create_batch`, holding at most **max_size** bytes
+    of keys and values unless it holds a single message"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.records: List[
+            Tuple[Optional[bytes], Optional[bytes], Optional[int], Any]
+        ] = []
+        self.size = 0
+
+    def append(
+        self,
+        *,
+        key: Optional[bytes],
+        value: Optional[bytes],
+        timestamp: Optional[int],
+        headers: Sequence[Tuple[str, bytes]] = [],
+    ) -> Optional[int]:
+        """Appends the message and returns its index in the batch, or None if the batch is full"""
+        size = (len(key) if key is not None else 0) + (
+            len(value) if value is not None else 0
+        )
+        if self.records and self.size + size > self.max_size:
+            return None
+        self.records.append((key, value, timestamp, headers))
+        self.size += size
+        return len(self.records) - 1
+
+    def record_count(self) -> int:
+        return len(self.records)
+
+
+class InMemoryProducer:
+    """Stand-in for `AIOKafkaProducer` sending messages to an `InMemoryBroker`
+
+    Messages are appended to the broker immediately, returned delivery futures are already resolved.
+    """
+
+    def __init__(
+        self,
+        broker: InMemoryBroker,
+        *,
+        key_serializer: Optional[Callable[[Any], bytes]] = None,
+        value_serializer: Optional[Callable[[Any], bytes]] = None,
+        partitioner: Optional[Callable[..., int]] = None,
+        max_batch_size: int = 16384,
+        **kwargs: Any,
+    ):
+        """Creates a producer
+
+        Params:
+            broker: broker receiving messages
+            key_serializer: function serializing keys, if None keys must be bytes
+            value_serializer: function serializing messages, if None messages must be bytes
+            partitioner: function choosing partitions of messages with keys, `DefaultPartitioner` if None
+            max_batch_size: maximum size in bytes of batches created by `create_batch`
+            **kwargs: other keyword arguments of `AIOKafkaProducer`, ignored
+        """
+        self._broker = broker
+        self._key_serializer = key_serializer
+        self._value_serializer = value_serializer
+        # used by `send` for messages with a key and without an explicit partition
+        self._partitioner = (
+            partitioner if partitioner is not None else DefaultPartitioner()
+        )
+        self._max_batch_size = max_batch_size
+        self._started = False
+
+    async def start(self) -> None:
+        self._started = True
+
+    async def stop(self) -> None:
+        self._started = False
+
+    async def flush(self) -> None:
+        pass
+
+    async def partitions_for(self, topic: str) -> Set[int]:
+        return set(range(len(self._broker._get_partitions(topic))))
+
+    def _produce(  # type: ignore
+        self,
+        topic: str,
+        records: Iterable[Tuple[Optional[bytes], Optional[bytes], Optional[int], Any]],
+        *,
+        partition: int,
+    ) -> "asyncio.Future[RecordMetadata]":
+        if not self._started:
+            raise ProducerClosed()
+        metadata = [
+            self._broker.produce(
+                topic,
+                value,
+                key=key,
+                partition=partition,
+                timestamp_ms=timestamp_ms,
+                headers=headers,
+            )
+            for key, value, timestamp_ms, headers in records
+        ]
+        fut = asyncio.get_running_loop().create_future()
+        # like with AIOKafkaProducer, the metadata of a batch is the one of its first message
+        fut.set_result(metadata[0] if metadata else None)
+        return fut
+
+    async def send(  # type: ignore
+        self,
+        topic: str,
+        value: Any = None,
+        key: Any = None,
+        partition: Optional[int] = None,
+        timestamp_ms: Optional[int] = None,
+        headers: Optional[Sequence[Tuple[str, bytes]]] = None,
+    ) -> "asyncio.Future[RecordMetadata]":
+        if self._key_serializer is not None:
+            key = self._key_serializer(key)
+        if self._value_serializer is not None:
+            value = self._value_serializer(value)
+        if partition is None:
+            partitions = sorted(await self.partitions_for(topic))
+            partition = self._partitioner(key, partitions, partitions)
+        return self._produce(
+            topic, [(key, value, timestamp_ms, headers)], partition=partition
+        )
+
+    async def send_and_wait(self, *args: Any, **kwargs: Any) -> RecordMetadata:  # type: ignore
+        return await (await self.send(*args, **kwargs))
+
+    def create_batch(self) -> _InMemoryBatch:
+        return _InMemoryBatch(self._max_batch_size)
+
+    async def send_batch(  # type: ignore
+        self, batch: _InMemoryBatch, topic: str, *, partition: int
+    ) -> "asyncio.Future[RecordMetadata]":
+        return self._produce(topic, batch.records, partition=partition)
+
+# %% ../nbs/999_Test_Utils.ipynb 24
+class InMemoryConsumer:
+    """Stand-in for `AIOKafkaConsumer` polling messages from an `InMemoryBroker`
+
+    Partitions are reassigned whenever a member joins or leaves the consumer group, a consumer picks up its new
+    assignment on the next call to `getmany`. As in `AIOKafkaConsumer`, the rebalance listener passed to `subscribe`
+    is called with all the previously assigned partitions before they are revoked and with all the newly assigned
+    partitions afterwards. Positions in newly assigned partitions start at the offsets committed by the group,
+    or are reset by **auto_offset_reset**. If auto commit is enabled, positions are committed on every `getmany`,
+    before partitions are revoked and when the consumer stops.
+
+    Committing offsets raises `IllegalOperation` if the consumer has no **group_id** and `IllegalStateError`
+    for partitions which are not assigned to it, as in `AIOKafkaConsumer`.
+    """
+
+    def __init__(
+        self,
+        broker: InMemoryBroker,
+        *topics: str,
+        group_id: Optional[str] = None,
+        auto_offset_reset: str = "latest",
+        enable_auto_commit: bool = True,
+        max_poll_records: Optional[int] = None,
+        key_deserializer: Optional[Callable[[bytes], Any]] = None,
+        value_deserializer: Optional[Callable[[bytes], Any]] = None,
+        **kwargs: Any,
+    ):
+        """Creates a consumer
+
+        Params:
+            broker: broker to poll messages from
+            *topics: topics to subscribe to when the consumer starts
+            group_id: name of the consumer group, if None the consumer is assigned all partitions
+                and it cannot commit offsets
+            auto_offset_reset: "earliest" or "latest" to start at the first or after the last message of partitions
+                without committed offsets, or "none" to raise `NoOffsetForPartitionError`
+            enable_auto_commit: if True, positions are committed automatically
+            max_poll_records: maximum number of messages returned by `getmany`, if None it is not limited
+            key_deserializer: function deserializing keys of polled messages
+            value_deserializer: function deserializing polled messages
+            **kwargs: other keyword arguments of `AIOKafkaConsumer`, ignored
+        """
+        if auto_offset_reset not in ["earliest", "latest", "none"]:
+            raise ValueError(
+                f"auto_offset_reset must be one of ['earliest', 'latest', 'none'], but it is '{auto_offset_reset}'."
+            )
+        self._broker = broker
+        self._initial_topics = topics
+        self.group_id = group_id
+        self._auto_offset_reset = auto_offset_reset
+        self._enable_auto_commit = enable_auto_commit and group_id is not None
+        self._max_poll_records = max_poll_records
+        self._key_deserializer = key_deserializer
+        self._value_deserializer = value_deserializer
+        self._topics: Set[str] = set()
+        self._listener: Optional[ConsumerRebalanceListener] = None  # type: ignore
+        self._assignment: Set[TopicPartition] = set()  # type: ignore
+        self._positions: Dict[TopicPartition, int] = {}  # type: ignore
+        self._paused: Set[TopicPartition] = set()  # type: ignore
+        self._started = False
+        # rotates partitions returned by `getmany` if there are more messages than **max_records**
+        self._next_partition = 0
+
+    async def start(self) -> None:
+        self._started = True
+        if self._initial_topics:
+            self.subscribe(self._initial_topics)
+
+    async def stop(self) -> None:
+        if self._started and self._enable_auto_commit:
+            self._commit(self._positions)
+        self._started = False
+        self._assignment = set()
+        self._broker._leave(self)
+
+    def subscribe(  # type: ignore
+        self,
+        topics: Iterable[str],
+        listener: Optional[ConsumerRebalanceListener] = None,
+    ) -> None:
+        for topic in topics:
+            self._broker._get_partitions(topic)
+        self._topics = set(topics)
+        self._listener = listener
+        self._broker._join(self)
+
+    def assignment(self) -> Set[TopicPartition]:  # type: ignore
+        return set(self._assignment)
+
+    async def _rebalance(self) -> None:
+        """Picks up the assignment computed by the broker, calling the rebalance listener if it changed"""
+        assignment = set(self._broker._get_assignment(self))
+        if assignment == self._assignment:
+            return
+        if self._assignment:
+            if self._enable_auto_commit:
+                self._commit(self._positions)
+            if self._listener is not None:
+                await self._listener.on_partitions_revoked(set(self._assignment))
+        self._assignment = assignment
+        for topic_partition in set(self._positions) - assignment:
+            del self._positions[topic_partition]
+            self._paused.discard(topic_partition)
+        for topic_partition in assignment - set(self._positions):
+            self._positions[topic_partition] = self._reset_position(topic_partition)
+        if self._listener is not None:
+            await self._listener.on_partitions_assigned(set(assignment))
+
+    def _reset_position(self, topic_partition: TopicPartition) -> int:  # type: ignore
+        committed = self._broker.committed.get(self.group_id, {}).get(topic_partition)  # type: ignore
+        if committed is not None:
+            return committed
+        if self._auto_offset_reset == "earliest":
+            return 0
+        if self._auto_offset_reset == "latest":
+            return self._broker.highwater(topic_partition)
+        raise NoOffsetForPartitionError(topic_partition)
+
+    async def position(self, topic_partition: TopicPartition) -> int:  # type: ignore
+        if topic_partition not in self.assignment():
+            raise IllegalStateError(f"Partition {topic_partition} is not assigned")
+        return self._positions[topic_partition]
+
+    def highwater(self, topic_partition: TopicPartition) -> Optional[int]:  # type: ignore
+        if topic_partition not in self._positions:
+            return None
+        return self._broker.highwater(topic_partition)
+
+    def pause(self, *partitions: TopicPartition) -> None:  # type: ignore
+        self._paused.update(partitions)
+
+    def resume(self, *partitions: TopicPartition) -> None:  # type: ignore
+        self._paused.difference_update(partitions)
+        self._broker._notify()
+
+    def paused(self) -> Set[TopicPartition]:  # type: ignore
+        return set(self._paused)
+
+    def _commit(self, offsets: Dict[TopicPartition, Any]) -> None:  # type: ignore
+        if self.group_id is None:
+            raise IllegalOperation("Requires group_id")
+        for topic_partition in offsets:
+            if topic_partition not in self._assignment:
+                raise IllegalStateError(f"Partition {topic_partition} is not assigned")
+        self._broker.committed.setdefault(self.group_id, {}).update(
+            {
+                # offsets are either ints or `OffsetAndMetadata` tuples
+                topic_partition: offset if isinstance(offset, int) else offset[0]
+                for topic_partition, offset in offsets.items()
+            }
+        )
+
+    async def commit(self, offsets: Optional[Dict[TopicPartition, Any]] = None) -> None:  # type: ignore
+        self._commit(offsets if offsets is not None else self._positions)
+
+    async def committed(self, topic_partition: TopicPartition) -> Optional[int]:  # type: ignore
+        return self._broker.committed.get(self.group_id, {}).get(topic_partition)  # type: ignore
+
+    def _deserialize(self, record: ConsumerRecord) -> ConsumerRecord:  # type: ignore
+        if self._key_deserializer is None and self._value_deserializer is None:
+            return record
+        return ConsumerRecord(
+            topic=record.topic,
+            partition=record.partition,
+            offset=record.offset,
+            timestamp=record.timestamp,
+            timestamp_type=record.timestamp_type,
+            key=self._key_deserializer(record.key)
+            if self._key_deserializer is not None and record.key is not None
+            else record.key,
+            value=self._value_deserializer(record.value)
+            if self._value_deserializer is not None and record.value is not None
+            else record.value,
+            checksum=record.checksum,
+            serialized_key_size=record.serialized_key_size,
+            serialized_value_size=record.serialized_value_size,
+            headers=record.headers,
+        )
+
+    def _fetch(  # type: ignore
+        self, partitions: Sequence[TopicPartition], max_records: Optional[int]
+    ) -> Dict[TopicPartition, List[ConsumerRecord]]:
+        assignment = self.assignment()
+        topic_partitions = [
+            topic_partition
+            for topic_partition in (partitions or sorted(assignment))
+            if topic_partition in assignment and topic_partition not in self._paused
+        ]
+        if topic_partitions:
+            i = self._next_partition % len(topic_partitions)
+            topic_partitions = topic_partitions[i:] + topic_partitions[:i]
+            self._next_partition += 1
+
+        msgs = {}
+        remaining = max_records
+        for topic_partition in topic_partitions:
+            if remaining is not None and remaining <= 0:
+                break
+            records = self._broker.topics[topic_partition.topic][
+                topic_partition.partition
+            ]
+            position = self._positions[topic_partition]
+            end = position + remaining if remaining is not None else len(records)
+            fetched = records[position:end]
+            if fetched:
+                msgs[topic_partition] = [self._deserialize(r) for r in fetched]
+                self._positions[topic_partition] = position + len(fetched)
+                if remaining is not None:
+                    remaining -= len(fetched)
+        return msgs
+
+    async def getmany(  # type: ignore
+        self,
+        *partitions: TopicPartition,
+        timeout_ms: int = 0,
+        max_records: Optional[int] = None,
+    ) -> Dict[TopicPartition, List[ConsumerRecord]]:
+        """Returns messages from assigned partitions which are not paused, waiting at most **timeout_ms**
+        milliseconds for them if there are none"""
+        if not self._started:
+            raise ConsumerStoppedError()
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            await self._rebalance()
+            if self._enable_auto_commit:
+                self._commit(self._positions)
+            msgs = self._fetch(
+                partitions,
+                max_records if max_records is not None else self._max_poll_records,
+            )
+            remaining = deadline - time.monotonic()
+            if msgs or remaining <= 0:
+                return msgs
+            await self._broker._wait(remaining)